@@ -0,0 +1,102 @@
+"""Đo throughput và độ trễ của một worker khi search và CRUD chạy đồng thời.
+
+So sánh Session đồng bộ gọi trong coroutine (cách cũ của các endpoint async def:
+mỗi câu SQL chặn event loop) với AsyncSession (aiomysql). Search được mô phỏng
+bằng một lần chờ I/O không chặn, tương đương lời gọi Elasticsearch.
+
+Chạy trên bản sao dữ liệu thật (staging):
+
+    python -m app.commands.benchmark_async_db --concurrency 10 50 100 --requests 2000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List
+from sqlalchemy import select
+from app.db.database import SessionLocal, AsyncSessionLocal, async_engine
+from app.models.job import Job, job_response_options
+from app.services.job_service import _job_list_query
+from app.services.reference_data_service import load_reference_data, job_responses, async_job_responses
+
+OPERATIONS = ("search", "get", "list")
+
+def _get_stmt(job_id: int):
+    return select(Job).options(*job_response_options()).where(Job.id == job_id)
+
+async def sync_operation(operation: str, job_ids: List[int], args) -> None:
+    if operation == "search":
+        await asyncio.sleep(args.search_ms / 1000)
+        return
+    with SessionLocal() as db:
+        if operation == "get":
+            job_responses(db, db.scalars(_get_stmt(random.choice(job_ids))).all())
+        else:
+            job_responses(db, db.scalars(_job_list_query().limit(args.page_size)).all())
+
+async def async_operation(operation: str, job_ids: List[int], args) -> None:
+    if operation == "search":
+        await asyncio.sleep(args.search_ms / 1000)
+        return
+    async with AsyncSessionLocal() as db:
+        if operation == "get":
+            await async_job_responses(db, (await db.scalars(_get_stmt(random.choice(job_ids)))).all())
+        else:
+            await async_job_responses(db, (await db.scalars(_job_list_query().limit(args.page_size))).all())
+
+async def run(operation_fn, concurrency: int, job_ids: List[int], args):
+    """concurrency client cùng lúc, tổng cộng args.requests request theo tỷ lệ --mix"""
+    rng = random.Random(args.seed)
+    plan = rng.choices(OPERATIONS, weights=args.mix, k=args.requests)
+    latencies: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+    queue = iter(plan)
+
+    async def client():
+        for operation in queue:
+            start = time.perf_counter()
+            await operation_fn(operation, job_ids, args)
+            latencies[operation].append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return args.requests / (time.perf_counter() - start), latencies
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+async def main_async(args):
+    with SessionLocal() as db:
+        load_reference_data(db)
+    async with AsyncSessionLocal() as db:
+        job_ids = (await db.scalars(select(Job.id).order_by(Job.id.desc()).limit(args.sample))).all()
+    if not job_ids:
+        raise SystemExit("No jobs in database")
+
+    for concurrency in args.concurrency:
+        for name, operation_fn in (("sync", sync_operation), ("async", async_operation)):
+            throughput, latencies = await run(operation_fn, concurrency, job_ids, args)
+            parts = "  ".join(
+                f"{operation} p50={statistics.median(latencies[operation]) if latencies[operation] else 0:6.1f}ms "
+                f"p95={percentile(latencies[operation], 0.95):6.1f}ms"
+                for operation in OPERATIONS
+            )
+            print(f"concurrency={concurrency:4}  {name:5}  {throughput:7.0f} req/s  {parts}", flush=True)
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async database access under mixed load")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mix", type=float, nargs=3, default=[0.6, 0.3, 0.1], metavar=("SEARCH", "GET", "LIST"),
+                        help="Tỷ lệ search / đọc job / danh sách job")
+    parser.add_argument("--search-ms", type=float, default=20, help="Độ trễ mô phỏng của một lần search")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=10000, help="Số job mới nhất dùng cho lượt đọc theo id")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Đo chi phí xác thực của mỗi request (get_current_user) trước và sau principal cache.
+
+Ba trường hợp của cùng một access token:
+  mysql      principal cache và snapshot Redis trống: Redis + MySQL (tương đương trước khi có cache)
+  redis      snapshot có trong Redis, principal cache trống: một round trip Redis
+  principal  principal đã có trong cache của worker: không gọi Redis/MySQL
+
+Chạy trên staging với một user có sẵn (session tạo ra được thu hồi sau khi đo):
+
+    python -m app.commands.benchmark_auth --username alice --runs 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, List
+from app.core.auth import get_current_user
+from app.core.principal_cache import principal_cache
+from app.core.security import verify_token
+from app.db.database import AsyncSessionLocal, async_engine
+from app.db.redis_db import get_redis
+from app.services.auth_service import user_snapshot_key, get_user_snapshot
+from app.services.session_service import create_session, revoke_session
+
+redis_client = get_redis()
+
+MODES = ("mysql", "redis", "principal")
+
+async def measure(token: str, runs: int, before_each: Callable[[], None]) -> List[float]:
+    latencies = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(runs):
+            before_each()
+            start = time.perf_counter()
+            await get_current_user(token, db)
+            latencies.append((time.perf_counter() - start) * 1_000_000)
+    return sorted(latencies)
+
+async def run(args):
+    token = create_session(args.username).access_token
+    session_id = verify_token(token)["sid"]
+    try:
+        async with AsyncSessionLocal() as db:
+            if await get_user_snapshot(db, args.username) is None:
+                raise SystemExit(f"User {args.username} not found")
+
+        # Chỉ xóa cache cục bộ và snapshot, không phát sự kiện evict tới các worker khác
+        reset = {
+            "mysql": lambda: (principal_cache.clear(), redis_client.delete(user_snapshot_key(args.username))),
+            "redis": principal_cache.clear,
+            "principal": lambda: None,
+        }
+        for mode in args.modes:
+            # Lần gọi đầu làm nóng connection pool và cache, không tính
+            await measure(token, 10, reset[mode])
+            latencies = await measure(token, args.runs, reset[mode])
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(f"{mode:10}  mean={statistics.mean(latencies):9.1f}us  p50={latencies[len(latencies) // 2]:9.1f}us  "
+                  f"p95={p95:9.1f}us", flush=True)
+    finally:
+        revoke_session(args.username, session_id)
+        await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request auth overhead with and without the principal cache")
+    parser.add_argument("--username", required=True, help="User có sẵn dùng để tạo session đo")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--runs", type=int, default=2000)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Đo thông lượng và độ trễ của tìm kiếm fallback MySQL trên dữ liệu hiện có.
+
+Chạy trên bản sao dữ liệu thật (staging) để biết fallback chịu được bao nhiêu
+request khi Elasticsearch ngừng hoạt động:
+
+    python -m app.commands.benchmark_fallback_search --queries 500 --concurrency 8
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from sqlalchemy import func, select
+from app.db.database import SessionLocal
+from app.models.job import Job, Location, Tag, WorkType
+from app.schemas.job_search import FacetField, JobSearchQuery, SortField, SortOrder
+from app.services.job_search_fallback import search_jobs_mysql
+
+def sample_queries(count: int, with_facets: bool, seed: int) -> List[JobSearchQuery]:
+    """Trộn từ khóa lấy từ tiêu đề job thật với các filter phổ biến"""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        titles = db.scalars(select(Job.title).order_by(func.rand()).limit(200)).all()
+        location_ids = db.scalars(select(Location.id)).all()
+        work_type_ids = db.scalars(select(WorkType.id)).all()
+        tag_ids = db.scalars(select(Tag.id)).all()
+    finally:
+        db.close()
+
+    words = [word for title in titles for word in title.split() if len(word) > 2] or ["developer"]
+    queries = []
+    for _ in range(count):
+        params = {
+            "page": rng.choice([1, 1, 1, 2, 3]),
+            "sort": rng.choice(list(SortField)),
+            "order": rng.choice(list(SortOrder))
+        }
+        if rng.random() < 0.7:
+            params["q"] = " ".join(rng.sample(words, k=min(2, len(words))))
+        if location_ids and rng.random() < 0.5:
+            params["location_id"] = rng.choice(location_ids)
+        if work_type_ids and rng.random() < 0.3:
+            params["work_type_id"] = rng.choice(work_type_ids)
+        if tag_ids and rng.random() < 0.3:
+            params["tag_ids"] = rng.sample(tag_ids, k=min(2, len(tag_ids)))
+        if with_facets:
+            params["facets"] = list(FacetField)
+        queries.append(JobSearchQuery(**params))
+    return queries
+
+def timed_search(query: JobSearchQuery, with_facets: bool) -> float:
+    start = time.perf_counter()
+    search_jobs_mysql(query, with_facets)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MySQL fallback search")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8, help="Số request đồng thời (threads)")
+    parser.add_argument("--facets", action="store_true", help="Tính kèm toàn bộ facets")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total_jobs = db.scalar(select(func.count(Job.id)))
+    finally:
+        db.close()
+    queries = sample_queries(args.queries, args.facets, args.seed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = sorted(pool.map(lambda q: timed_search(q, args.facets), queries))
+    elapsed = time.perf_counter() - start
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(f"jobs={total_jobs}  queries={len(latencies)}  concurrency={args.concurrency}  facets={args.facets}")
+    print(f"throughput {len(latencies) / elapsed:8.1f} req/s")
+    print(f"latency ms  mean={statistics.mean(latencies):.1f}  p50={percentile(0.5):.1f}  "
+          f"p95={percentile(0.95):.1f}  p99={percentile(0.99):.1f}  max={latencies[-1]:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Đo số câu SQL và độ trễ mỗi trang của danh sách job: lazy load, eager load
+(JOIN + selectinload) và reference cache (một SELECT, tags/location/work type
+lấy từ bộ nhớ).
+
+Chạy trên bản sao dữ liệu thật (staging):
+
+    python -m app.commands.benchmark_job_listing --page-sizes 10 50 100 --runs 20
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.db.database import SessionLocal, engine
+from app.db.query_counter import count_queries
+from app.models.job import Job
+from app.schemas.job import JobResponse
+from app.services.job_service import _job_list_query
+from app.services.reference_data_service import load_reference_data, job_responses
+
+def lazy_listing(db: Session, limit: int) -> List[JobResponse]:
+    """Cách làm cũ: mỗi job lazy load location, work_type và tags"""
+    return [JobResponse.model_validate(job) for job in db.query(Job).offset(0).limit(limit).all()]
+
+def eager_listing(db: Session, limit: int) -> List[JobResponse]:
+    """Relationship được nạp bằng JOIN và một SELECT ... IN cho tags"""
+    stmt = select(Job).options(
+        joinedload(Job.location), joinedload(Job.work_type), selectinload(Job.tags)
+    ).offset(0).limit(limit)
+    return [JobResponse.model_validate(job) for job in db.scalars(stmt).unique()]
+
+def cached_listing(db: Session, limit: int) -> List[JobResponse]:
+    # Cùng câu select của get_jobs, chạy trên Session đồng bộ để so sánh với các cách trên
+    return job_responses(db, db.scalars(_job_list_query().offset(0).limit(limit)).all())
+
+def measure(listing: Callable[[Session, int], List[JobResponse]], limit: int, runs: int):
+    queries, latencies = 0, []
+    for _ in range(runs):
+        # Session mới mỗi lần để identity map không che mất các câu lazy load
+        db = SessionLocal()
+        try:
+            with count_queries(engine) as counter:
+                start = time.perf_counter()
+                listing(db, limit)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries = counter.count
+        finally:
+            db.close()
+    latencies.sort()
+    return queries, statistics.mean(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job listing query count and latency")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        load_reference_data(db)
+    for limit in args.page_sizes:
+        for name, listing in (("lazy", lazy_listing), ("eager", eager_listing), ("cached", cached_listing)):
+            queries, mean, p50, p95 = measure(listing, limit, args.runs)
+            print(f"per_page={limit:4}  {name:6}  queries={queries:4}  "
+                  f"mean={mean:7.1f}ms  p50={p50:7.1f}ms  p95={p95:7.1f}ms", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""So sánh độ trễ phân trang offset và keyset ở các độ sâu khác nhau.
+
+Chạy trên bản sao dữ liệu thật (staging):
+
+    python -m app.commands.benchmark_keyset_pagination --table jobs --pages 1 100 1000 10000
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List
+from app.core.pagination import encode_cursor, keyset_page
+from app.db.database import SessionLocal
+from app.models.job import Job
+from app.models.profile import Profile
+from app.models.user import User
+
+TABLES = {
+    "jobs": (Job, Job.created_at, Job.id),
+    "users": (User, User.createdAt, User.id),
+    "profiles": (Profile, Profile.created_at, Profile.id),
+}
+
+def measure(fn: Callable[[], None], runs: int) -> List[float]:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offset vs keyset pagination")
+    parser.add_argument("--table", choices=sorted(TABLES), default="jobs")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    model, created_column, id_column = TABLES[args.table]
+    db = SessionLocal()
+    try:
+        ordered = db.query(model).order_by(created_column.desc(), id_column.desc())
+        for page in args.pages:
+            offset = (page - 1) * args.limit
+            cursor = None
+            if offset:
+                # Cursor của trang này là dòng cuối của trang trước
+                anchor = db.query(created_column, id_column).order_by(
+                    created_column.desc(), id_column.desc()
+                ).offset(offset - 1).first()
+                if anchor is None:
+                    print(f"page={page}: table has fewer than {offset} rows, stopping")
+                    break
+                cursor = encode_cursor({"created_at": anchor[0].isoformat(), "id": anchor[1]})
+
+            offset_ms = measure(lambda: ordered.offset(offset).limit(args.limit).all(), args.runs)
+            keyset_ms = measure(
+                lambda: keyset_page(db.query(model), created_column, id_column, cursor, args.limit),
+                args.runs
+            )
+            # Không giữ object trong session giữa các lần đo
+            db.expunge_all()
+            print(f"{args.table} page={page:6}  offset p50={offset_ms[len(offset_ms) // 2]:8.2f}ms "
+                  f"mean={statistics.mean(offset_ms):8.2f}ms  |  keyset p50={keyset_ms[len(keyset_ms) // 2]:8.2f}ms "
+                  f"mean={statistics.mean(keyset_ms):8.2f}ms", flush=True)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
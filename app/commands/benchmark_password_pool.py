@@ -0,0 +1,99 @@
+"""Đo độ trễ search của một worker khi có một đợt đăng nhập đồng thời.
+
+So sánh bcrypt chạy thẳng trong coroutine (cách cũ: mỗi lần verify chặn event
+loop) với PasswordHashingPool (process pool, hàng đợi giới hạn, 503 khi đầy).
+Search được mô phỏng bằng một lần chờ I/O không chặn, tương đương lời gọi
+Elasticsearch, nên mọi độ trễ vượt --search-ms là do event loop bị chặn.
+Không cần MySQL/Redis:
+
+    python -m app.commands.benchmark_password_pool --logins 200 --concurrency 50 --workers 2
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.password_pool import PasswordHashingPool
+from app.core.security import get_password_hash, verify_password
+
+PASSWORD = "benchmark-password"
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+async def run(verify: Callable[[str, str], Awaitable[bool]], hashed: str, args) -> Dict[str, object]:
+    login_latencies: List[float] = []
+    search_latencies: List[float] = []
+    rejected = 0
+    queue = iter(range(args.logins))
+    done = asyncio.Event()
+
+    async def login_client():
+        nonlocal rejected
+        for _ in queue:
+            start = time.perf_counter()
+            try:
+                await verify(PASSWORD, hashed)
+            except HTTPException:
+                rejected += 1
+                continue
+            login_latencies.append((time.perf_counter() - start) * 1000)
+
+    async def search_client():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(args.search_ms / 1000)
+            search_latencies.append((time.perf_counter() - start) * 1000)
+
+    searches = [asyncio.create_task(search_client()) for _ in range(args.search_clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(login_client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*searches)
+    return {
+        "logins/s": len(login_latencies) / elapsed,
+        "rejected": rejected,
+        "login": login_latencies,
+        "search": search_latencies,
+    }
+
+def report(name: str, result: Dict[str, object]):
+    login, search = result["login"], result["search"]
+    print(f"{name:7}  {result['logins/s']:6.1f} logins/s  rejected={result['rejected']:4}  "
+          f"login p50={statistics.median(login) if login else 0:7.1f}ms p95={percentile(login, 0.95):7.1f}ms  |  "
+          f"search p50={statistics.median(search) if search else 0:7.1f}ms p95={percentile(search, 0.95):7.1f}ms "
+          f"max={max(search, default=0):7.1f}ms", flush=True)
+
+async def main_async(args):
+    hashed = get_password_hash(PASSWORD)
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}  logins={args.logins}  concurrency={args.concurrency}  "
+          f"search clients={args.search_clients} x {args.search_ms:.0f}ms", flush=True)
+
+    async def inline_verify(plain: str, hashed_password: str) -> bool:
+        return verify_password(plain, hashed_password)
+    report("inline", await run(inline_verify, hashed, args))
+
+    pool = PasswordHashingPool(max_workers=args.workers, max_pending=args.max_pending, retry_after=1)
+    try:
+        # Khởi động các process con trước khi đo
+        await asyncio.gather(*(pool.verify(PASSWORD, hashed) for _ in range(args.workers)))
+        report("pool", await run(pool.verify, hashed, args))
+    finally:
+        pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search latency during a login burst, with and without the bcrypt pool")
+    parser.add_argument("--logins", type=int, default=200, help="Tổng số lần verify mật khẩu")
+    parser.add_argument("--concurrency", type=int, default=50, help="Số lần đăng nhập chạy cùng lúc")
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=settings.PASSWORD_HASH_MAX_PENDING)
+    parser.add_argument("--search-clients", type=int, default=10, help="Số client search chạy liên tục")
+    parser.add_argument("--search-ms", type=float, default=20, help="Độ trễ mô phỏng của một lần search")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Đo độ trễ gợi ý job trên index tổng hợp, không cần MySQL.
+
+Chạy: python -m app.commands.benchmark_recommendations --jobs 1000000 --tags 2000
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+from app.core.tag_index import TagJobIndex
+
+def build_index(jobs: int, tags: int, tags_per_job: int, seed: int) -> TagJobIndex:
+    """Phân bố tag theo Zipf để có vài tag rất phổ biến như dữ liệu thật"""
+    rng = np.random.default_rng(seed)
+    job_ids = np.repeat(np.arange(1, jobs + 1, dtype=np.int64), tags_per_job)
+    tag_ids = (rng.zipf(1.3, size=len(job_ids)) - 1) % tags + 1
+    index = TagJobIndex(compact_threshold=10000)
+    index.load(job_ids, tag_ids.astype(np.int64))
+    return index
+
+def measure(fn, runs: int):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skill-based job recommendations")
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--tags", type=int, default=2000)
+    parser.add_argument("--tags-per-job", type=int, default=5)
+    parser.add_argument("--skills", type=int, default=8, help="Số kỹ năng của ứng viên")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_index(args.jobs, args.tags, args.tags_per_job, args.seed)
+    print(f"load {args.jobs} jobs x {args.tags_per_job} tags: {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(args.seed + 1)
+    # Trộn kỹ năng phổ biến và hiếm
+    skills = [rng.choice(args.tags, size=args.skills, replace=False) + 1 for _ in range(args.runs)]
+    queries = iter(skills * 2)
+    mean, p50, p95 = measure(lambda: index.top_k(next(queries).tolist(), args.limit), args.runs)
+    print(f"top_k   mean={mean:.2f}ms  p50={p50:.2f}ms  p95={p95:.2f}ms")
+
+    next_id = iter(range(args.jobs + 1, args.jobs + 1 + args.runs))
+    mean, p50, p95 = measure(
+        lambda: index.upsert(next(next_id), rng.choice(args.tags, size=args.tags_per_job, replace=False) + 1),
+        args.runs
+    )
+    print(f"upsert  mean={mean:.3f}ms  p50={p50:.3f}ms  p95={p95:.3f}ms")
+
+    start = time.perf_counter()
+    index.compact()
+    print(f"compact {(time.perf_counter() - start) * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    main()
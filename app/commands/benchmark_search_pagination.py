@@ -0,0 +1,113 @@
+"""So sánh độ trễ search ở trang đầu và trang sâu giữa phân trang offset và cursor.
+
+  offset      from_/size như phân trang theo số trang
+  cursor      search_after với cursor của trang trước
+  cursor_pit  search_after trên một snapshot point-in-time
+
+Gọi thẳng Elasticsearch, không qua search cache (request cache của ES chỉ giữ
+response size=0 nên không ảnh hưởng số đo). Cursor của trang sâu có được bằng
+cách duyệt lần lượt từ trang 1, không tính vào số đo. Chạy trên staging:
+
+    python -m app.commands.benchmark_search_pagination --pages 1 500 --per-page 10 --runs 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Optional
+from elasticsearch import ApiError
+from app.core.elasticsearch import close_elasticsearch
+from app.core.elasticsearch_manager import es_manager
+from app.core.pagination import decode_cursor
+from app.schemas.job_search import JobSearchQuery, JobSearchResponse, PaginationMode
+from app.services import job_service
+
+MODES = ("offset", "cursor", "cursor_pit")
+
+async def measure(fn: Callable[[], Awaitable[JobSearchResponse]], runs: int) -> List[float]:
+    # Lần đầu làm nóng, không tính
+    await fn()
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+async def close_pit(response: JobSearchResponse):
+    if response.next_cursor:
+        pit_id = decode_cursor(response.next_cursor).get("pit")
+        if pit_id:
+            await es_manager.close_point_in_time(pit_id)
+
+async def cursor_for_page(base: dict, page: int, use_pit: bool) -> Optional[str]:
+    """Duyệt từ trang 1 tới trang page, trả về cursor của trang đó"""
+    cursor = None
+    for current in range(1, page):
+        response = await job_service._execute_es_search(
+            JobSearchQuery(**base, page=current, pagination=PaginationMode.CURSOR, cursor=cursor, use_pit=use_pit)
+        )
+        cursor = response.next_cursor
+        if cursor is None:
+            return None
+    return cursor
+
+async def measure_page(base: dict, mode: str, page: int, runs: int) -> Optional[List[float]]:
+    if mode == "offset":
+        query = JobSearchQuery(**base, page=page)
+        return await measure(lambda: job_service._execute_es_search(query), runs)
+
+    use_pit = mode == "cursor_pit"
+    if page == 1:
+        query = JobSearchQuery(**base, pagination=PaginationMode.CURSOR, use_pit=use_pit)
+
+        async def first_page() -> JobSearchResponse:
+            # Mỗi lần mở một point-in-time mới, đóng ngay để không giữ tài nguyên trên ES
+            response = await job_service._execute_es_search(query)
+            await close_pit(response)
+            return response
+        return await measure(first_page, runs)
+
+    cursor = await cursor_for_page(base, page, use_pit)
+    if cursor is None:
+        return None
+    query = JobSearchQuery(**base, page=page, pagination=PaginationMode.CURSOR, cursor=cursor)
+    try:
+        return await measure(lambda: job_service._execute_es_search(query), runs)
+    finally:
+        pit_id = decode_cursor(cursor).get("pit")
+        if pit_id:
+            await es_manager.close_point_in_time(pit_id)
+
+async def run(args):
+    base = {"q": args.q, "per_page": args.per_page}
+    try:
+        print(f"q={args.q!r}  per_page={args.per_page}  runs={args.runs}", flush=True)
+        for page in args.pages:
+            for mode in args.modes:
+                try:
+                    latencies = await measure_page(base, mode, page, args.runs)
+                except ApiError as e:
+                    # Ví dụ offset vượt index.max_result_window
+                    print(f"page={page:6}  {mode:10}  rejected by Elasticsearch: {e.message}", flush=True)
+                    continue
+                if latencies is None:
+                    print(f"page={page:6}  {mode:10}  not enough results", flush=True)
+                    continue
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(f"page={page:6}  {mode:10}  mean={statistics.mean(latencies):7.1f}ms  "
+                      f"p50={latencies[len(latencies) // 2]:7.1f}ms  p95={p95:7.1f}ms", flush=True)
+    finally:
+        await close_elasticsearch()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shallow vs deep search pages with offset and cursor pagination")
+    parser.add_argument("--q", default=None, help="Từ khóa tìm kiếm, bỏ trống để duyệt mọi job")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 500])
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--runs", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Đo bộ nhớ Redis cho mỗi session đăng nhập.
+
+So sánh cách lưu cũ (access_token:{username} và refresh_token:{username} chứa
+cả JWT, không TTL) với session store hiện tại (digest của token có TTL và một
+ZSET sessions:{username}). Nên chạy trên một Redis không có traffic khác vì
+số đo dựa trên used_memory; mọi key tạo ra được xóa sau khi đo:
+
+    python -m app.commands.benchmark_session_memory --users 10000 --sessions-per-user 1 3
+"""
+import argparse
+from typing import Dict, List
+from app.core.security import create_access_token, create_refresh_token
+from app.db.redis_db import get_redis
+from app.services.session_service import access_token_key, create_session, refresh_token_key, sessions_key
+
+redis_client = get_redis()
+
+USERNAME_PREFIX = "bench_session_"
+PIPELINE_SIZE = 1000
+
+def used_memory() -> int:
+    return int(redis_client.info("memory")["used_memory"])
+
+def _execute_in_batches(commands):
+    pipe = redis_client.pipeline(transaction=False)
+    for i, command in enumerate(commands, 1):
+        command(pipe)
+        if i % PIPELINE_SIZE == 0:
+            pipe.execute()
+    pipe.execute()
+
+def create_legacy(usernames: List[str]) -> List[str]:
+    """Cách lưu cũ: mỗi user một cặp key chứa JWT đầy đủ, không hết hạn"""
+    keys = []
+    commands = []
+    for username in usernames:
+        access_token = create_access_token(data={"sub": username})
+        refresh_token = create_refresh_token(data={"sub": username})
+        keys += [f"access_token:{username}", f"refresh_token:{username}"]
+        commands.append(lambda pipe, u=username, a=access_token, r=refresh_token: (
+            pipe.set(f"access_token:{u}", a), pipe.set(f"refresh_token:{u}", r)
+        ))
+    _execute_in_batches(commands)
+    return keys
+
+def create_sessions(usernames: List[str], sessions_per_user: int) -> List[str]:
+    keys = []
+    for username in usernames:
+        for _ in range(sessions_per_user):
+            create_session(username)
+        keys.append(sessions_key(username))
+    for username in usernames:
+        for session_id in redis_client.zrange(sessions_key(username), 0, -1):
+            keys += [access_token_key(session_id), refresh_token_key(session_id)]
+    return keys
+
+def delete_keys(keys: List[str]):
+    # Xóa trực tiếp thay vì revoke_all_sessions để không phát sự kiện evict tới các worker
+    _execute_in_batches([lambda pipe, key=key: pipe.delete(key) for key in keys])
+
+def sample_key_sizes(keys: List[str]) -> Dict[str, int]:
+    sizes = {}
+    for key in keys:
+        kind = key.split(":", 1)[0]
+        if kind not in sizes:
+            sizes[kind] = redis_client.memory_usage(key, samples=0) or 0
+    return sizes
+
+def measure(name: str, create, sessions: int):
+    before = used_memory()
+    keys = create()
+    after = used_memory()
+    try:
+        per_session = (after - before) / sessions
+        sizes = "  ".join(f"{kind}={size}B" for kind, size in sample_key_sizes(keys).items())
+        print(f"{name:22}  sessions={sessions:7}  keys={len(keys):7}  {per_session:7.1f} B/session  "
+              f"(MEMORY USAGE: {sizes})", flush=True)
+    finally:
+        delete_keys(keys)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Redis memory per login session")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--sessions-per-user", type=int, nargs="+", default=[1, 3])
+    args = parser.parse_args()
+
+    usernames = [f"{USERNAME_PREFIX}{i}" for i in range(args.users)]
+    # Cách cũ chỉ giữ được một session mỗi user (đăng nhập mới ghi đè thiết bị khác)
+    measure("legacy (1 per user)", lambda: create_legacy(usernames), args.users)
+    for per_user in args.sessions_per_user:
+        measure(f"sessions ({per_user} per user)", lambda: create_sessions(usernames, per_user), args.users * per_user)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Đo số request tới Elasticsearch khi một worker nhận một đợt query nóng giống hệt nhau.
+
+Mỗi đợt bắt đầu với cache của các query nóng đã bị xóa (như ngay sau khi hết
+hạn), rồi gửi --burst request search_jobs đồng thời chia đều cho các query.
+So sánh khi tắt single-flight (max_waiters=0: mọi request tự đọc cache/gọi ES)
+và khi bật. Khi tắt, lock của search cache chỉ giữ số lần gọi ES thấp nếu ES trả
+lời trong thời gian chờ lock; các request còn lại vẫn poll Redis, nên số round
+trip Redis cũng được in ra. Chạy trên staging:
+
+    python -m app.commands.benchmark_single_flight --burst 500 --rounds 5 --q python java react
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+from app.core.config import settings
+from app.core.elasticsearch import close_elasticsearch
+from app.core.elasticsearch_manager import es_manager
+from app.core.single_flight import SingleFlight
+from app.db.redis_db import get_redis
+from app.schemas.job_search import JobSearchQuery
+from app.services import job_service
+from app.services.search_canonical import canonicalize_query
+
+redis_client = get_redis()
+
+class CountingSearch:
+    """Bọc es_manager.search để đếm số request thực sự gửi tới ES"""
+
+    def __init__(self):
+        self.calls = 0
+        self._search = es_manager.search
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return await self._search(*args, **kwargs)
+
+class CountingRedis:
+    """Đếm số lần lấy connection từ pool, tức số round trip (lệnh đơn hoặc pipeline)"""
+
+    def __init__(self):
+        self.calls = 0
+        self._pool = redis_client.connection_pool
+        self._get_connection = self._pool.get_connection
+        self._pool.get_connection = self
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self._get_connection(*args, **kwargs)
+
+    def restore(self):
+        self._pool.get_connection = self._get_connection
+
+def clear_cache(queries: List[JobSearchQuery]):
+    keys = []
+    for query in queries:
+        query, _ = canonicalize_query(query)
+        cache_key = job_service.get_cache_key(query.model_dump(mode="json", exclude={"facets"}, exclude_defaults=True))
+        keys += [cache_key, f"lock:{cache_key}"]
+    redis_client.delete(*keys)
+
+async def burst(queries: List[JobSearchQuery], size: int, counter: CountingSearch, redis_counter: CountingRedis) -> Dict[str, object]:
+    clear_cache(queries)
+    counter.calls = 0
+    redis_counter.calls = 0
+    latencies: List[float] = []
+
+    async def request(query: JobSearchQuery):
+        start = time.perf_counter()
+        await job_service.search_jobs(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(queries[i % len(queries)]) for i in range(size)))
+    elapsed = time.perf_counter() - start
+    return {"es_calls": counter.calls, "redis_calls": redis_counter.calls, "elapsed": elapsed, "latencies": latencies}
+
+async def run(args):
+    queries = [JobSearchQuery(q=q) for q in args.q]
+    counter = CountingSearch()
+    es_manager.search = counter
+    redis_counter = CountingRedis()
+    flights = {
+        "off": SingleFlight("job_search", max_waiters=0, timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS),
+        "on": job_service.search_flight,
+    }
+    try:
+        # Làm nóng connection tới ES và Redis
+        await burst(queries, len(queries), counter, redis_counter)
+        for name, flight in flights.items():
+            job_service.search_flight = flight
+            es_calls, redis_calls, elapsed, latencies = 0, 0, 0.0, []
+            for _ in range(args.rounds):
+                result = await burst(queries, args.burst, counter, redis_counter)
+                es_calls += result["es_calls"]
+                redis_calls += result["redis_calls"]
+                elapsed += result["elapsed"]
+                latencies += result["latencies"]
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(f"single-flight {name:3}  requests={args.burst * args.rounds:6}  es_calls={es_calls:6}  "
+                  f"es_qps={es_calls / elapsed:8.1f}  redis_calls={redis_calls:7}  p50={statistics.median(latencies):7.1f}ms  p95={p95:7.1f}ms",
+                  flush=True)
+    finally:
+        job_service.search_flight = flights["on"]
+        es_manager.search = counter._search
+        redis_counter.restore()
+        await close_elasticsearch()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Elasticsearch QPS under a hot-query burst with and without single-flight")
+    parser.add_argument("--q", nargs="+", default=["python", "java", "developer"], help="Từ khóa của các query nóng")
+    parser.add_argument("--burst", type=int, default=500, help="Số request đồng thời mỗi đợt")
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
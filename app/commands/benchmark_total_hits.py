@@ -0,0 +1,121 @@
+"""Đo ảnh hưởng của track_total_hits tới độ trễ search với các query rộng.
+
+Chạy trên index jobs hiện có, hoặc tạo index tổng hợp trước khi đo:
+
+    python -m app.commands.benchmark_total_hits --generate 1000000 --runs 50
+
+Index tổng hợp bị xóa sau khi đo, trừ khi có --keep.
+"""
+import argparse
+import asyncio
+import copy
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Union
+from elasticsearch.helpers import async_bulk
+from app.core.config import settings
+from app.core.elasticsearch import close_elasticsearch
+from app.core.elasticsearch_manager import es_manager
+
+BENCH_INDEX = "jobs_bench_total_hits"
+WORDS = ["developer", "engineer", "senior", "junior", "backend", "frontend", "python", "java",
+         "react", "data", "manager", "tester", "devops", "mobile", "lập trình viên", "kỹ sư"]
+
+def synthetic_documents(count: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    for job_id in range(1, count + 1):
+        salary_min = rng.randrange(5, 60) * 1_000_000
+        yield {
+            "_index": BENCH_INDEX,
+            "_id": job_id,
+            "_source": {
+                "id": job_id,
+                "title": " ".join(rng.sample(WORDS, 3)),
+                "description": " ".join(rng.choices(WORDS, k=30)),
+                "salary_min": salary_min,
+                "salary_max": salary_min + rng.randrange(0, 30) * 1_000_000,
+                "location_id": rng.randrange(1, 6),
+                "work_type_id": rng.randrange(1, 4),
+                "experience_level": rng.choice(["intern", "junior", "middle", "senior"]),
+                "created_at": (start + timedelta(minutes=job_id)).isoformat(),
+                "tags": [str(rng.randrange(1, 200)) for _ in range(5)]
+            }
+        }
+
+async def generate(count: int, seed: int):
+    es = es_manager.es
+    if await es.indices.exists(index=BENCH_INDEX):
+        await es.indices.delete(index=BENCH_INDEX)
+    config = copy.deepcopy(es_manager.indices["jobs"])
+    config["settings"]["index"] = {"refresh_interval": "-1", "number_of_replicas": 0}
+    await es.indices.create(index=BENCH_INDEX, body=config)
+    started = time.perf_counter()
+    indexed, _ = await async_bulk(es_manager.bulk_client(), synthetic_documents(count, seed), chunk_size=5000)
+    await es.indices.put_settings(index=BENCH_INDEX, settings={"index": {"refresh_interval": "1s"}})
+    await es.indices.refresh(index=BENCH_INDEX)
+    await es.indices.forcemerge(index=BENCH_INDEX, max_num_segments=1)
+    print(f"indexed {indexed} docs in {time.perf_counter() - started:.1f}s", flush=True)
+
+def broad_queries() -> Dict[str, Dict[str, Any]]:
+    return {
+        "match_all": {"match_all": {}},
+        "common_term": {"multi_match": {"query": "developer", "fields": ["title", "description"]}},
+        "filter_only": {"bool": {"filter": [{"term": {"location_id": 1}}]}},
+        "term_and_filter": {"bool": {
+            "must": [{"multi_match": {"query": "python engineer", "fields": ["title", "description"]}}],
+            "filter": [{"range": {"salary_min": {"gte": 10_000_000}}}]
+        }}
+    }
+
+async def measure(index_name: str, query: Dict[str, Any], track_total_hits: Union[bool, int], runs: int) -> List[float]:
+    body = es_manager.build_search_body(
+        query,
+        size=10,
+        sort=[{"created_at": {"order": "desc"}}, {"id": {"order": "desc"}}],
+        track_total_hits=track_total_hits
+    )
+    es = es_manager.es.options(request_timeout=60)
+    # Lần đầu làm nóng cache của ES, không tính
+    await es.search(index=index_name, body=body, request_cache=False)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await es.search(index=index_name, body=body, request_cache=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+async def run(args):
+    index_name = args.index
+    if args.generate:
+        await generate(args.generate, args.seed)
+        index_name = BENCH_INDEX
+    try:
+        total = (await es_manager.es.count(index=index_name))["count"]
+        print(f"index={index_name}  docs={total}  runs={args.runs}")
+        modes: List[Union[bool, int]] = [True, *(c for c in args.ceilings if c > 0), False]
+        for name, query in broad_queries().items():
+            for mode in modes:
+                latencies = await measure(index_name, query, mode, args.runs)
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(f"{name:16} track_total_hits={str(mode):6}  mean={statistics.mean(latencies):7.1f}ms  "
+                      f"p50={latencies[len(latencies) // 2]:7.1f}ms  p95={p95:7.1f}ms", flush=True)
+    finally:
+        if args.generate and not args.keep:
+            await es_manager.es.indices.delete(index=BENCH_INDEX)
+        await close_elasticsearch()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bounded vs exact total-hit counting")
+    parser.add_argument("--index", default="jobs")
+    parser.add_argument("--generate", type=int, default=0, help="Tạo index tổng hợp với số document này")
+    parser.add_argument("--keep", action="store_true", help="Giữ lại index tổng hợp")
+    parser.add_argument("--ceilings", type=int, nargs="*", default=[settings.SEARCH_TOTAL_HITS_CEILING, 1000])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Báo cho mọi worker nạp lại tags/locations/work_types sau khi sửa các bảng này
+trực tiếp trong MySQL (script SQL, migration). Worker kiểm tra version mỗi
+REFERENCE_DATA_POLL_SECONDS giây:
+
+    python -m app.commands.bump_reference_data
+"""
+import argparse
+from app.services.reference_data_service import bump_reference_version
+
+def main():
+    parser = argparse.ArgumentParser(description="Make every worker reload the cached tags, locations and work types")
+    parser.parse_args()
+    version = bump_reference_version()
+    print(f"reference data version is now {version}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Đo thời gian bcrypt theo cost factor để chọn BCRYPT_ROUNDS.
+
+Chạy: python -m app.commands.calibrate_bcrypt --target-ms 250
+"""
+import argparse
+import time
+from passlib.context import CryptContext
+
+def measure(rounds: int, samples: int) -> float:
+    """Thời gian trung bình (ms) của một lần hash với cost factor cho trước"""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    context.hash("calibration")  # warm up
+    start = time.perf_counter()
+    for _ in range(samples):
+        context.hash("calibration")
+    return (time.perf_counter() - start) * 1000 / samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate bcrypt cost factor")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Thời gian hash tối đa mong muốn")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    recommended = args.min_rounds
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed = measure(rounds, args.samples)
+        print(f"rounds={rounds:2d}  {elapsed:8.1f} ms/hash  ~{1000 / elapsed:6.1f} hash/s/core")
+        if elapsed <= args.target_ms:
+            recommended = rounds
+    print(f"Recommended BCRYPT_ROUNDS={recommended} (target {args.target_ms:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
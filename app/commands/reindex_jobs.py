@@ -0,0 +1,215 @@
+"""Dựng lại index jobs từ MySQL rồi chuyển alias sang index mới, không downtime.
+
+Thay đổi của job trong lúc nạp (tạo, sửa, xóa) vẫn được job indexer ghi vào index
+cũ; chúng được ghi lại trong Redis và đưa lại vào outbox sau khi chuyển alias.
+
+Chạy: python -m app.commands.reindex_jobs --batch-size 2000 --concurrency 4
+"""
+import argparse
+import asyncio
+import copy
+import time
+from typing import Any, Dict, Iterator, List
+from elasticsearch.helpers import async_bulk
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from app.core.elasticsearch_manager import es_manager
+from app.db.database import SessionLocal
+from app.db.redis_db import get_redis
+from app.models.job import Job
+from app.services.job_indexer import (
+    OUTBOX_UPSERT,
+    REINDEX_ACTIVE_KEY,
+    REINDEX_CHANGES_KEY,
+    build_job_document,
+    enqueue_job
+)
+from app.services.suggest_service import title_popularity
+
+redis_client = get_redis()
+
+JOBS_ALIAS = "jobs"
+# Marker tự hết hạn nếu tiến trình reindex bị kill giữa chừng
+REINDEX_MARKER_SECONDS = 24 * 3600
+
+class Progress:
+    def __init__(self, total: int, interval: float):
+        self.total = total
+        self.interval = interval
+        self.indexed = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def add(self, indexed: int, failed: int):
+        self.indexed += indexed
+        self.failed += failed
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.indexed / elapsed if elapsed else 0.0
+        percent = self.indexed * 100 / self.total if self.total else 100.0
+        print(f"{self.indexed}/{self.total} ({percent:5.1f}%)  failed={self.failed}  "
+              f"{rate:8.0f} docs/s  {elapsed:6.1f}s", flush=True)
+
+def stream_documents(db: Session, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Đọc jobs theo keyset (id > id cuối của batch trước), bộ nhớ không tăng theo số dòng.
+
+    Không dùng yield_per: với cursor không buffer của pymysql, câu IN của selectinload
+    chạy trên cùng connection làm mất các dòng chưa đọc của batch sau.
+    """
+    last_id = 0
+    while True:
+        jobs = db.scalars(
+            select(Job)
+            .where(Job.id > last_id)
+            .options(selectinload(Job.tags))
+            .order_by(Job.id)
+            .limit(batch_size)
+        ).all()
+        if not jobs:
+            return
+        title_counts = title_popularity(db, (job.title for job in jobs))
+        yield [build_job_document(job, title_counts) for job in jobs]
+        last_id = jobs[-1].id
+        db.expunge_all()
+
+async def bulk_worker(index_name: str, queue: asyncio.Queue, progress: Progress, chunk_size: int):
+    while True:
+        documents = await queue.get()
+        if documents is None:
+            return
+        # Version 0: mọi thay đổi qua outbox (version là id outbox, từ 1) đều mới hơn
+        actions = (
+            {"_index": index_name, "_id": doc["id"], "_version": 0, "_version_type": "external", "_source": doc}
+            for doc in documents
+        )
+        indexed, errors = await async_bulk(
+            es_manager.bulk_client(),
+            actions,
+            chunk_size=chunk_size,
+            max_retries=3,
+            raise_on_error=False
+        )
+        progress.add(indexed, len(errors))
+
+async def load(db: Session, index_name: str, progress: Progress, args):
+    """Producer đọc MySQL trong thread, nhiều worker gửi bulk song song"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    workers = [
+        asyncio.create_task(bulk_worker(index_name, queue, progress, args.chunk_size))
+        for _ in range(args.concurrency)
+    ]
+    batches = stream_documents(db, args.batch_size)
+    try:
+        while True:
+            documents = await asyncio.to_thread(next, batches, None)
+            if documents is None:
+                break
+            await queue.put(documents)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except BaseException:
+        for worker in workers:
+            worker.cancel()
+        raise
+
+async def swap_alias(index_name: str, keep_old: bool) -> List[str]:
+    """Chuyển alias trong một lệnh update_aliases nên search không bị gián đoạn"""
+    es = es_manager.es
+    actions = [{"add": {"index": index_name, "alias": JOBS_ALIAS}}]
+    old_indices = []
+    if await es.indices.exists_alias(name=JOBS_ALIAS):
+        old_indices = list((await es.indices.get_alias(name=JOBS_ALIAS)).keys())
+        actions = [{"remove": {"index": old, "alias": JOBS_ALIAS}} for old in old_indices] + actions
+    elif await es.indices.exists(index=JOBS_ALIAS):
+        # Lần đầu: "jobs" đang là index thật, xóa nó cùng lúc với việc tạo alias
+        actions.append({"remove_index": {"index": JOBS_ALIAS}})
+    await es.indices.update_aliases(actions=actions)
+
+    if not keep_old:
+        for old in old_indices:
+            await es.indices.delete(index=old)
+    return old_indices
+
+def requeue_changes(db: Session, batch_size: int) -> int:
+    """Đưa lại vào outbox các job đã đồng bộ vào index cũ trong lúc nạp.
+
+    Indexer đọc trạng thái mới nhất từ MySQL: job còn tồn tại được index lại, job
+    đã xóa được xóa khỏi index mới.
+    """
+    # Sau khi chuyển alias, thay đổi mới đi thẳng vào index mới
+    redis_client.delete(REINDEX_ACTIVE_KEY)
+    job_ids = sorted(int(job_id) for job_id in redis_client.smembers(REINDEX_CHANGES_KEY))
+    for start in range(0, len(job_ids), batch_size):
+        for job_id in job_ids[start:start + batch_size]:
+            enqueue_job(db, job_id, OUTBOX_UPSERT)
+        db.commit()
+    redis_client.delete(REINDEX_CHANGES_KEY)
+    return len(job_ids)
+
+async def reindex(args):
+    es = es_manager.es
+    index_name = f"{JOBS_ALIAS}_{time.strftime('%Y%m%d%H%M%S')}"
+    config = copy.deepcopy(es_manager.indices["jobs"])
+    # Tắt refresh và replica trong lúc nạp, bật lại sau khi xong
+    config["settings"]["index"] = {"refresh_interval": "-1", "number_of_replicas": 0}
+    await es.indices.create(index=index_name, body=config)
+    print(f"Created {index_name}", flush=True)
+
+    # Từ đây các job indexer ghi lại job_id mà chúng đồng bộ (vào index cũ)
+    redis_client.delete(REINDEX_CHANGES_KEY)
+    redis_client.set(REINDEX_ACTIVE_KEY, index_name, ex=REINDEX_MARKER_SECONDS)
+    db = SessionLocal()
+    try:
+        # Đếm và đọc trong cùng một transaction (REPEATABLE READ) nên cùng một snapshot
+        total = db.scalar(select(func.count(Job.id)))
+        progress = Progress(total, args.report_interval)
+        await load(db, index_name, progress, args)
+        progress.report()
+        db.commit()
+
+        await es.indices.put_settings(
+            index=index_name,
+            settings={"index": {"refresh_interval": args.refresh_interval, "number_of_replicas": args.replicas}}
+        )
+        await es.indices.refresh(index=index_name)
+        if progress.failed and not args.allow_failures:
+            raise RuntimeError(f"{progress.failed} documents failed, alias not swapped")
+        if progress.indexed + progress.failed != total:
+            raise RuntimeError(f"Only {progress.indexed + progress.failed} of {total} jobs were indexed, alias not swapped")
+
+        old_indices = await swap_alias(index_name, args.keep_old)
+        print(f"Alias {JOBS_ALIAS} -> {index_name} (previous: {', '.join(old_indices) or 'none'})", flush=True)
+
+        requeued = requeue_changes(db, args.batch_size)
+        print(f"Requeued {requeued} jobs changed during reindex", flush=True)
+    except BaseException:
+        if not await es.indices.exists_alias(name=JOBS_ALIAS, index=index_name):
+            await es.indices.delete(index=index_name, ignore_unavailable=True)
+        raise
+    finally:
+        redis_client.delete(REINDEX_ACTIVE_KEY)
+        db.close()
+        await es_manager.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the jobs index and swap the alias")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Số dòng đọc từ MySQL mỗi batch")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Số document mỗi request bulk")
+    parser.add_argument("--concurrency", type=int, default=4, help="Số request bulk chạy song song")
+    parser.add_argument("--replicas", type=int, default=1, help="Số replica sau khi nạp xong")
+    parser.add_argument("--refresh-interval", default="1s", help="refresh_interval sau khi nạp xong")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Chu kỳ in tiến độ (giây)")
+    parser.add_argument("--keep-old", action="store_true", help="Không xóa index cũ sau khi chuyển alias")
+    parser.add_argument("--allow-failures", action="store_true", help="Vẫn chuyển alias khi có document lỗi")
+    args = parser.parse_args()
+    asyncio.run(reindex(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Tính trước danh sách job tương tự (TF-IDF trên tiêu đề, mô tả và tags).
+
+Dựng lại toàn bộ (chạy định kỳ, ví dụ mỗi đêm):
+
+    python -m app.commands.similar_jobs build --batch-size 2000 --similarity-batch 256
+
+Cập nhật tăng dần khi job được tạo/sửa/xóa (tiến trình chạy liên tục):
+
+    python -m app.commands.similar_jobs follow
+"""
+import argparse
+import logging
+import queue
+import time
+from collections import Counter
+from typing import Iterator, List, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.events import event_bus
+from app.db.database import SessionLocal
+from app.db.redis_db import get_redis
+from app.models.job import Job
+from app.services.similar_jobs_service import (
+    SIMILAR_JOB_CHANNEL,
+    SimilarityIndex,
+    TfidfModel,
+    job_tokens,
+    refresh_job,
+    store_neighbors
+)
+
+logger = logging.getLogger(__name__)
+redis_client = get_redis()
+
+def stream_tokens(db: Session, batch_size: int) -> Iterator[Tuple[List[int], List[List[str]]]]:
+    """Đọc jobs theo keyset (id > id cuối của batch trước), tags bằng một câu IN mỗi batch.
+
+    Không dùng yield_per: câu IN của selectinload trên cùng connection làm pymysql
+    bỏ các dòng chưa đọc của cursor không buffer.
+    """
+    last_id = 0
+    while True:
+        jobs = db.scalars(
+            select(Job)
+            .where(Job.id > last_id)
+            .options(selectinload(Job.tags))
+            .order_by(Job.id)
+            .limit(batch_size)
+        ).all()
+        if not jobs:
+            return
+        yield [job.id for job in jobs], [job_tokens(job) for job in jobs]
+        last_id = jobs[-1].id
+        db.expunge_all()
+
+def build_index(db: Session, args) -> SimilarityIndex:
+    """Hai lượt đọc: đếm document frequency, rồi dựng ma trận TF-IDF"""
+    df: Counter = Counter()
+    documents = 0
+    for _, tokens in stream_tokens(db, args.batch_size):
+        for doc in tokens:
+            df.update(set(doc))
+        documents += len(tokens)
+    model = TfidfModel.from_document_frequencies(df, documents, args.min_df, args.max_features)
+    del df
+
+    job_ids: List[int] = []
+    chunks = []
+    for ids, tokens in stream_tokens(db, args.batch_size):
+        job_ids.extend(ids)
+        chunks.append(model.transform(tokens))
+    matrix = sp.vstack(chunks, format="csr") if chunks else sp.csr_matrix((0, len(model.vocabulary)), dtype=np.float32)
+    return SimilarityIndex(model, matrix, np.asarray(job_ids, dtype=np.int64))
+
+def build(args):
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        index = build_index(db, args)
+    finally:
+        db.close()
+    total = len(index)
+    print(f"TF-IDF: {total} jobs, {len(index.model.vocabulary)} terms, nnz={index.matrix.nnz} "
+          f"({time.perf_counter() - started:.1f}s)", flush=True)
+
+    # Mỗi batch nhân thưa (batch x N), bộ nhớ tỉ lệ với --similarity-batch
+    for start in range(0, total, args.similarity_batch):
+        end = min(start + args.similarity_batch, total)
+        results = index.neighbors(index.matrix[start:end], index.job_ids[start:end], args.count, args.min_score)
+        pipe = redis_client.pipeline(transaction=False)
+        for job_id, neighbors in zip(index.job_ids[start:end].tolist(), results):
+            store_neighbors(pipe, job_id, neighbors)
+        pipe.execute()
+        print(f"{end}/{total} jobs  {time.perf_counter() - started:6.1f}s", flush=True)
+
+    index.save(args.model_dir)
+    print(f"Saved model to {args.model_dir}", flush=True)
+
+def follow(args):
+    index = SimilarityIndex.load(args.model_dir)
+    print(f"Loaded {len(index)} jobs from {args.model_dir}", flush=True)
+    changed: queue.Queue = queue.Queue()
+    event_bus.subscribe(SIMILAR_JOB_CHANNEL, lambda message: changed.put(message["job_id"]))
+    event_bus.start()
+
+    # Sự kiện phát ra khi tiến trình này không chạy sẽ bị bỏ lỡ, lần build kế tiếp sẽ bù lại
+    dirty = False
+    last_save = time.monotonic()
+    try:
+        while True:
+            try:
+                job_id = changed.get(timeout=1)
+            except queue.Empty:
+                job_id = None
+            if job_id is not None:
+                db = SessionLocal()
+                try:
+                    refresh_job(db, index, job_id)
+                    dirty = True
+                except Exception:
+                    logger.exception("Failed to refresh similar jobs for job %s", job_id)
+                finally:
+                    db.close()
+            if dirty and time.monotonic() - last_save >= args.save_interval:
+                index.save(args.model_dir)
+                dirty = False
+                last_save = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        event_bus.stop()
+        if dirty:
+            index.save(args.model_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute similar-job neighbor lists")
+    parser.add_argument("--model-dir", default=settings.SIMILAR_JOBS_MODEL_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Rebuild the whole corpus")
+    build_parser.add_argument("--batch-size", type=int, default=2000, help="Số job đọc từ MySQL mỗi batch")
+    build_parser.add_argument("--similarity-batch", type=int, default=256, help="Số hàng mỗi phép nhân ma trận")
+    build_parser.add_argument("--count", type=int, default=settings.SIMILAR_JOBS_COUNT)
+    build_parser.add_argument("--min-score", type=float, default=settings.SIMILAR_JOBS_MIN_SCORE)
+    build_parser.add_argument("--min-df", type=int, default=2, help="Bỏ các từ xuất hiện ở ít job hơn")
+    build_parser.add_argument("--max-features", type=int, default=100_000)
+    build_parser.set_defaults(handler=build)
+
+    follow_parser = subparsers.add_parser("follow", help="Apply job changes incrementally")
+    follow_parser.add_argument("--save-interval", type=float, default=300, help="Số giây giữa các lần lưu model")
+    follow_parser.set_defaults(handler=follow)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,15 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 from app.core.config import settings
-from app.models.user import User, UserType
-from app.db.database import get_db
-from sqlalchemy.orm import Session
+from app.models.user import UserType
+from app.db.database import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import verify_token
-from app.services.auth_service import verify_token_in_redis
+from app.core.principal_cache import principal_cache
+from app.schemas.user import CurrentUser
+from app.services.auth_service import verify_session_and_get_snapshot, load_user_snapshot
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -22,7 +24,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    # Principal đã xác thực trong worker này thì bỏ qua Redis và MySQL
+    token_digest = principal_cache.digest(token)
+    cached_user = principal_cache.get(token_digest)
+    if cached_user:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -34,18 +42,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     
     username: str = payload.get("sub")
-    if username is None:
+    session_id: str = payload.get("sid")
+    if username is None or session_id is None:
         raise credentials_exception
     
-    if not verify_token_in_redis(username, token):
+    # Kiểm tra token và đọc snapshot user trong cùng một round trip Redis
+    valid, current_user = verify_session_and_get_snapshot(username, session_id, token)
+    if not valid:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    # Chỉ truy vấn MySQL khi snapshot chưa có
+    if current_user is None:
+        current_user = await load_user_snapshot(db, username)
+        if current_user is None:
+            raise credentials_exception
+
+    principal_cache.set(token_digest, current_user, payload["exp"])
+    return current_user
+
+async def get_current_session_id(
+    token: str = Depends(oauth2_scheme),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> str:
+    # Token đã được get_current_user xác thực
+    return verify_token(token)["sid"]
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)):
+async def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)):
     if not current_user.status:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -53,7 +75,7 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         )
     return current_user
 
-async def get_current_active_admin(current_user: User = Depends(get_current_active_user)):
+async def get_current_active_admin(current_user: CurrentUser = Depends(get_current_active_user)):
     if current_user.typeUser != UserType.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Tuple, TypeVar
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Circuit đang mở, không gọi tới dịch vụ phía sau"""
+
+class CircuitBreaker:
+    """Circuit breaker theo cửa sổ các lần gọi gần nhất trong từng worker.
+
+    Mở khi tỉ lệ lỗi hoặc tỉ lệ gọi chậm trong cửa sổ vượt ngưỡng. Sau
+    open_seconds cho một request thử (half-open): thành công thì đóng lại,
+    lỗi thì mở tiếp.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        is_failure: Callable[[BaseException], bool] = lambda e: True
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.is_failure = is_failure
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._set_state(STATE_CLOSED)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        probe = self._before_call()
+        start = time.perf_counter()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Request bị hủy không nói lên gì về dịch vụ phía sau
+            if probe:
+                with self._lock:
+                    self._probing = False
+            raise
+        except BaseException as e:
+            self._after_call(probe, failed=self.is_failure(e), elapsed=time.perf_counter() - start)
+            raise
+        self._after_call(probe, failed=False, elapsed=time.perf_counter() - start)
+        return result
+
+    def _before_call(self) -> bool:
+        """Trả về True nếu lần gọi này là request thử ở trạng thái half-open"""
+        with self._lock:
+            if self._state == STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    metrics.incr(f"circuit.{self.name}.rejected")
+                    raise CircuitOpenError(self.name)
+                self._set_state(STATE_HALF_OPEN)
+            if self._state == STATE_HALF_OPEN:
+                if self._probing:
+                    metrics.incr(f"circuit.{self.name}.rejected")
+                    raise CircuitOpenError(self.name)
+                self._probing = True
+                return True
+            return False
+
+    def _after_call(self, probe: bool, failed: bool, elapsed: float):
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if probe:
+                self._probing = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self._calls.clear()
+                    self._set_state(STATE_CLOSED)
+                return
+
+            self._calls.append((failed, slow))
+            if failed:
+                metrics.incr(f"circuit.{self.name}.failures")
+            if self._state != STATE_CLOSED or len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._calls if f)
+            slow_calls = sum(1 for _, s in self._calls if s)
+            if (failures / len(self._calls) >= self.failure_rate
+                    or slow_calls / len(self._calls) >= self.slow_call_rate):
+                self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self._set_state(STATE_OPEN)
+        metrics.incr(f"circuit.{self.name}.opened")
+
+    def _set_state(self, state: str):
+        self._state = state
+        metrics.set_gauge(f"circuit.{self.name}.open", 0 if state == STATE_CLOSED else 1)
@@ -18,6 +18,9 @@ class Settings(BaseSettings):
     DB_USER: str = os.getenv("DB_USER", "root")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "Sbac@19032003")
     DB_DATABASE: str = os.getenv("DB_DATABASE", "sbworkdb")
+    # Pool của async engine (aiomysql), dùng chung cho mọi request trong một worker
+    DB_ASYNC_POOL_SIZE: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "10"))
+    DB_ASYNC_MAX_OVERFLOW: int = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "20"))
     
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "redis-server")
@@ -38,12 +41,80 @@ class Settings(BaseSettings):
     ELASTICSEARCH_USERNAME: str = os.getenv("ELASTICSEARCH_USERNAME", "kibana")
     ELASTICSEARCH_PASSWORD: str = os.getenv("ELASTICSEARCH_PASSWORD", "MyPass123")
     ELASTICSEARCH_URL: str = f"{ELASTICSEARCH_HOST}:{ELASTICSEARCH_PORT}"
+    ELASTICSEARCH_MAX_CONNECTIONS: int = int(os.getenv("ELASTICSEARCH_MAX_CONNECTIONS", "25"))
+    ELASTICSEARCH_HTTP_COMPRESS: bool = os.getenv("ELASTICSEARCH_HTTP_COMPRESS", "true").lower() == "true"
+    ELASTICSEARCH_KEEPALIVE_SECONDS: float = float(os.getenv("ELASTICSEARCH_KEEPALIVE_SECONDS", "60"))
+    ELASTICSEARCH_REQUEST_TIMEOUT: float = float(os.getenv("ELASTICSEARCH_REQUEST_TIMEOUT", "10"))
+    ELASTICSEARCH_SEARCH_TIMEOUT: float = float(os.getenv("ELASTICSEARCH_SEARCH_TIMEOUT", "5"))
+    ELASTICSEARCH_SUGGEST_TIMEOUT: float = float(os.getenv("ELASTICSEARCH_SUGGEST_TIMEOUT", "1"))
+    ELASTICSEARCH_BULK_TIMEOUT: float = float(os.getenv("ELASTICSEARCH_BULK_TIMEOUT", "60"))
+    ELASTICSEARCH_MAX_RETRIES: int = int(os.getenv("ELASTICSEARCH_MAX_RETRIES", "1"))
+    ELASTICSEARCH_RETRY_ON_TIMEOUT: bool = os.getenv("ELASTICSEARCH_RETRY_ON_TIMEOUT", "false").lower() == "true"
+
+    # Job search cache settings
+    SEARCH_CACHE_TTL_SECONDS: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+    SEARCH_CACHE_STALE_SECONDS: int = int(os.getenv("SEARCH_CACHE_STALE_SECONDS", "600"))
+    SEARCH_CACHE_LOCK_SECONDS: int = int(os.getenv("SEARCH_CACHE_LOCK_SECONDS", "10"))
+    SEARCH_PIT_KEEP_ALIVE: str = os.getenv("SEARCH_PIT_KEEP_ALIVE", "1m")
+    SEARCH_FACET_SIZE: int = int(os.getenv("SEARCH_FACET_SIZE", "20"))
+    # Chỉ đếm tổng số kết quả tới ngưỡng này (0 = luôn đếm chính xác)
+    SEARCH_TOTAL_HITS_CEILING: int = int(os.getenv("SEARCH_TOTAL_HITS_CEILING", "10000"))
+    # Làm tròn filter lương theo bước này trước khi tạo cache key (0 = tắt)
+    SEARCH_SALARY_BUCKET: int = int(os.getenv("SEARCH_SALARY_BUCKET", "0"))
+
+    # Circuit breaker cho Elasticsearch search, chuyển sang MySQL khi mở
+    SEARCH_BREAKER_WINDOW: int = int(os.getenv("SEARCH_BREAKER_WINDOW", "20"))
+    SEARCH_BREAKER_MIN_CALLS: int = int(os.getenv("SEARCH_BREAKER_MIN_CALLS", "10"))
+    SEARCH_BREAKER_FAILURE_RATE: float = float(os.getenv("SEARCH_BREAKER_FAILURE_RATE", "0.5"))
+    SEARCH_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("SEARCH_BREAKER_SLOW_CALL_SECONDS", "2"))
+    SEARCH_BREAKER_SLOW_CALL_RATE: float = float(os.getenv("SEARCH_BREAKER_SLOW_CALL_RATE", "0.5"))
+    SEARCH_BREAKER_OPEN_SECONDS: float = float(os.getenv("SEARCH_BREAKER_OPEN_SECONDS", "30"))
+
+    # Job outbox indexer settings
+    JOB_INDEXER_ENABLED: bool = os.getenv("JOB_INDEXER_ENABLED", "true").lower() == "true"
+    JOB_OUTBOX_BATCH_SIZE: int = int(os.getenv("JOB_OUTBOX_BATCH_SIZE", "500"))
+    JOB_OUTBOX_POLL_SECONDS: float = float(os.getenv("JOB_OUTBOX_POLL_SECONDS", "1"))
+    JOB_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("JOB_OUTBOX_MAX_ATTEMPTS", "10"))
+    JOB_OUTBOX_MAX_BACKOFF_SECONDS: int = int(os.getenv("JOB_OUTBOX_MAX_BACKOFF_SECONDS", "300"))
+
+    # Job bulk import settings
+    JOB_IMPORT_BATCH_SIZE: int = int(os.getenv("JOB_IMPORT_BATCH_SIZE", "500"))
+    JOB_IMPORT_MAX_ROWS: int = int(os.getenv("JOB_IMPORT_MAX_ROWS", "50000"))
+
+    # Reference data cache (tags, locations, work types) settings (per worker)
+    REFERENCE_DATA_POLL_SECONDS: float = float(os.getenv("REFERENCE_DATA_POLL_SECONDS", "5"))
+
+    # Recommendation index settings
+    RECOMMEND_COMPACT_THRESHOLD: int = int(os.getenv("RECOMMEND_COMPACT_THRESHOLD", "10000"))
+    RECOMMEND_LOAD_MAX_BACKOFF_SECONDS: int = int(os.getenv("RECOMMEND_LOAD_MAX_BACKOFF_SECONDS", "300"))
+
+    # Similar jobs settings
+    SIMILAR_JOBS_COUNT: int = int(os.getenv("SIMILAR_JOBS_COUNT", "20"))
+    SIMILAR_JOBS_MIN_SCORE: float = float(os.getenv("SIMILAR_JOBS_MIN_SCORE", "0.05"))
+    SIMILAR_JOBS_MODEL_DIR: str = os.getenv("SIMILAR_JOBS_MODEL_DIR", "data/similar_jobs")
+
+    # Single-flight settings (per worker)
+    SINGLE_FLIGHT_MAX_WAITERS: int = int(os.getenv("SINGLE_FLIGHT_MAX_WAITERS", "100"))
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", "5"))
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    SLIDING_REFRESH_ENABLED: bool = os.getenv("SLIDING_REFRESH_ENABLED", "false").lower() == "true"
+    SLIDING_REFRESH_THRESHOLD_SECONDS: int = int(os.getenv("SLIDING_REFRESH_THRESHOLD_SECONDS", "300"))
+
+    # Principal cache settings (per worker)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    USER_SNAPSHOT_TTL_SECONDS: int = int(os.getenv("USER_SNAPSHOT_TTL_SECONDS", "3600"))
+
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
 
     # CORS settings
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = ["http://localhost:3000"]
@@ -57,6 +128,10 @@ class Settings(BaseSettings):
         database = self.DB_DATABASE
         return f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return self.DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+
     @property
     def REDIS_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
@@ -1,38 +1,111 @@
-from elasticsearch import AsyncElasticsearch
+import asyncio
+from typing import Optional
+import aiohttp
+from elasticsearch import AsyncElasticsearch, ApiError
+from elastic_transport import AiohttpHttpNode, TransportError
 from app.core.config import settings
+from app.core.metrics import metrics
 
-es = AsyncElasticsearch(
-    hosts=[f"{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}"],
-    basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
-    timeout=30,
-    max_retries=3,
-    retry_on_timeout=True
-)
+class PooledAiohttpNode(AiohttpHttpNode):
+    """Node aiohttp giữ kết nối keep-alive lâu hơn và đo mức sử dụng pool.
 
-async def init_elasticsearch():
-    # Create index if not exists
-    if not await es.indices.exists(index="jobs"):
-        await es.indices.create(
-            index="jobs",
-            body={
-                "mappings": {
-                    "properties": {
-                        "id": {"type": "integer"},
-                        "title": {"type": "text", "analyzer": "standard"},
-                        "description": {"type": "text", "analyzer": "standard"},
-                        "salary_min": {"type": "integer"},
-                        "salary_max": {"type": "integer"},
-                        "location_id": {"type": "integer"},
-                        "work_type_id": {"type": "integer"},
-                        "recruiter_id": {"type": "integer"},
-                        "experience_level": {"type": "keyword"},
-                        "industry": {"type": "keyword"},
-                        "created_at": {"type": "date"},
-                        "tags": {"type": "keyword"}
-                    }
-                }
-            }
+    Mỗi node có tối đa connections_per_node kết nối; request vượt quá phải
+    chờ kết nối rảnh (elasticsearch.pool.saturated, đếm theo từng node).
+    Gauge elasticsearch.pool.utilisation là tổng request đang chạy chia cho
+    tổng số kết nối của mọi node.
+    """
+
+    # Tổng của mọi node trong worker
+    in_flight = 0
+    capacity = 0
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._in_flight = 0
+        # Phần của node này trong capacity, về 0 khi node đã đóng (close có thể được gọi nhiều lần)
+        self._capacity = self._connections_per_node
+        PooledAiohttpNode.capacity += self._capacity
+
+    async def close(self) -> None:
+        PooledAiohttpNode.capacity -= self._capacity
+        self._capacity = 0
+        await super().close()
+
+    def _create_aiohttp_session(self) -> None:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            skip_auto_headers=("accept", "accept-encoding", "user-agent"),
+            auto_decompress=True,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            connector=aiohttp.TCPConnector(
+                limit_per_host=self._connections_per_node,
+                keepalive_timeout=settings.ELASTICSEARCH_KEEPALIVE_SECONDS,
+                use_dns_cache=True,
+                ssl=self._ssl_context or False
+            )
         )
 
+    async def perform_request(self, *args, **kwargs):
+        PooledAiohttpNode.in_flight += 1
+        self._in_flight += 1
+        self._report_pool()
+        metrics.incr("elasticsearch.requests")
+        try:
+            return await super().perform_request(*args, **kwargs)
+        except Exception:
+            metrics.incr("elasticsearch.request_errors")
+            raise
+        finally:
+            PooledAiohttpNode.in_flight -= 1
+            self._in_flight -= 1
+            self._report_pool()
+
+    def _report_pool(self):
+        in_flight = PooledAiohttpNode.in_flight
+        metrics.set_gauge("elasticsearch.pool.in_flight", in_flight)
+        metrics.set_gauge("elasticsearch.pool.utilisation", in_flight / max(PooledAiohttpNode.capacity, 1))
+        if self._in_flight > self._connections_per_node:
+            metrics.incr("elasticsearch.pool.saturated")
+
+_client: Optional[AsyncElasticsearch] = None
+
+def is_unavailable(error: BaseException) -> bool:
+    """Lỗi do Elasticsearch không sẵn sàng (mạng, timeout, quá tải), không phải do request sai"""
+    if isinstance(error, TransportError):
+        return True
+    return isinstance(error, ApiError) and (error.meta.status >= 500 or error.meta.status == 429)
+
+def create_elasticsearch_client() -> AsyncElasticsearch:
+    return AsyncElasticsearch(
+        settings.ELASTICSEARCH_URL,
+        basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
+        node_class=PooledAiohttpNode,
+        connections_per_node=settings.ELASTICSEARCH_MAX_CONNECTIONS,
+        http_compress=settings.ELASTICSEARCH_HTTP_COMPRESS,
+        request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+        max_retries=settings.ELASTICSEARCH_MAX_RETRIES,
+        retry_on_timeout=settings.ELASTICSEARCH_RETRY_ON_TIMEOUT
+    )
+
+def get_elasticsearch() -> AsyncElasticsearch:
+    """Client dùng chung cho toàn bộ worker.
+
+    Ứng dụng tạo client trong lifespan; các command chạy ngoài FastAPI sẽ
+    tạo ở lần gọi đầu tiên và tự gọi close_elasticsearch.
+    """
+    global _client
+    if _client is None:
+        _client = create_elasticsearch_client()
+        metrics.set_gauge("elasticsearch.pool.size", settings.ELASTICSEARCH_MAX_CONNECTIONS)
+    return _client
+
+async def init_elasticsearch():
+    get_elasticsearch()
+
 async def close_elasticsearch():
-    await es.close() 
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -1,11 +1,11 @@
 from elasticsearch import AsyncElasticsearch
 from app.core.config import settings
-from typing import Dict, Any, Optional
+from app.core.elasticsearch import get_elasticsearch, close_elasticsearch
+from typing import Dict, Any, List, Optional, Union
 import json
 
 class ElasticsearchManager:
     def __init__(self):
-        self.es = AsyncElasticsearch(settings.ELASTICSEARCH_URL, basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD))
         self.indices = {
             "jobs": {
                 "mappings": {
@@ -21,14 +21,21 @@ class ElasticsearchManager:
                         "experience_level": {"type": "keyword"},
                         "industry": {"type": "keyword"},
                         "created_at": {"type": "date"},
-                        "tags": {"type": "keyword"}
+                        "tags": {"type": "keyword"},
+                        "title_suggest": {"type": "completion", "analyzer": "suggest_analyzer"}
                     }
                 },
                 "settings": {
                     "analysis": {
                         "analyzer": {
                             "vi_analyzer": {
-                                "tokenizer": "vi_tokenizer"
+                                "tokenizer": "vi_tokenizer",
+                                "filter": ["lowercase"]
+                            },
+                            # Gợi ý không phân biệt hoa thường và dấu tiếng Việt
+                            "suggest_analyzer": {
+                                "tokenizer": "standard",
+                                "filter": ["lowercase", "asciifolding"]
                             }
                         }
                     }
@@ -82,6 +89,11 @@ class ElasticsearchManager:
             }
         }
 
+    @property
+    def es(self) -> AsyncElasticsearch:
+        """Client dùng chung, được tạo và đóng trong lifespan của ứng dụng"""
+        return get_elasticsearch()
+
     async def init_indices(self):
         """Khởi tạo tất cả các index"""
         for index_name, index_config in self.indices.items():
@@ -108,24 +120,99 @@ class ElasticsearchManager:
 
     async def search(self, index_name: str, query: Dict[str, Any], 
                     from_: int = 0, size: int = 10, 
-                    sort: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                    sort: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+                    search_after: Optional[List[Any]] = None,
+                    pit: Optional[Dict[str, str]] = None,
+                    post_filter: Optional[Dict[str, Any]] = None,
+                    aggs: Optional[Dict[str, Any]] = None,
+                    track_total_hits: Optional[Union[bool, int]] = None) -> Dict[str, Any]:
         """Tìm kiếm trong Elasticsearch"""
+        body = self.build_search_body(query, from_, size, sort, search_after, post_filter, aggs, track_total_hits)
+        if pit:
+            # Search theo point-in-time không được chỉ định index
+            body["pit"] = pit
+            index_name = None
+
+        return await self.es.options(request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT).search(
+            index=index_name,
+            body=body
+        )
+
+    async def msearch(self, index_name: str, bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Gửi nhiều search trong một request; lỗi của từng search nằm trong response của nó"""
+        searches = []
+        for body in bodies:
+            searches.extend([{"index": index_name}, body])
+        result = await self.es.options(request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT).msearch(
+            searches=searches
+        )
+        return result["responses"]
+
+    @staticmethod
+    def build_search_body(query: Dict[str, Any], from_: int = 0, size: int = 10,
+                          sort: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+                          search_after: Optional[List[Any]] = None,
+                          post_filter: Optional[Dict[str, Any]] = None,
+                          aggs: Optional[Dict[str, Any]] = None,
+                          track_total_hits: Optional[Union[bool, int]] = None) -> Dict[str, Any]:
         body = {
             "query": query,
-            "from": from_,
             "size": size
         }
+        if search_after is not None:
+            body["search_after"] = search_after
+        else:
+            body["from"] = from_
         if sort:
             body["sort"] = sort
+        if post_filter:
+            body["post_filter"] = post_filter
+        if aggs:
+            body["aggs"] = aggs
+        if track_total_hits is not None:
+            body["track_total_hits"] = track_total_hits
+        return body
 
-        return await self.es.search(
+    async def count(self, index_name: str, query: Dict[str, Any]) -> int:
+        """Đếm chính xác số document khớp query"""
+        result = await self.es.options(request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT).count(
             index=index_name,
-            body=body
+            query=query
         )
+        return result["count"]
+
+    async def suggest(self, index_name: str, field: str, prefix: str, size: int = 10,
+                      source_fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Gợi ý theo prefix bằng completion suggester (FST nằm trong bộ nhớ)"""
+        result = await self.es.options(request_timeout=settings.ELASTICSEARCH_SUGGEST_TIMEOUT).search(
+            index=index_name,
+            body={
+                "_source": source_fields or False,
+                "suggest": {
+                    field: {
+                        "prefix": prefix,
+                        "completion": {"field": field, "size": size, "skip_duplicates": True}
+                    }
+                }
+            }
+        )
+        return result["suggest"][field][0]["options"]
+
+    async def open_point_in_time(self, index_name: str, keep_alive: str) -> str:
+        """Mở snapshot point-in-time để duyệt nhiều trang nhất quán"""
+        result = await self.es.open_point_in_time(index=index_name, keep_alive=keep_alive)
+        return result["id"]
+
+    async def close_point_in_time(self, pit_id: str):
+        await self.es.close_point_in_time(body={"id": pit_id})
+
+    def bulk_client(self) -> AsyncElasticsearch:
+        """Client cho helpers bulk, với timeout dài hơn request thường"""
+        return self.es.options(request_timeout=settings.ELASTICSEARCH_BULK_TIMEOUT)
 
     async def close(self):
         """Đóng kết nối Elasticsearch"""
-        await self.es.close()
+        await close_elasticsearch()
 
 # Tạo instance global
 es_manager = ElasticsearchManager() 
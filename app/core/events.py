@@ -0,0 +1,63 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List
+from app.db.redis_db import get_redis
+
+logger = logging.getLogger(__name__)
+redis_client = get_redis()
+
+class EventBus:
+    """Phát và nhận sự kiện giữa các worker qua Redis pub/sub"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._pubsub = None
+        self._thread = None
+
+    def subscribe(self, channel: str, handler: Callable[[Dict[str, Any]], None]):
+        """Đăng ký handler cho một channel (gọi trước start)"""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def publish(self, channel: str, message: Dict[str, Any]):
+        """Gửi sự kiện tới tất cả các worker, kể cả worker hiện tại"""
+        redis_client.publish(channel, json.dumps(message))
+
+    def publish_many(self, channel: str, messages: List[Dict[str, Any]]):
+        """Gửi nhiều sự kiện cùng channel trong một round trip Redis"""
+        pipe = redis_client.pipeline(transaction=False)
+        for message in messages:
+            pipe.publish(channel, json.dumps(message))
+        pipe.execute()
+
+    def start(self):
+        """Bắt đầu lắng nghe trong một thread nền"""
+        if self._thread is not None or not self._handlers:
+            return
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: self._dispatch for channel in self._handlers})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def stop(self):
+        """Dừng thread lắng nghe"""
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def _dispatch(self, message: Dict[str, Any]):
+        channel = message["channel"]
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed event on %s", channel)
+            return
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(data)
+            except Exception:
+                logger.exception("Event handler failed on %s", channel)
+
+# Tạo instance global
+event_bus = EventBus()
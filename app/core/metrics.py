@@ -0,0 +1,28 @@
+import threading
+from collections import Counter
+from typing import Dict, Union
+
+Number = Union[int, float]
+
+class Metrics:
+    """Bộ đếm và gauge đơn giản trong từng worker"""
+
+    def __init__(self):
+        self._counters: Counter = Counter()
+        self._gauges: Dict[str, Number] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: Number = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: Number):
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self) -> Dict[str, Dict[str, Number]]:
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+# Tạo instance global
+metrics = Metrics()
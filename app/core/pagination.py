@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+# Header chứa cursor trang tiếp theo của các danh sách phân trang keyset
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    """Mã hóa trạng thái phân trang thành cursor opaque cho client"""
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        data = None
+    if not isinstance(data, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return data
+
+def keyset_page(query: Query, created_column, id_column, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Phân trang keyset theo (created_at, id) giảm dần.
+
+    Trang sau bắt đầu ngay sau dòng cuối của trang trước trên index
+    (created_at, id) nên chi phí mọi trang như nhau, không phụ thuộc độ sâu.
+    """
+    rows = _keyset_query(query, created_column, id_column, cursor, limit).all()
+    return _keyset_result(rows, created_column, id_column, limit)
+
+async def async_keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    created_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """Như keyset_page, cho câu select() chạy trên AsyncSession"""
+    result = await db.scalars(_keyset_query(stmt, created_column, id_column, cursor, limit))
+    return _keyset_result(result.all(), created_column, id_column, limit)
+
+def _keyset_query(query, created_column, id_column, cursor: Optional[str], limit: int):
+    """Áp dụng cursor, thứ tự và limit; dùng được cho cả Query và select()"""
+    if cursor:
+        state = decode_cursor(cursor)
+        try:
+            created_at = datetime.fromisoformat(state["created_at"])
+            last_id = int(state["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        # Điều kiện created_at <= ... giúp MySQL dùng range scan trên index
+        query = query.filter(
+            created_column <= created_at,
+            or_(created_column < created_at, and_(created_column == created_at, id_column < last_id))
+        )
+    return query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1)
+
+def _keyset_result(rows: List[Any], created_column, id_column, limit: int) -> Tuple[List[Any], Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            "created_at": getattr(last, created_column.key).isoformat(),
+            "id": getattr(last, id_column.key)
+        })
+    return rows, next_cursor
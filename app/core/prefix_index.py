@@ -0,0 +1,58 @@
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, List, Tuple
+
+def normalize(text: str) -> str:
+    """Chữ thường, bỏ dấu tiếng Việt để gõ "ha noi" vẫn khớp "Hà Nội" """
+    text = text.strip().lower().replace("đ", "d")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+class PrefixIndex:
+    """Danh sách tên đã chuẩn hóa được sắp xếp, tra prefix bằng bisect.
+
+    Mỗi entry là (kind, id, name), xếp hạng theo số job đang dùng entry đó.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str, int]] = []
+        self._names: Dict[Tuple[str, int], str] = {}
+        self._popularity: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def load(self, entries: List[Tuple[str, int, str]], popularity: Dict[Tuple[str, int], int]):
+        """Thay toàn bộ index (lúc khởi động)"""
+        keys = sorted((normalize(name), kind, id_) for kind, id_, name in entries)
+        with self._lock:
+            self._keys = keys
+            self._names = {(kind, id_): name for kind, id_, name in entries}
+            self._popularity = Counter(popularity)
+
+    def add(self, kind: str, id_: int, name: str):
+        with self._lock:
+            if (kind, id_) in self._names:
+                return
+            self._names[(kind, id_)] = name
+            insort(self._keys, (normalize(name), kind, id_))
+
+    def incr(self, kind: str, id_: int, value: int = 1):
+        with self._lock:
+            self._popularity[(kind, id_)] += value
+
+    def search(self, prefix: str, limit: int = 10) -> List[Tuple[str, int, str, int]]:
+        """Trả về [(kind, id, name, popularity)] khớp prefix, phổ biến nhất trước"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            start = bisect_left(self._keys, (prefix,))
+            matches = []
+            for i in range(start, len(self._keys)):
+                key, kind, id_ = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                matches.append((kind, id_, self._names[(kind, id_)], self._popularity[(kind, id_)]))
+        matches.sort(key=lambda match: (-match[3], match[2]))
+        return matches[:limit]
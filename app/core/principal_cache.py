@@ -0,0 +1,85 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.events import event_bus
+from app.schemas.user import CurrentUser
+
+AUTH_EVICT_CHANNEL = "auth:evict"
+
+class PrincipalCache:
+    """Cache người dùng đã xác thực trong từng worker, key là digest của token"""
+
+    def __init__(self, max_entries: int, max_ttl: int):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[float, CurrentUser]]" = OrderedDict()
+        self._by_username: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token_digest: str) -> Optional[CurrentUser]:
+        with self._lock:
+            entry = self._entries.get(token_digest)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.time():
+                self._remove(token_digest)
+                return None
+            self._entries.move_to_end(token_digest)
+            return user
+
+    def set(self, token_digest: str, user: CurrentUser, token_exp: float):
+        """Lưu principal, thời gian sống không vượt quá exp của JWT"""
+        expires_at = min(token_exp, time.time() + self.max_ttl)
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._remove(token_digest)
+            self._entries[token_digest] = (expires_at, user)
+            self._by_username.setdefault(user.username, set()).add(token_digest)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def evict_user(self, username: str):
+        with self._lock:
+            for token_digest in self._by_username.pop(username, set()):
+                self._entries.pop(token_digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_username.clear()
+
+    def _remove(self, token_digest: str):
+        entry = self._entries.pop(token_digest, None)
+        if entry is None:
+            return
+        digests = self._by_username.get(entry[1].username)
+        if digests is not None:
+            digests.discard(token_digest)
+            if not digests:
+                del self._by_username[entry[1].username]
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    max_ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def evict_principal(username: str):
+    """Xóa principal của user khỏi cache ở mọi worker (logout, khóa tài khoản...)"""
+    principal_cache.evict_user(username)
+    event_bus.publish(AUTH_EVICT_CHANNEL, {"username": username})
+
+def _on_evict(message: dict):
+    username = message.get("username")
+    if username:
+        principal_cache.evict_user(username)
+
+event_bus.subscribe(AUTH_EVICT_CHANNEL, _on_evict)
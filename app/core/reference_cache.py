@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+from app.core.prefix_index import normalize
+from app.schemas.job import TagResponse, LocationResponse, WorkTypeResponse
+
+class ReferenceCache:
+    """Bản sao trong từng worker của các bảng nhỏ tags, locations, work_types.
+
+    Mỗi lần nạp hoặc bổ sung tạo dict mới và thay thế nguyên khối, nên đọc
+    không cần lock; version là giá trị counter trong Redis lúc nạp.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._tags: Dict[int, TagResponse] = {}
+        # Tên tag đã chuẩn hóa (normalize) -> id
+        self._tag_ids_by_name: Dict[str, int] = {}
+        self._locations: Dict[int, LocationResponse] = {}
+        self._work_types: Dict[int, WorkTypeResponse] = {}
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        tags: Iterable[TagResponse],
+        locations: Iterable[LocationResponse],
+        work_types: Iterable[WorkTypeResponse],
+        version: Optional[int]
+    ):
+        tags = {tag.id: tag for tag in tags}
+        locations = {location.id: location for location in locations}
+        work_types = {work_type.id: work_type for work_type in work_types}
+        tag_ids_by_name = {normalize(tag.name): tag.id for tag in tags.values()}
+        with self._lock:
+            self._tags, self._locations, self._work_types = tags, locations, work_types
+            self._tag_ids_by_name = tag_ids_by_name
+            self.version = version
+
+    def add(
+        self,
+        tags: Iterable[TagResponse] = (),
+        locations: Iterable[LocationResponse] = (),
+        work_types: Iterable[WorkTypeResponse] = ()
+    ):
+        """Bổ sung entry mới tạo sau lần nạp gần nhất (chưa có trong snapshot)"""
+        tags = list(tags)
+        with self._lock:
+            self._tags = {**self._tags, **{tag.id: tag for tag in tags}}
+            self._tag_ids_by_name = {**self._tag_ids_by_name, **{normalize(tag.name): tag.id for tag in tags}}
+            self._locations = {**self._locations, **{location.id: location for location in locations}}
+            self._work_types = {**self._work_types, **{work_type.id: work_type for work_type in work_types}}
+
+    def tag(self, tag_id: int) -> Optional[TagResponse]:
+        return self._tags.get(tag_id)
+
+    def tag_id_by_name(self, name: str) -> Optional[int]:
+        """Tra tag theo tên, không phân biệt hoa thường và dấu tiếng Việt"""
+        return self._tag_ids_by_name.get(normalize(name))
+
+    def location(self, location_id: Optional[int]) -> Optional[LocationResponse]:
+        return self._locations.get(location_id)
+
+    def work_type(self, work_type_id: Optional[int]) -> Optional[WorkTypeResponse]:
+        return self._work_types.get(work_type_id)
+
+    def missing_tags(self, tag_ids: Iterable[int]) -> List[int]:
+        tags = self._tags
+        return [tag_id for tag_id in set(tag_ids) if tag_id not in tags]
+
+    def missing_locations(self, location_ids: Iterable[int]) -> List[int]:
+        locations = self._locations
+        return [location_id for location_id in set(location_ids) if location_id not in locations]
+
+    def missing_work_types(self, work_type_ids: Iterable[int]) -> List[int]:
+        work_types = self._work_types
+        return [work_type_id for work_type_id in set(work_type_ids) if work_type_id not in work_types]
+
+    def __len__(self) -> int:
+        return len(self._tags) + len(self._locations) + len(self._work_types)
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+class _AsyncCall:
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+class SingleFlight:
+    """Gộp các lời gọi đồng thời cùng key trong một worker thành một lần thực thi.
+
+    Số request chờ mỗi key bị giới hạn bởi max_waiters và mỗi request chỉ chờ
+    tối đa timeout giây; vượt quá thì request tự thực thi như bình thường.
+    """
+
+    def __init__(self, name: str, max_waiters: int, timeout: float):
+        self.name = name
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self._calls: Dict[str, _AsyncCall] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is not None and call.waiters < self.max_waiters:
+            call.waiters += 1
+            metrics.incr(f"single_flight.{self.name}.shared")
+            try:
+                return await asyncio.wait_for(asyncio.shield(call.future), self.timeout)
+            except asyncio.TimeoutError:
+                metrics.incr(f"single_flight.{self.name}.timeout")
+                return await fn()
+            except asyncio.CancelledError:
+                # Request dẫn đầu bị hủy (client ngắt kết nối): tự thực thi
+                if not call.future.cancelled():
+                    raise
+                return await fn()
+            finally:
+                call.waiters -= 1
+        if call is not None:
+            metrics.incr(f"single_flight.{self.name}.overflow")
+            return await fn()
+
+        future = asyncio.get_running_loop().create_future()
+        # Tránh cảnh báo "exception was never retrieved" khi không có ai chờ
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = _AsyncCall(future)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+def single_flight(name: str) -> SingleFlight:
+    return SingleFlight(
+        name,
+        max_waiters=settings.SINGLE_FLIGHT_MAX_WAITERS,
+        timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS
+    )
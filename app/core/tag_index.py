@@ -0,0 +1,142 @@
+import math
+import threading
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+class TagJobIndex:
+    """Inverted index tag -> vị trí job (mảng NumPy), chấm điểm vector hóa.
+
+    Mỗi job có một vị trí trong các mảng _job_ids/_alive. Cập nhật tăng dần:
+    job đổi tags được ghi sang vị trí mới, vị trí cũ bị đánh dấu xóa; posting
+    mới nằm trong buffer và được gộp (compact) khi đủ compact_threshold thay đổi.
+    """
+
+    def __init__(self, compact_threshold: int = 10000):
+        self.compact_threshold = compact_threshold
+        self._job_ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._alive_count = 0
+        self._positions: Dict[int, int] = {}
+        self._postings: Dict[int, np.ndarray] = {}
+        self._pending: Dict[int, List[int]] = {}
+        self._changes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._alive_count
+
+    def load(self, job_ids: np.ndarray, tag_ids: np.ndarray):
+        """Nạp lại toàn bộ từ các cặp (job_id, tag_id)"""
+        unique_jobs = np.unique(job_ids)
+        positions = np.searchsorted(unique_jobs, job_ids)
+        order = np.argsort(tag_ids, kind="stable")
+        sorted_tags = tag_ids[order]
+        sorted_positions = positions[order].astype(np.int64)
+        tags, starts = np.unique(sorted_tags, return_index=True)
+        ends = np.append(starts[1:], len(sorted_tags))
+        postings = {
+            int(tag): np.unique(sorted_positions[start:end])
+            for tag, start, end in zip(tags, starts, ends)
+        }
+
+        with self._lock:
+            self._job_ids = unique_jobs.astype(np.int64)
+            self._alive = np.ones(len(unique_jobs), dtype=bool)
+            self._size = self._alive_count = len(unique_jobs)
+            self._positions = {int(job_id): i for i, job_id in enumerate(unique_jobs)}
+            self._postings = postings
+            self._pending = {}
+            self._changes = 0
+
+    def upsert(self, job_id: int, tag_ids: Iterable[int]):
+        tag_ids = set(tag_ids)
+        with self._lock:
+            self._remove(job_id)
+            if tag_ids:
+                position = self._append(job_id)
+                for tag_id in tag_ids:
+                    self._pending.setdefault(tag_id, []).append(position)
+            self._changes += 1
+            if self._changes >= self.compact_threshold:
+                self._compact()
+
+    def remove(self, job_id: int):
+        with self._lock:
+            if self._remove(job_id):
+                self._changes += 1
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def top_k(self, tag_ids: Iterable[int], k: int) -> List[Tuple[int, float]]:
+        """k job khớp nhiều tag nhất, mỗi tag có trọng số IDF; trả về [(job_id, score)]"""
+        with self._lock:
+            scores = np.zeros(self._size, dtype=np.float32)
+            for tag_id in set(tag_ids):
+                postings = self._postings_for(tag_id)
+                if len(postings):
+                    # Posting trong cùng một tag không trùng nhau nên cộng trực tiếp được
+                    scores[postings] += math.log(1 + self._alive_count / len(postings))
+            scores[~self._alive[:self._size]] = 0
+
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            # Điểm cao trước, cùng điểm thì job mới (id lớn) trước
+            job_ids = self._job_ids[candidates]
+            order = np.lexsort((-job_ids, -scores[candidates]))
+            return list(zip(job_ids[order].tolist(), scores[candidates][order].tolist()))
+
+    def _postings_for(self, tag_id: int) -> np.ndarray:
+        base = self._postings.get(tag_id)
+        pending = self._pending.get(tag_id)
+        if not pending:
+            return base if base is not None else np.zeros(0, dtype=np.int64)
+        pending = np.asarray(pending, dtype=np.int64)
+        return pending if base is None else np.concatenate([base, pending])
+
+    def _append(self, job_id: int) -> int:
+        if self._size == len(self._job_ids):
+            capacity = max(1024, len(self._job_ids) * 2)
+            self._job_ids = np.resize(self._job_ids, capacity)
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self._size] = self._alive[:self._size]
+            self._alive = alive
+        position = self._size
+        self._job_ids[position] = job_id
+        self._alive[position] = True
+        self._positions[job_id] = position
+        self._size += 1
+        self._alive_count += 1
+        return position
+
+    def _remove(self, job_id: int) -> bool:
+        position = self._positions.pop(job_id, None)
+        if position is None:
+            return False
+        self._alive[position] = False
+        self._alive_count -= 1
+        return True
+
+    def _compact(self):
+        """Gộp buffer vào posting và bỏ các vị trí đã xóa, đánh số lại vị trí"""
+        alive_positions = np.flatnonzero(self._alive[:self._size])
+        remap = np.full(self._size, -1, dtype=np.int64)
+        remap[alive_positions] = np.arange(len(alive_positions))
+
+        postings = {}
+        for tag_id in set(self._postings) | set(self._pending):
+            positions = remap[self._postings_for(tag_id)]
+            positions = np.sort(positions[positions >= 0])
+            if len(positions):
+                postings[tag_id] = positions
+
+        self._job_ids = self._job_ids[alive_positions]
+        self._alive = np.ones(len(alive_positions), dtype=bool)
+        self._size = len(alive_positions)
+        self._positions = {int(job_id): i for i, job_id in enumerate(self._job_ids)}
+        self._postings = postings
+        self._pending = {}
+        self._changes = 0
@@ -0,0 +1,35 @@
+"""create job_outbox
+
+Revision ID: 8c1f4e2a7b3d
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1f4e2a7b3d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.Enum('upsert', 'delete', name='job_outbox_operation'), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('available_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_outbox_available_at', 'job_outbox', ['available_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_outbox_available_at', table_name='job_outbox')
+    op.drop_table('job_outbox')
@@ -0,0 +1,36 @@
+"""add job search indexes
+
+Revision ID: b27d9e5c4a18
+Revises: 8c1f4e2a7b3d
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b27d9e5c4a18'
+down_revision = '8c1f4e2a7b3d'
+branch_labels = None
+depends_on = None
+
+FILTER_INDEXES = {
+    'ix_jobs_experience_level': ['experience_level'],
+    'ix_jobs_industry': ['industry'],
+    'ix_jobs_created_at': ['created_at'],
+    'ix_jobs_salary_min': ['salary_min'],
+    'ix_jobs_salary_max': ['salary_max'],
+}
+
+
+def upgrade() -> None:
+    op.create_index('ft_jobs_title_description', 'jobs', ['title', 'description'], mysql_prefix='FULLTEXT')
+    for name, columns in FILTER_INDEXES.items():
+        op.create_index(name, 'jobs', columns)
+
+
+def downgrade() -> None:
+    for name in FILTER_INDEXES:
+        op.drop_index(name, table_name='jobs')
+    op.drop_index('ft_jobs_title_description', table_name='jobs')
@@ -0,0 +1,34 @@
+"""add keyset pagination indexes
+
+Revision ID: d41a7c9e2f60
+Revises: b27d9e5c4a18
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c9e2f60'
+down_revision = 'b27d9e5c4a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Index ghép thay cho ix_jobs_created_at, dùng cho ORDER BY created_at DESC, id DESC
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'])
+    op.drop_index('ix_jobs_created_at', table_name='jobs')
+    op.create_index('ix_users_created_at_id', 'users', ['createdAt', 'id'])
+    # Bảng profiles được tạo từ model, có thể chưa tồn tại trên database cũ
+    if sa.inspect(op.get_bind()).has_table('profiles'):
+        op.create_index('ix_profiles_created_at_id', 'profiles', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('profiles'):
+        op.drop_index('ix_profiles_created_at_id', table_name='profiles')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.create_index('ix_jobs_created_at', 'jobs', ['created_at'])
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
@@ -1,18 +1,47 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import  user, recruiter, job, auth
-from app.db.database import engine
+from app.routers import  user, recruiter, job, auth, metrics, profile
+from app.db.database import engine, async_engine
 from app.models import user as user_model, job as job_model
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.events import event_bus
+from app.core.password_pool import password_pool
+from app.core.elasticsearch import init_elasticsearch, close_elasticsearch
+from app.services.suggest_service import init_suggest_index
+from app.services.reference_data_service import start_reference_data, stop_reference_data
+from app.services.job_indexer import job_indexer
+from app.services.recommendation_service import start_recommendation_index
+from app.middleware.refresh_token_middleware import RefreshTokenMiddleware, ACCESS_TOKEN_HEADER
 import uvicorn
 
 user_model.Base.metadata.create_all(bind=engine)
 job_model.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_elasticsearch()
+    event_bus.start()
+    start_reference_data()
+    init_suggest_index()
+    start_recommendation_index()
+    if settings.JOB_INDEXER_ENABLED:
+        job_indexer.start()
+    yield
+    await job_indexer.stop()
+    stop_reference_data()
+    # Đóng các kết nối aiomysql trong pool trước khi event loop dừng
+    await async_engine.dispose()
+    await close_elasticsearch()
+    event_bus.stop()
+    password_pool.shutdown()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,12 +50,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[ACCESS_TOKEN_HEADER, NEXT_CURSOR_HEADER],
 )
 
+if settings.SLIDING_REFRESH_ENABLED:
+    app.add_middleware(RefreshTokenMiddleware)
+
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(recruiter.router)
 app.include_router(job.router)
+app.include_router(profile.router)
+app.include_router(metrics.router)
 
 
 
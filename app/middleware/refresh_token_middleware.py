@@ -0,0 +1,38 @@
+import time
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from app.core.config import settings
+from app.core.security import verify_token
+from app.services.session_service import slide_access_token
+
+ACCESS_TOKEN_HEADER = "X-Access-Token"
+
+class RefreshTokenMiddleware(BaseHTTPMiddleware):
+    """Tự động cấp access token mới khi token của request sắp hết hạn.
+
+    Token mới được trả về trong header X-Access-Token, client chỉ cần thay
+    token đang dùng thay vì đăng nhập lại.
+    """
+
+    def __init__(self, app, threshold_seconds: int = settings.SLIDING_REFRESH_THRESHOLD_SECONDS):
+        super().__init__(app)
+        self.threshold_seconds = threshold_seconds
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        authorization = request.headers.get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if response.status_code >= 400 or scheme.lower() != "bearer" or not token:
+            return response
+
+        payload = verify_token(token)
+        if payload is None or payload.get("type") != "access":
+            return response
+        if payload["exp"] - time.time() > self.threshold_seconds:
+            return response
+
+        new_token = slide_access_token(payload.get("sub"), payload.get("sid"), token)
+        if new_token:
+            response.headers[ACCESS_TOKEN_HEADER] = new_token
+        return response
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, Enum, Table, Index, select
+from sqlalchemy.orm import relationship, column_property, undefer
 from sqlalchemy.sql import func
+from datetime import datetime
 from app.db.database import Base
 
 class Job(Base):
@@ -24,6 +25,17 @@ class Job(Base):
     recruiter = relationship("Recruiter", back_populates="jobs")
     tags = relationship("Tag", secondary="job_tags", back_populates="jobs")
 
+    __table_args__ = (
+        # Dùng cho tìm kiếm fallback khi Elasticsearch không sẵn sàng
+        Index("ft_jobs_title_description", "title", "description", mysql_prefix="FULLTEXT"),
+        Index("ix_jobs_experience_level", "experience_level"),
+        Index("ix_jobs_industry", "industry"),
+        # Phân trang keyset theo (created_at, id)
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_salary_min", "salary_min"),
+        Index("ix_jobs_salary_max", "salary_max"),
+    )
+
 class Tag(Base):
     __tablename__ = "tags"
 
@@ -57,4 +69,35 @@ job_tags = Table(
     Base.metadata,
     Column("job_id", Integer, ForeignKey("jobs.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True)
-) 
\ No newline at end of file
+)
+
+# Id các tag của job trong một cột ("1,5,9"), chỉ được nạp khi undefer: tags
+# được lấy từ reference cache thay vì JOIN hoặc lazy load relationship
+Job.tag_ids_csv = column_property(
+    select(func.group_concat(job_tags.c.tag_id))
+    .where(job_tags.c.job_id == Job.id)
+    .correlate_except(job_tags)
+    .scalar_subquery(),
+    deferred=True
+)
+
+# Loader cho các đường đọc trả về JobResponse: location, work_type và tags lấy
+# từ reference cache nên cả trang chỉ cần một câu SELECT
+def job_response_options():
+    return (undefer(Job.tag_ids_csv),)
+
+class JobOutbox(Base):
+    """Thay đổi của job chờ đồng bộ sang Elasticsearch, ghi cùng transaction với job"""
+    __tablename__ = "job_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # Không dùng foreign key: bản ghi delete phải tồn tại sau khi job đã bị xóa
+    job_id = Column(Integer, nullable=False)
+    operation = Column(Enum("upsert", "delete", name="job_outbox_operation"), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_job_outbox_available_at", "available_at", "id"),
+    )
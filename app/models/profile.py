@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, TIMESTAMP, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -13,4 +13,9 @@ class Profile(Base):
     address = Column(Text)
     skills = Column(JSON)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
-    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp()) 
\ No newline at end of file
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+
+    __table_args__ = (
+        # Phân trang keyset theo (created_at, id)
+        Index("ix_profiles_created_at_id", "created_at", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -24,3 +24,8 @@ class User(Base):
 
     # Relationships
     recruiter = relationship("Recruiter", back_populates="user", uselist=False)
+
+    __table_args__ = (
+        # Phân trang keyset theo (createdAt, id)
+        Index("ix_users_created_at_id", "createdAt", "id"),
+    )
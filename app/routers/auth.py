@@ -1,78 +1,65 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.schemas.user import UserCreate, UserResponse, UserLogin, Token, LoginResponse, RegisterResponse, ChangePassword
-from app.services.auth_service import register_user, login_user, logout_user, verify_token_in_redis
-from app.core.security import verify_token, get_password_hash, verify_password
-from app.models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.db.database import get_async_db
+from app.schemas.user import UserCreate, UserResponse, UserLogin, LoginResponse, RegisterResponse, ChangePassword, CurrentUser, SessionInfo, Token, RefreshTokenRequest
+from app.services.auth_service import register_user, login_user, logout_user, refresh_tokens
+from app.services.session_service import list_sessions, revoke_session, revoke_all_sessions
+from app.services.user_service import change_password as change_user_password
+from app.core.auth import get_current_user, get_current_session_id
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    username: str = payload.get("sub")
-    if username is None:
-        raise credentials_exception
-    
-    if not verify_token_in_redis(username, token):
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
 
 @router.post("/register", response_model=RegisterResponse)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
-    return register_user(db, user)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    return await register_user(db, user)
 
 @router.post("/login", response_model=LoginResponse)
-async def login(user: UserLogin, db: Session = Depends(get_db)):
-    return login_user(db, user)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    return await login_user(db, user)
+
+@router.post("/refresh", response_model=Token)
+async def refresh(data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    return await refresh_tokens(db, data)
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
-    logout_user(current_user.username)
+async def logout(
+    current_user: CurrentUser = Depends(get_current_user),
+    session_id: str = Depends(get_current_session_id)
+):
+    logout_user(current_user.username, session_id)
     return {"message": "Successfully logged out"}
 
+@router.post("/logout-all")
+async def logout_all(current_user: CurrentUser = Depends(get_current_user)):
+    revoke_all_sessions(current_user.username)
+    return {"message": "Successfully logged out from all sessions"}
+
+@router.get("/sessions", response_model=List[SessionInfo])
+async def get_sessions(
+    current_user: CurrentUser = Depends(get_current_user),
+    session_id: str = Depends(get_current_session_id)
+):
+    return list_sessions(current_user.username, session_id)
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_session(session_id: str, current_user: CurrentUser = Depends(get_current_user)):
+    if not revoke_session(current_user.username, session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: CurrentUser = Depends(get_current_user)):
     return current_user
 
 @router.post("/change-password")
 async def change_password(
     password_data: ChangePassword,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    # Verify current password
-    if not verify_password(password_data.current_password, current_user.password):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Current password is incorrect"
-        )
-    
-    # Verify new password and confirm password match
-    if password_data.new_password != password_data.confirm_password:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="New password and confirm password do not match"
-        )
-    
-    # Update password
-    current_user.password = get_password_hash(password_data.new_password)
-    db.commit()
-    
+    await change_user_password(db, current_user.id, password_data)
     return {"message": "Password changed successfully"}
 
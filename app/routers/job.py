@@ -1,28 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.database import get_db
-from app.schemas.job import JobCreate, JobUpdate, JobResponse
-from app.schemas.job_search import JobSearchQuery, JobSearchResponse
+from app.db.database import get_db, get_async_db
+from app.schemas.job import (
+    JobCreate,
+    JobUpdate,
+    JobResponse,
+    JobRecommendation,
+    JobBatchRequest,
+    JobBatchResponse,
+    JobImportFormat,
+    JobImportResponse
+)
+from app.schemas.job_search import (
+    JobSearchQuery,
+    JobSearchResponse,
+    JobSearchBatchRequest,
+    JobSearchBatchResponse,
+    JobSearchCount,
+    PaginationMode,
+    FacetField,
+    SuggestResponse
+)
 from app.services.job_service import (
     create_job,
     get_jobs,
+    get_jobs_page,
     get_job,
+    get_jobs_by_ids,
     update_job,
     delete_job,
-    search_jobs
+    search_jobs,
+    search_jobs_batch,
+    count_jobs
 )
-from app.core.auth import get_current_user
-from app.models.user import User, UserType
-from app.models.recruiter import Recruiter
+from app.services.job_import_service import import_jobs
+from app.services.suggest_service import suggest
+from app.services.recommendation_service import recommend_jobs
+from app.services.similar_jobs_service import get_similar_jobs
+from app.core.auth import get_current_user, get_current_active_user
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.models.user import UserType
+from app.schemas.user import CurrentUser
 
 router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
 
 @router.post("/", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
 async def create_job_endpoint(
     job: JobCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if not current_user.typeUser == UserType.RECRUITER:
         raise HTTPException(
@@ -30,23 +58,46 @@ async def create_job_endpoint(
             detail="Only recruiters can create jobs"
         )
     
-    # Get recruiter profile
-    recruiter = db.query(Recruiter).filter(Recruiter.user_id == current_user.id).first()
-    if not recruiter:
+    # Recruiter profile đã có trong snapshot của user
+    if current_user.recruiter_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Recruiter profile not found"
         )
     
-    return await create_job(db, job, recruiter.id)
+    return await create_job(db, job, current_user.recruiter_id)
+
+@router.post("/import", response_model=JobImportResponse)
+async def import_jobs_endpoint(
+    request: Request,
+    format: JobImportFormat = Query(JobImportFormat.NDJSON),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    if not current_user.is_recruiter or current_user.recruiter_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only recruiters can import jobs"
+        )
+    # Body được đọc dạng stream: CSV có header hoặc mỗi dòng một object JSON
+    return await import_jobs(db, request.stream(), format, current_user.recruiter_id)
 
 @router.get("/", response_model=List[JobResponse])
 async def get_jobs_endpoint(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    pagination: PaginationMode = Query(PaginationMode.PAGE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return get_jobs(db, skip=skip, limit=limit)
+    # Chế độ cursor: job mới nhất trước, cursor trang tiếp theo nằm trong header
+    if pagination == PaginationMode.CURSOR or cursor:
+        jobs, next_cursor = await get_jobs_page(db, cursor=cursor, limit=limit)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return jobs
+    return await get_jobs(db, skip=skip, limit=limit)
 
 @router.get("/search", response_model=JobSearchResponse)
 async def search_jobs_endpoint(
@@ -61,7 +112,11 @@ async def search_jobs_endpoint(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
     sort: str = Query("created_at", regex="^(created_at|salary_min|salary_max)$"),
-    order: str = Query("desc", regex="^(asc|desc)$")
+    order: str = Query("desc", regex="^(asc|desc)$"),
+    pagination: PaginationMode = Query(PaginationMode.PAGE),
+    cursor: Optional[str] = None,
+    use_pit: bool = False,
+    facets: Optional[List[FacetField]] = Query(None)
 ):
     query = JobSearchQuery(
         q=q,
@@ -75,23 +130,89 @@ async def search_jobs_endpoint(
         page=page,
         per_page=per_page,
         sort=sort,
-        order=order
+        order=order,
+        pagination=pagination,
+        cursor=cursor,
+        use_pit=use_pit,
+        facets=facets
     )
     return await search_jobs(query)
 
+@router.get("/search/count", response_model=JobSearchCount)
+async def count_jobs_endpoint(
+    q: Optional[str] = None,
+    location_id: Optional[int] = None,
+    work_type_id: Optional[int] = None,
+    experience_level: Optional[str] = None,
+    industry: Optional[str] = None,
+    tag_ids: Optional[List[int]] = Query(None),
+    salary_min: Optional[float] = None,
+    salary_max: Optional[float] = None
+):
+    # Đếm chính xác, tốn hơn total có giới hạn của /search với query rộng
+    query = JobSearchQuery(
+        q=q,
+        location_id=location_id,
+        work_type_id=work_type_id,
+        experience_level=experience_level,
+        industry=industry,
+        tag_ids=tag_ids,
+        salary_min=salary_min,
+        salary_max=salary_max
+    )
+    return await count_jobs(query)
+
+@router.post("/search/batch", response_model=JobSearchBatchResponse)
+async def search_jobs_batch_endpoint(request: JobSearchBatchRequest):
+    # Gộp nhiều khối tìm kiếm (ví dụ các carousel trang chủ) vào một request
+    return JobSearchBatchResponse(results=await search_jobs_batch(request.queries))
+
+@router.post("/batch", response_model=JobBatchResponse)
+async def get_jobs_batch_endpoint(request: JobBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    # Thay cho nhiều lần gọi GET /{job_id} (ví dụ danh sách job đã lưu)
+    items, missing = await get_jobs_by_ids(db, request.ids)
+    return JobBatchResponse(items=items, missing=missing)
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_endpoint(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20)
+):
+    return await suggest(q, limit)
+
+@router.get("/recommendations", response_model=List[JobRecommendation])
+def recommendations_endpoint(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    if current_user.typeUser != UserType.CANDIDATE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only candidates can get job recommendations"
+        )
+    return recommend_jobs(db, current_user.id, limit)
+
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job_endpoint(job_id: int, db: Session = Depends(get_db)):
-    job = await get_job(db, job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    return job
+async def get_job_endpoint(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Các request cùng job_id trong worker được gộp thành một lần đọc cache/MySQL
+    return await get_job(db, job_id)
+
+@router.get("/{job_id}/similar", response_model=List[JobResponse])
+def similar_jobs_endpoint(
+    job_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    # Danh sách láng giềng được tính trước bởi app.commands.similar_jobs
+    return get_similar_jobs(db, job_id, limit)
 
 @router.put("/{job_id}", response_model=JobResponse)
 async def update_job_endpoint(
     job_id: int,
     job: JobUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if not current_user.is_recruiter:
         raise HTTPException(
@@ -103,8 +224,8 @@ async def update_job_endpoint(
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_job_endpoint(
     job_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if not current_user.is_recruiter:
         raise HTTPException(
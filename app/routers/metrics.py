@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+from app.core.auth import get_current_active_admin
+from app.core.metrics import metrics
+from app.schemas.user import CurrentUser
+
+router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
+
+@router.get("/")
+async def get_metrics(current_user: CurrentUser = Depends(get_current_active_admin)):
+    return metrics.snapshot()
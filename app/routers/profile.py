@@ -1,52 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.database import get_db
 from app.schemas.profile import ProfileCreate, ProfileUpdate, ProfileResponse
+from app.schemas.job_search import PaginationMode
 from app.services.profile_service import (
     get_profile,
     get_profile_by_user_id,
     get_profiles,
+    get_profiles_page,
     create_profile,
     update_profile,
     delete_profile
 )
 from app.core.auth import get_current_user, get_current_active_admin
-from app.models.user import User
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.schemas.user import CurrentUser
 
 router = APIRouter(prefix="/api/v1/profiles", tags=["profiles"])
 
 @router.get("/", response_model=List[ProfileResponse])
 def get_profiles_endpoint(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     email: str = Query(None),
     full_name: str = Query(None),
+    pagination: PaginationMode = Query(PaginationMode.PAGE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
+    if pagination == PaginationMode.CURSOR or cursor:
+        profiles, next_cursor = get_profiles_page(db, cursor=cursor, limit=limit, email=email, full_name=full_name)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return profiles
     return get_profiles(db, skip=skip, limit=limit, email=email, full_name=full_name)
 
+# Khai báo trước /{profile_id} để "me" không bị hiểu là profile_id
+@router.get("/me", response_model=ProfileResponse)
+def get_my_profile_endpoint(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return get_profile_by_user_id(db, current_user.id)
+
 @router.get("/{profile_id}", response_model=ProfileResponse)
 def get_profile_endpoint(
     profile_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     return get_profile(db, profile_id)
 
-@router.get("/me", response_model=ProfileResponse)
-def get_my_profile_endpoint(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    return get_profile_by_user_id(db, current_user.id)
-
 @router.post("/", response_model=ProfileResponse, status_code=status.HTTP_201_CREATED)
 def create_profile_endpoint(
     profile: ProfileCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return create_profile(db, profile, current_user.id)
 
@@ -55,7 +67,7 @@ def update_profile_endpoint(
     profile_id: int,
     profile: ProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     return update_profile(db, profile_id, profile)
 
@@ -63,7 +75,7 @@ def update_profile_endpoint(
 def update_my_profile_endpoint(
     profile: ProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     my_profile = get_profile_by_user_id(db, current_user.id)
     return update_profile(db, my_profile.id, profile)
@@ -72,6 +84,6 @@ def update_my_profile_endpoint(
 def delete_profile_endpoint(
     profile_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     delete_profile(db, profile_id) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.schemas.recruiter import RecruiterCreate, RecruiterUpdate, RecruiterResponse
 from app.services.recruiter_service import (
     create_recruiter,
@@ -11,15 +11,16 @@ from app.services.recruiter_service import (
     delete_recruiter
 )
 from app.core.auth import get_current_user
-from app.models.user import UserType, User
+from app.models.user import UserType
+from app.schemas.user import CurrentUser
 
 router = APIRouter(prefix="/api/v1/recruiters", tags=["recruiters"])
 
 @router.post("/", response_model=RecruiterResponse, status_code=status.HTTP_201_CREATED)
-def create_recruiter_profile(
+async def create_recruiter_profile(
     recruiter: RecruiterCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.typeUser != UserType.RECRUITER:
         raise HTTPException(
@@ -28,7 +29,7 @@ def create_recruiter_profile(
         )
     
     try:
-        return create_recruiter(db, current_user.id, recruiter)
+        return await create_recruiter(db, current_user.id, recruiter)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,9 +37,9 @@ def create_recruiter_profile(
         )
 
 @router.get("/me", response_model=RecruiterResponse)
-def get_my_recruiter_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_my_recruiter_profile(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.typeUser != UserType.RECRUITER:
         raise HTTPException(
@@ -46,18 +47,18 @@ def get_my_recruiter_profile(
             detail="Only recruiters can view recruiter profiles"
         )
     
-    return get_recruiter_by_user_id(db, current_user.id)
+    return await get_recruiter_by_user_id(db, current_user.id)
 
 @router.get("/{recruiter_id}", response_model=RecruiterResponse)
-def get_recruiter_profile(recruiter_id: int, db: Session = Depends(get_db)):
-    return get_recruiter(db, recruiter_id)
+async def get_recruiter_profile(recruiter_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_recruiter(db, recruiter_id)
 
 @router.put("/{recruiter_id}", response_model=RecruiterResponse)
-def update_recruiter_profile(
+async def update_recruiter_profile(
     recruiter_id: int,
     recruiter: RecruiterUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.typeUser != UserType.RECRUITER:
         raise HTTPException(
@@ -65,13 +66,13 @@ def update_recruiter_profile(
             detail="Only recruiters can update recruiter profiles"
         )
     
-    return update_recruiter(db, recruiter_id, recruiter, current_user.id)
+    return await update_recruiter(db, recruiter_id, recruiter, current_user.id)
 
 @router.delete("/{recruiter_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_recruiter_profile(
+async def delete_recruiter_profile(
     recruiter_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.typeUser != UserType.RECRUITER:
         raise HTTPException(
@@ -79,4 +80,4 @@ def delete_recruiter_profile(
             detail="Only recruiters can delete recruiter profiles"
         )
     
-    delete_recruiter(db, recruiter_id, current_user.id) 
\ No newline at end of file
+    await delete_recruiter(db, recruiter_id, current_user.id) 
\ No newline at end of file
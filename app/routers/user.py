@@ -1,66 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import APIRouter, Depends, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.database import get_db
-from app.schemas.user import UserCreate, UserResponse, UserLogin, Token, LoginResponse, RegisterResponse, UserUpdate
-from app.services.auth_service import register_user, login_user, logout_user, verify_token_in_redis
-from app.core.security import verify_token
-from app.models.user import User, UserType
+from app.schemas.user import UserCreate, UserResponse, UserUpdate, CurrentUser
+from app.models.user import UserType
+from app.schemas.job_search import PaginationMode
 from app.services.user_service import (
     get_users,
+    get_users_page,
     get_user_by_id,
     create_user,
     update_user,
     delete_user
 )
 from app.core.auth import get_current_user, get_current_active_admin
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    username: str = payload.get("sub")
-    if username is None:
-        raise credentials_exception
-    
-    if not verify_token_in_redis(username, token):
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
-
-
 
 @router.get("/", response_model=List[UserResponse])
 def get_users_endpoint(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     email: str = Query(None),
     type_user: UserType = Query(None),
     is_active: bool = Query(None),
+    pagination: PaginationMode = Query(PaginationMode.PAGE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
+    if pagination == PaginationMode.CURSOR or cursor:
+        users, next_cursor = get_users_page(
+            db, cursor=cursor, limit=limit, email=email, type_user=type_user, is_active=is_active
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return users
     return get_users(db, skip=skip, limit=limit, email=email, type_user=type_user, is_active=is_active)
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user_endpoint(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     return get_user_by_id(db, user_id)
 
@@ -68,7 +52,7 @@ def get_user_endpoint(
 def create_user_endpoint(
     user: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     return create_user(db, user)
 
@@ -77,7 +61,7 @@ def update_user_endpoint(
     user_id: int,
     user: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     return update_user(db, user_id, user)
 
@@ -85,7 +69,7 @@ def update_user_endpoint(
 def delete_user_endpoint(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_admin)
+    current_user: CurrentUser = Depends(get_current_active_admin)
 ):
     delete_user(db, user_id)
 
@@ -93,7 +77,7 @@ def delete_user_endpoint(
 def update_user_info(
     user: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return update_user(db, current_user.id, user)
 
@@ -71,4 +71,30 @@ class JobResponse(JobBase):
     tags: List[TagResponse] = []
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class JobBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500, description="Các job_id, kết quả trả về theo cùng thứ tự")
+
+class JobBatchResponse(BaseModel):
+    items: List[JobResponse]
+    missing: List[int] = Field([], description="Các job_id không tồn tại")
+
+class JobImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class JobImportRowResult(BaseModel):
+    row: int = Field(..., description="Số thứ tự dòng dữ liệu, bắt đầu từ 1 (không tính header CSV)")
+    job_id: Optional[int] = None
+    error: Optional[str] = None
+
+class JobImportResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[JobImportRowResult]
+    error: Optional[str] = Field(None, description="Lý do import dừng giữa chừng; các dòng sau đó không được đọc")
+
+class JobRecommendation(BaseModel):
+    job: JobResponse
+    score: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from enum import Enum
 
 class SortField(str, Enum):
@@ -11,6 +11,21 @@ class SortOrder(str, Enum):
     ASC = "asc"
     DESC = "desc"
 
+class PaginationMode(str, Enum):
+    PAGE = "page"
+    CURSOR = "cursor"
+
+class FacetField(str, Enum):
+    LOCATION = "location_id"
+    WORK_TYPE = "work_type_id"
+    EXPERIENCE_LEVEL = "experience_level"
+    INDUSTRY = "industry"
+    TAGS = "tags"
+
+class TotalRelation(str, Enum):
+    EQ = "eq"
+    GTE = "gte"
+
 class JobSearchQuery(BaseModel):
     q: Optional[str] = Field(None, description="Từ khóa tìm kiếm")
     location_id: Optional[int] = Field(None, description="ID địa điểm")
@@ -24,10 +39,52 @@ class JobSearchQuery(BaseModel):
     per_page: int = Field(10, ge=1, le=100, description="Số bản ghi mỗi trang")
     sort: Optional[SortField] = Field(SortField.CREATED_AT, description="Trường sắp xếp")
     order: Optional[SortOrder] = Field(SortOrder.DESC, description="Thứ tự sắp xếp")
+    pagination: PaginationMode = Field(PaginationMode.PAGE, description="Phân trang theo số trang hoặc cursor")
+    cursor: Optional[str] = Field(None, description="Cursor trang tiếp theo (next_cursor của response trước)")
+    use_pit: bool = Field(False, description="Giữ snapshot point-in-time khi duyệt bằng cursor")
+    facets: Optional[List[FacetField]] = Field(None, description="Các facet cần đếm kèm kết quả")
+
+class FacetBucket(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class JobSearchFacets(BaseModel):
+    facets: Dict[str, List[FacetBucket]]
 
 class JobSearchResponse(BaseModel):
     items: List[dict]
     total: int
+    # gte: total chỉ là cận dưới (đã chạm SEARCH_TOTAL_HITS_CEILING)
+    total_relation: TotalRelation = TotalRelation.EQ
     page: int
     per_page: int
-    total_pages: int 
\ No newline at end of file
+    total_pages: int
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, List[FacetBucket]]] = None
+    # True khi kết quả đến từ MySQL fallback thay vì Elasticsearch
+    degraded: bool = False 
+
+class JobSearchCount(BaseModel):
+    total: int
+    degraded: bool = False
+
+class JobSearchBatchRequest(BaseModel):
+    queries: List[JobSearchQuery] = Field(..., min_length=1, max_length=20, description="Các query, kết quả trả về theo cùng thứ tự")
+
+class JobSearchBatchResponse(BaseModel):
+    results: List[JobSearchResponse]
+
+class SuggestionType(str, Enum):
+    TITLE = "title"
+    TAG = "tag"
+    LOCATION = "location"
+    WORK_TYPE = "work_type"
+
+class Suggestion(BaseModel):
+    text: str
+    type: SuggestionType
+    id: Optional[int] = None
+    popularity: int = 0
+
+class SuggestResponse(BaseModel):
+    items: List[Suggestion]
@@ -25,11 +25,27 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class CurrentUser(UserResponse):
+    """Snapshot người dùng đã xác thực, không gắn với session DB"""
+    recruiter_id: Optional[int] = None
+
+    @property
+    def is_recruiter(self) -> bool:
+        return self.typeUser == UserType.RECRUITER
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class SessionInfo(BaseModel):
+    session_id: str
+    expires_at: datetime
+    current: bool = False
+
 class TokenData(BaseModel):
     username: Optional[str] = None
 
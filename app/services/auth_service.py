@@ -1,15 +1,28 @@
-from datetime import timedelta
-from fastapi import HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token, get_current_user_token
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from redis.exceptions import WatchError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.security import verify_token
 from app.models.user import User, UserType
-from app.schemas.user import UserCreate, UserLogin, Token, LoginResponse, UserResponse, RegisterResponse
+from app.models.recruiter import Recruiter
+from app.schemas.user import UserCreate, UserLogin, LoginResponse, UserResponse, RegisterResponse, CurrentUser, Token, RefreshTokenRequest
 from app.db.redis_db import get_redis
-from app.db.database import get_db
+from app.core.principal_cache import evict_principal
+from app.core.password_pool import password_pool
+from app.services.session_service import access_token_key, is_valid_access_digest, create_session, revoke_session, rotate_session
 
 redis_client = get_redis()
 
-def register_user(db: Session, user: UserCreate) -> RegisterResponse:
+def user_snapshot_key(username: str) -> str:
+    return f"user_snapshot:{username}"
+
+def user_version_key(username: str) -> str:
+    # Tăng mỗi lần invalidate_user, để snapshot đọc trước đó không được ghi đè lại
+    return f"user_snapshot_version:{username}"
+
+async def register_user(db: AsyncSession, user: UserCreate) -> RegisterResponse:
     # Prevent admin user registration
     if user.typeUser == UserType.ADMIN:
         raise HTTPException(
@@ -17,21 +30,21 @@ def register_user(db: Session, user: UserCreate) -> RegisterResponse:
             detail="Cannot register admin user"
         )
     
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_pool.hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -40,16 +53,11 @@ def register_user(db: Session, user: UserCreate) -> RegisterResponse:
         typeUser=user.typeUser
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
-    # Create access and refresh tokens
-    access_token = create_access_token(data={"sub": db_user.username})
-    refresh_token = create_refresh_token(data={"sub": db_user.username})
-    
-    # Store tokens in Redis
-    redis_client.set(f"access_token:{db_user.username}", access_token)
-    redis_client.set(f"refresh_token:{db_user.username}", refresh_token)
+    # Create a new session with access and refresh tokens
+    token_response = create_session(db_user.username)
     
     # Create user response
     user_response = UserResponse(
@@ -63,21 +71,14 @@ def register_user(db: Session, user: UserCreate) -> RegisterResponse:
         updateAt=db_user.updateAt
     )
     
-    # Create token response
-    token_response = Token(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_type="bearer"
-    )
-    
     return RegisterResponse(
         user=user_response,
         token=token_response
     )
 
-def login_user(db: Session, user: UserLogin) -> LoginResponse:
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if not db_user or not verify_password(user.password, db_user.password):
+async def login_user(db: AsyncSession, user: UserLogin) -> LoginResponse:
+    db_user = await db.scalar(select(User).where(User.username == user.username))
+    if not db_user or not await password_pool.verify(user.password, db_user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
@@ -89,12 +90,8 @@ def login_user(db: Session, user: UserLogin) -> LoginResponse:
             detail="User is inactive"
         )
     
-    access_token = create_access_token(data={"sub": db_user.username})
-    refresh_token = create_refresh_token(data={"sub": db_user.username})
-    
-    # Store tokens in Redis
-    redis_client.set(f"access_token:{db_user.username}", access_token)
-    redis_client.set(f"refresh_token:{db_user.username}", refresh_token)
+    # Mỗi lần đăng nhập là một session riêng, các thiết bị khác vẫn giữ session
+    token_response = create_session(db_user.username)
     
     # Create user response
     user_response = UserResponse(
@@ -108,46 +105,90 @@ def login_user(db: Session, user: UserLogin) -> LoginResponse:
         updateAt=db_user.updateAt
     )
     
-    # Create token response
-    token_response = Token(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_type="bearer"
-    )
-    
     return LoginResponse(
         user=user_response,
         token=token_response
     )
 
-def logout_user(username: str):
-    # Remove tokens from Redis
-    redis_client.delete(f"access_token:{username}")
-    redis_client.delete(f"refresh_token:{username}")
+def logout_user(username: str, session_id: str):
+    # Remove the current session's tokens from Redis
+    revoke_session(username, session_id)
 
-def verify_token_in_redis(username: str, token: str) -> bool:
-    stored_token = redis_client.get(f"access_token:{username}")
-    return stored_token == token if stored_token else False
+async def refresh_tokens(db: AsyncSession, data: RefreshTokenRequest) -> Token:
+    """Cấp token mới từ refresh token, không cần hash mật khẩu"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = verify_token(data.refresh_token)
+    if payload is None or payload.get("type") != "refresh":
+        raise credentials_exception
+    
+    username = payload.get("sub")
+    session_id = payload.get("sid")
+    if username is None or session_id is None:
+        raise credentials_exception
+    
+    # Tài khoản đã bị xóa hoặc vô hiệu hóa: thu hồi session thay vì cấp token mới
+    current_user = await get_user_snapshot(db, username)
+    if current_user is None or not current_user.status:
+        revoke_session(username, session_id)
+        raise credentials_exception
+    
+    token = rotate_session(username, session_id, data.refresh_token)
+    if token is None:
+        raise credentials_exception
+    return token
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(get_current_user_token)) -> User:
-    username = token.get("sub")
-    if not username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-    
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    if not user.status:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is inactive"
-        )
-    
-    return user
+def verify_session_and_get_snapshot(username: str, session_id: str, token: str) -> Tuple[bool, Optional[CurrentUser]]:
+    """Kiểm tra access token của session và đọc snapshot user trong một round trip Redis"""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(access_token_key(session_id))
+    pipe.get(user_snapshot_key(username))
+    stored_digest, snapshot = pipe.execute()
+    valid = is_valid_access_digest(stored_digest, token)
+    return valid, CurrentUser.model_validate_json(snapshot) if snapshot else None
+
+async def get_user_snapshot(db: AsyncSession, username: str) -> Optional[CurrentUser]:
+    """Snapshot user từ Redis, đọc MySQL khi chưa có"""
+    snapshot = redis_client.get(user_snapshot_key(username))
+    if snapshot:
+        return CurrentUser.model_validate_json(snapshot)
+    return await load_user_snapshot(db, username)
+
+async def load_user_snapshot(db: AsyncSession, username: str) -> Optional[CurrentUser]:
+    """Đọc user từ MySQL khi snapshot chưa có trong Redis và lưu lại"""
+    # Version đọc trước MySQL: nếu invalidate_user chạy xen giữa thì không lưu snapshot cũ
+    version = redis_client.get(user_version_key(username))
+    result = await db.execute(
+        select(User, Recruiter.id)
+        .outerjoin(Recruiter, Recruiter.user_id == User.id)
+        .where(User.username == username)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    
+    user, recruiter_id = row
+    snapshot = CurrentUser.model_validate(user).model_copy(update={"recruiter_id": recruiter_id})
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(user_version_key(username))
+            if pipe.get(user_version_key(username)) == version:
+                pipe.multi()
+                pipe.set(user_snapshot_key(username), snapshot.model_dump_json(), ex=settings.USER_SNAPSHOT_TTL_SECONDS)
+                pipe.execute()
+        except WatchError:
+            # invalidate_user vừa chạy, request sau sẽ đọc lại từ MySQL
+            pass
+    return snapshot
+
+def invalidate_user(username: str):
+    """Xóa snapshot và principal đã cache sau khi dữ liệu user thay đổi"""
+    pipe = redis_client.pipeline()
+    pipe.incr(user_version_key(username))
+    pipe.expire(user_version_key(username), settings.USER_SNAPSHOT_TTL_SECONDS)
+    pipe.delete(user_snapshot_key(username))
+    pipe.execute()
+    evict_principal(username)
@@ -0,0 +1,251 @@
+import codecs
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.job import Job, JobOutbox, job_tags
+from app.models.recruiter import Recruiter
+from app.schemas.job import JobCreate, JobImportFormat, JobImportRowResult, JobImportResponse
+from app.schemas.job_search import SuggestionType
+from app.services.job_indexer import job_indexer, OUTBOX_UPSERT
+from app.services.recommendation_service import publish_jobs_tags
+from app.services.reference_data_service import reference_cache, async_ensure_references, known_tag_ids
+from app.services.similar_jobs_service import publish_jobs_changed
+from app.services.suggest_service import record_entries
+
+logger = logging.getLogger(__name__)
+
+# Một bản ghi (dòng NDJSON hoặc record CSV) dài hơn giới hạn này bị từ chối
+MAX_RECORD_CHARS = 1_000_000
+# Các tag trong một ô CSV cách nhau bởi dấu chấm phẩy
+CSV_TAG_SEPARATOR = ";"
+
+async def import_jobs(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    format: JobImportFormat,
+    recruiter_id: int
+) -> JobImportResponse:
+    """Import job từ body dạng stream, mỗi lần giữ tối đa JOB_IMPORT_BATCH_SIZE dòng.
+
+    Dòng lỗi được báo trong kết quả và không chặn các dòng khác; mỗi batch được
+    commit riêng cùng outbox, Elasticsearch được cập nhật bởi job indexer (bulk).
+    Vượt JOB_IMPORT_MAX_ROWS hoặc lỗi xảy ra khi đã có batch được commit không làm
+    hỏng request: import dừng lại và trả về kết quả tới thời điểm đó kèm error.
+    """
+    if await db.get(Recruiter, recruiter_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recruiter not found"
+        )
+
+    results: List[JobImportRowResult] = []
+    batch: List[Tuple[int, JobCreate]] = []
+    stopped: Optional[str] = None
+    records = _iter_csv_records(chunks) if format == JobImportFormat.CSV else _iter_ndjson_records(chunks)
+    try:
+        async for row, data in records:
+            if row > settings.JOB_IMPORT_MAX_ROWS:
+                stopped = f"Import is limited to {settings.JOB_IMPORT_MAX_ROWS} rows, later rows were not imported"
+                break
+            job, error = _validate_row(data, recruiter_id)
+            if error:
+                results.append(JobImportRowResult(row=row, error=error))
+                continue
+            batch.append((row, job))
+            if len(batch) >= settings.JOB_IMPORT_BATCH_SIZE:
+                results.extend(await _import_batch(db, batch))
+                batch = []
+        if batch:
+            results.extend(await _import_batch(db, batch))
+    except Exception as e:
+        # Chưa có job nào được ghi: trả lỗi cho cả request như bình thường
+        if not any(result.job_id is not None for result in results):
+            raise
+        await db.rollback()
+        if isinstance(e, HTTPException):
+            stopped = e.detail
+        else:
+            logger.exception("Job import stopped after %d rows", len(results))
+            stopped = "Import stopped by an unexpected error, later rows were not imported"
+        results.extend(JobImportRowResult(row=row, error="Not imported") for row, _ in batch)
+
+    created = sum(1 for result in results if result.job_id is not None)
+    results.sort(key=lambda result: result.row)
+    return JobImportResponse(created=created, failed=len(results) - created, results=results, error=stopped)
+
+def _validate_row(data: Any, recruiter_id: int) -> Tuple[Optional[JobCreate], Optional[str]]:
+    if isinstance(data, str):
+        # Lỗi phân tích cú pháp của dòng
+        return None, data
+    if not isinstance(data, dict):
+        return None, "Row must be an object"
+    try:
+        return JobCreate.model_validate({**data, "recruiter_id": recruiter_id}), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+
+async def _import_batch(db: AsyncSession, batch: List[Tuple[int, JobCreate]]) -> List[JobImportRowResult]:
+    """Ghi một batch: tham chiếu kiểm tra qua reference cache, job/tags/outbox mỗi bảng một lệnh INSERT"""
+    await async_ensure_references(
+        db,
+        tag_ids=[tag_id for _, job in batch for tag_id in job.tag_ids or []],
+        location_ids=[job.location_id for _, job in batch if job.location_id],
+        work_type_ids=[job.work_type_id for _, job in batch if job.work_type_id]
+    )
+
+    results, valid = [], []
+    for row, job in batch:
+        # Khóa ngoại sai sẽ làm hỏng cả câu INSERT nhiều dòng nên được kiểm tra trước
+        if job.location_id and reference_cache.location(job.location_id) is None:
+            results.append(JobImportRowResult(row=row, error="location_id: Location not found"))
+        elif job.work_type_id and reference_cache.work_type(job.work_type_id) is None:
+            results.append(JobImportRowResult(row=row, error="work_type_id: Work type not found"))
+        else:
+            valid.append((row, job))
+    if not valid:
+        return results
+
+    job_ids = await _insert_jobs(db, [job.model_dump(mode="json", exclude={"tag_ids"}) for _, job in valid])
+    # Tag không tồn tại được bỏ qua như khi tạo từng job
+    tag_ids_by_job = {job_id: known_tag_ids(job.tag_ids or []) for job_id, (_, job) in zip(job_ids, valid)}
+    tag_rows = [{"job_id": job_id, "tag_id": tag_id} for job_id, tag_ids in tag_ids_by_job.items() for tag_id in tag_ids]
+    if tag_rows:
+        await db.execute(insert(job_tags), tag_rows)
+    await db.execute(
+        insert(JobOutbox.__table__),
+        [{"job_id": job_id, "operation": OUTBOX_UPSERT} for job_id in job_ids]
+    )
+    await db.commit()
+
+    job_indexer.notify()
+    publish_jobs_tags(tag_ids_by_job)
+    publish_jobs_changed(job_ids)
+    entries = [
+        [SuggestionType.TAG.value, tag_id, reference_cache.tag(tag_id).name]
+        for tag_ids in tag_ids_by_job.values() for tag_id in tag_ids
+    ]
+    for _, job in valid:
+        if job.location_id:
+            entries.append([SuggestionType.LOCATION.value, job.location_id, reference_cache.location(job.location_id).name])
+        if job.work_type_id:
+            entries.append([SuggestionType.WORK_TYPE.value, job.work_type_id, reference_cache.work_type(job.work_type_id).name])
+    record_entries(entries)
+
+    results.extend(JobImportRowResult(row=row, job_id=job_id) for (row, _), job_id in zip(valid, job_ids))
+    return results
+
+async def _insert_jobs(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    """INSERT nhiều dòng, trả về id theo đúng thứ tự rows"""
+    table = Job.__table__
+    if db.bind.dialect.insert_executemany_returning_sort_by_parameter_order:
+        # MariaDB/SQLite: lấy id trực tiếp bằng RETURNING
+        result = await db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars())
+    # MySQL: một câu INSERT ... VALUES nhiều dòng; LAST_INSERT_ID() là id của dòng đầu,
+    # các dòng sau thường cách nhau auto_increment_increment. MySQL không bảo đảm điều
+    # này (innodb_autoinc_lock_mode=2), nên id được đọc lại để kiểm tra; nếu không khớp
+    # thì chèn lại từng dòng trong savepoint.
+    step = (await db.execute(text("SELECT @@auto_increment_increment"))).scalar_one()
+    savepoint = await db.begin_nested()
+    result = await db.execute(insert(table).values(rows))
+    job_ids = list(range(result.lastrowid, result.lastrowid + step * len(rows), step))
+    if await _inserted_rows_match(db, job_ids, rows):
+        await savepoint.commit()
+        return job_ids
+    logger.warning("Multi-row insert of %d jobs got non-sequential ids, inserting one by one", len(rows))
+    await savepoint.rollback()
+    job_ids = []
+    for row in rows:
+        result = await db.execute(insert(table).values(row))
+        job_ids.append(result.lastrowid)
+    return job_ids
+
+async def _inserted_rows_match(db: AsyncSession, job_ids: List[int], rows: List[Dict[str, Any]]) -> bool:
+    """True khi job_ids[i] đúng là dòng rows[i] vừa được chèn"""
+    result = await db.execute(select(Job.id, Job.recruiter_id, Job.title).where(Job.id.in_(job_ids)))
+    found = {job_id: (recruiter_id, title) for job_id, recruiter_id, title in result}
+    return all(
+        found.get(job_id) == (row["recruiter_id"], row["title"])
+        for job_id, row in zip(job_ids, rows)
+    )
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Tách body thành từng dòng mà không đọc cả body vào bộ nhớ"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line
+            if len(buffer) > MAX_RECORD_CHARS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Import record is too long"
+                )
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import body must be UTF-8"
+        )
+    if buffer:
+        yield buffer
+
+async def _iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """(số dòng, object) cho mỗi dòng không rỗng; dòng JSON lỗi trả về thông báo lỗi"""
+    row = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+
+async def _iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """(số dòng, dict theo header) cho mỗi record CSV, kể cả ô có xuống dòng trong dấu nháy"""
+    header = None
+    row = 0
+    record = ""
+    async for line in _iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        # Số dấu nháy lẻ nghĩa là đang ở giữa một ô có xuống dòng
+        if record.count('"') % 2:
+            if len(record) > MAX_RECORD_CHARS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Import record is too long"
+                )
+            continue
+        values = next(csv.reader([record.rstrip("\r")]), [])
+        record = ""
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, _csv_row(header, values)
+    if record:
+        yield row + 1, "Unterminated quoted field"
+
+def _csv_row(header: List[str], values: List[str]) -> Dict[str, Any]:
+    # Ô rỗng là không có giá trị, để dùng mặc định của JobCreate
+    data = {name: value for name, value in zip(header, values) if value != ""}
+    if "tag_ids" in data:
+        data["tag_ids"] = [tag_id.strip() for tag_id in data["tag_ids"].split(CSV_TAG_SEPARATOR) if tag_id.strip()]
+    return data
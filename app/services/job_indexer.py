@@ -0,0 +1,228 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from elasticsearch.helpers import async_bulk
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.elasticsearch_manager import es_manager
+from app.core.metrics import metrics
+from app.db.database import SessionLocal
+from app.db.redis_db import get_redis
+from app.models.job import Job, JobOutbox
+from app.services.search_cache import bump_search_generation
+from app.services.suggest_service import build_title_suggest, title_popularity
+
+logger = logging.getLogger(__name__)
+redis_client = get_redis()
+
+OUTBOX_UPSERT = "upsert"
+OUTBOX_DELETE = "delete"
+
+# Có trong lúc reindex_jobs nạp index mới: job_id được đồng bộ vào index cũ được ghi
+# vào REINDEX_CHANGES_KEY để đưa lại vào outbox sau khi chuyển alias
+REINDEX_ACTIVE_KEY = "jobs:reindex:active"
+REINDEX_CHANGES_KEY = "jobs:reindex:changes"
+
+def build_job_document(job: Job, title_counts: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Document Elasticsearch của một job (cần job.tags đã được load).
+
+    title_counts là kết quả title_popularity, làm weight của title_suggest.
+    """
+    return {
+        "id": job.id,
+        "title": job.title,
+        "description": job.description,
+        "salary_min": job.salary_min,
+        "salary_max": job.salary_max,
+        "location_id": job.location_id,
+        "work_type_id": job.work_type_id,
+        "recruiter_id": job.recruiter_id,
+        "experience_level": job.experience_level,
+        "industry": job.industry,
+        "created_at": job.created_at.isoformat(),
+        "tags": [tag.id for tag in job.tags],
+        "title_suggest": build_title_suggest(job.title, (title_counts or {}).get(job.title.lower(), 1))
+    }
+
+def enqueue_job(db: Union[Session, AsyncSession], job_id: int, operation: str):
+    """Ghi thay đổi vào outbox; được commit cùng transaction với job"""
+    db.add(JobOutbox(job_id=job_id, operation=operation))
+
+class JobIndexer:
+    """Đọc outbox theo batch và đồng bộ sang Elasticsearch bằng bulk.
+
+    Mỗi worker chạy một indexer; SELECT ... FOR UPDATE SKIP LOCKED đảm bảo mỗi
+    bản ghi chỉ được một worker xử lý. Nhiều thay đổi của cùng một job trong
+    batch chỉ tạo một action, đọc trạng thái mới nhất của job từ MySQL.
+
+    Các bản ghi của cùng một job có thể nằm ở batch của các worker khác nhau và
+    bulk không có thứ tự, nên mỗi action mang external version là id outbox lớn
+    nhất của job: action cũ tới sau bị Elasticsearch từ chối (409).
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float, max_attempts: int, max_backoff: int):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self._wakeup = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Xử lý ngay thay vì chờ tới lần poll kế tiếp"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Job indexer batch failed")
+                processed = 0
+            # Batch đầy nghĩa là có thể còn bản ghi đang chờ
+            if processed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """Xử lý một batch, trả về số bản ghi outbox đã lấy"""
+        db = SessionLocal()
+        try:
+            rows, actions = await asyncio.to_thread(self._claim, db)
+            if rows:
+                failed_ids = await self._bulk(actions)
+                await asyncio.to_thread(self._finish, db, rows, failed_ids)
+                indexed = len(actions) - len(failed_ids)
+                metrics.incr("job_outbox.indexed", indexed)
+                metrics.incr("job_outbox.failed", len(failed_ids))
+                metrics.incr("job_outbox.deduplicated", len(rows) - len(actions))
+                if indexed:
+                    bump_search_generation()
+            await asyncio.to_thread(self._report_lag, db)
+            return len(rows)
+        finally:
+            db.close()
+
+    def _claim(self, db: Session) -> Tuple[List[JobOutbox], List[Dict[str, Any]]]:
+        rows = (
+            db.query(JobOutbox)
+            .filter(JobOutbox.attempts < self.max_attempts, JobOutbox.available_at <= datetime.utcnow())
+            .order_by(JobOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            return [], []
+
+        # Thao tác sau cùng của mỗi job quyết định action
+        latest: Dict[int, str] = {}
+        versions: Dict[int, int] = {}
+        for row in rows:
+            latest[row.job_id] = row.operation
+            versions[row.job_id] = row.id
+
+        upsert_ids = [job_id for job_id, operation in latest.items() if operation == OUTBOX_UPSERT]
+        documents = {}
+        if upsert_ids:
+            jobs = db.query(Job).options(selectinload(Job.tags)).filter(Job.id.in_(upsert_ids)).all()
+            title_counts = title_popularity(db, (job.title for job in jobs))
+            documents = {job.id: build_job_document(job, title_counts) for job in jobs}
+
+        actions = []
+        for job_id in latest:
+            action = {"_index": "jobs", "_id": job_id, "_version": versions[job_id], "_version_type": "external"}
+            if job_id in documents:
+                actions.append({**action, "_op_type": "index", "_source": documents[job_id]})
+            else:
+                # Job đã bị xóa sau khi ghi outbox
+                actions.append({**action, "_op_type": "delete"})
+        # Ghi trước khi gửi bulk: bulk tới index cũ luôn xảy ra sau khi job_id đã được ghi
+        if redis_client.exists(REINDEX_ACTIVE_KEY):
+            redis_client.sadd(REINDEX_CHANGES_KEY, *latest)
+        return rows, actions
+
+    async def _bulk(self, actions: List[Dict[str, Any]]) -> Set[int]:
+        """Gửi bulk, trả về các job_id bị lỗi"""
+        try:
+            _, errors = await async_bulk(
+                es_manager.bulk_client(),
+                actions,
+                max_retries=2,
+                # Chờ document hiển thị trong search trước khi tăng generation của search cache,
+                # nếu không request ngay sau đó có thể cache lại kết quả trước khi ghi
+                refresh="wait_for",
+                raise_on_error=False,
+                raise_on_exception=False
+            )
+        except Exception:
+            logger.warning("Bulk indexing of %d jobs failed", len(actions), exc_info=True)
+            return {action["_id"] for action in actions}
+
+        failed_ids = set()
+        for error in errors:
+            operation, info = next(iter(error.items()))
+            # Xóa document không tồn tại coi như thành công
+            if operation == "delete" and info.get("status") == 404:
+                continue
+            # Version conflict: index đã có thay đổi mới hơn của job này
+            if info.get("status") == 409:
+                continue
+            failed_ids.add(int(info["_id"]))
+        return failed_ids
+
+    def _finish(self, db: Session, rows: List[JobOutbox], failed_ids: Set[int]):
+        now = datetime.utcnow()
+        done_ids = []
+        for row in rows:
+            if row.job_id not in failed_ids:
+                done_ids.append(row.id)
+                continue
+            row.attempts += 1
+            row.available_at = now + timedelta(seconds=min(2 ** row.attempts, self.max_backoff))
+            if row.attempts >= self.max_attempts:
+                metrics.incr("job_outbox.dead")
+                logger.error("Giving up indexing job %s after %d attempts", row.job_id, row.attempts)
+        if done_ids:
+            db.query(JobOutbox).filter(JobOutbox.id.in_(done_ids)).delete(synchronize_session=False)
+        db.commit()
+
+    def _report_lag(self, db: Session):
+        pending, oldest = (
+            db.query(func.count(JobOutbox.id), func.min(JobOutbox.created_at))
+            .filter(JobOutbox.attempts < self.max_attempts)
+            .one()
+        )
+        metrics.set_gauge("job_outbox.pending", pending)
+        lag = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        metrics.set_gauge("job_outbox.lag_seconds", lag)
+
+# Tạo instance global
+job_indexer = JobIndexer(
+    batch_size=settings.JOB_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.JOB_OUTBOX_POLL_SECONDS,
+    max_attempts=settings.JOB_OUTBOX_MAX_ATTEMPTS,
+    max_backoff=settings.JOB_OUTBOX_MAX_BACKOFF_SECONDS
+)
@@ -0,0 +1,198 @@
+"""Tìm kiếm job bằng MySQL FULLTEXT khi Elasticsearch không sẵn sàng.
+
+Cùng contract JobSearchQuery -> JobSearchResponse với Elasticsearch, kể cả
+cursor: giá trị sort trong cursor giữ đúng dạng ES trả về (epoch millis cho
+created_at, Long.MIN/MAX cho giá trị thiếu) để có thể chuyển qua lại giữa hai
+engine khi đang duyệt.
+"""
+import asyncio
+import calendar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.database import SessionLocal
+from app.models.job import Job, job_tags
+from app.schemas.job_search import (
+    JobSearchQuery,
+    JobSearchResponse,
+    FacetBucket,
+    FacetField,
+    SortField,
+    SortOrder,
+    PaginationMode,
+    TotalRelation
+)
+from app.services.job_indexer import build_job_document
+
+# Giá trị ES dùng cho document thiếu trường sort (missing: _last)
+ES_MISSING_ASC = 2 ** 63 - 1
+ES_MISSING_DESC = -(2 ** 63)
+
+def _filter_clauses(query: JobSearchQuery) -> Dict[str, Any]:
+    """Điều kiện lọc theo tên trường, giống _build_filters của Elasticsearch"""
+    clauses = {}
+    if query.location_id:
+        clauses[FacetField.LOCATION.value] = Job.location_id == query.location_id
+    if query.work_type_id:
+        clauses[FacetField.WORK_TYPE.value] = Job.work_type_id == query.work_type_id
+    if query.experience_level:
+        clauses[FacetField.EXPERIENCE_LEVEL.value] = Job.experience_level == query.experience_level
+    if query.industry:
+        clauses[FacetField.INDUSTRY.value] = Job.industry == query.industry
+    if query.tag_ids:
+        clauses[FacetField.TAGS.value] = exists().where(
+            job_tags.c.job_id == Job.id,
+            job_tags.c.tag_id.in_(query.tag_ids)
+        )
+    if query.salary_min is not None:
+        clauses["salary_min"] = Job.salary_min >= query.salary_min
+    if query.salary_max is not None:
+        clauses["salary_max"] = Job.salary_max <= query.salary_max
+    return clauses
+
+def _conditions(query: JobSearchQuery, exclude: Optional[str] = None) -> List[Any]:
+    conditions = [clause for field, clause in _filter_clauses(query).items() if field != exclude]
+    if query.q:
+        conditions.append(match(Job.title, Job.description, against=query.q).in_natural_language_mode())
+    return conditions
+
+def _sort_expression(sort_field: str, sort_order: str):
+    column = getattr(Job, sort_field)
+    if sort_field == SortField.CREATED_AT.value:
+        return column
+    return func.coalesce(column, ES_MISSING_ASC if sort_order == SortOrder.ASC.value else ES_MISSING_DESC)
+
+def _sort_value(job: Job, sort_field: str, sort_order: str) -> int:
+    """Giá trị sort theo đúng dạng Elasticsearch trả về trong hit["sort"]"""
+    value = getattr(job, sort_field)
+    if sort_field == SortField.CREATED_AT.value:
+        return calendar.timegm(value.utctimetuple()) * 1000 + value.microsecond // 1000
+    if value is None:
+        return ES_MISSING_ASC if sort_order == SortOrder.ASC.value else ES_MISSING_DESC
+    return value
+
+def _after_condition(expression, sort_field: str, sort_order: str, after: List[Any]):
+    if not isinstance(after, list) or len(after) != 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    value, last_id = after
+    if sort_field == SortField.CREATED_AT.value:
+        value = datetime.utcfromtimestamp(value / 1000)
+    if sort_order == SortOrder.ASC.value:
+        return or_(expression > value, and_(expression == value, Job.id > last_id))
+    return or_(expression < value, and_(expression == value, Job.id < last_id))
+
+def _facets(db: Session, query: JobSearchQuery) -> Dict[str, List[FacetBucket]]:
+    """Mỗi facet áp dụng mọi filter trừ filter của chính nó"""
+    facets = {}
+    for facet in dict.fromkeys(query.facets):
+        conditions = _conditions(query, exclude=facet.value)
+        if facet == FacetField.TAGS:
+            count = func.count(job_tags.c.job_id)
+            stmt = (
+                select(job_tags.c.tag_id, count)
+                .join(Job, Job.id == job_tags.c.job_id)
+                .where(*conditions)
+                .group_by(job_tags.c.tag_id)
+            )
+        else:
+            column = getattr(Job, facet.value)
+            count = func.count(Job.id)
+            stmt = select(column, count).where(column.isnot(None), *conditions).group_by(column)
+        rows = db.execute(stmt.order_by(count.desc()).limit(settings.SEARCH_FACET_SIZE)).all()
+        # tags là keyword trong Elasticsearch nên giá trị là chuỗi
+        facets[facet.value] = [
+            FacetBucket(value=str(value) if facet == FacetField.TAGS else value, count=n)
+            for value, n in rows
+        ]
+    return facets
+
+def _count(db: Session, conditions: List[Any]) -> Tuple[int, TotalRelation]:
+    """Đếm tới SEARCH_TOTAL_HITS_CEILING giống track_total_hits của Elasticsearch"""
+    ceiling = settings.SEARCH_TOTAL_HITS_CEILING
+    if ceiling <= 0:
+        return db.execute(select(func.count(Job.id)).where(*conditions)).scalar(), TotalRelation.EQ
+    bounded = select(Job.id).where(*conditions).limit(ceiling + 1).subquery()
+    total = db.execute(select(func.count()).select_from(bounded)).scalar()
+    if total > ceiling:
+        return ceiling, TotalRelation.GTE
+    return total, TotalRelation.EQ
+
+def search_jobs_mysql(query: JobSearchQuery, with_facets: bool = False) -> JobSearchResponse:
+    sort_field = (query.sort or SortField.CREATED_AT).value
+    sort_order = (query.order or SortOrder.DESC).value
+    sort_key = [sort_field, sort_order]
+    expression = _sort_expression(sort_field, sort_order)
+    ordering = [expression.asc(), Job.id.asc()] if sort_order == SortOrder.ASC.value else [expression.desc(), Job.id.desc()]
+    conditions = _conditions(query)
+    cursor_mode = query.pagination == PaginationMode.CURSOR or bool(query.cursor)
+
+    db = SessionLocal()
+    try:
+        total, total_relation = _count(db, conditions)
+
+        stmt = select(Job).where(*conditions).options(selectinload(Job.tags)).order_by(*ordering).limit(query.per_page)
+        if cursor_mode and query.cursor:
+            state = decode_cursor(query.cursor)
+            if state.get("sort") != sort_key:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor does not match the requested sort"
+                )
+            stmt = stmt.where(_after_condition(expression, sort_field, sort_order, state.get("after")))
+        elif not cursor_mode:
+            stmt = stmt.offset((query.page - 1) * query.per_page)
+        jobs = db.scalars(stmt).all()
+
+        next_cursor = None
+        if cursor_mode and len(jobs) == query.per_page:
+            last = jobs[-1]
+            next_cursor = encode_cursor({
+                "sort": sort_key,
+                "after": [_sort_value(last, sort_field, sort_order), last.id],
+                "pit": None
+            })
+
+        return JobSearchResponse(
+            items=[build_job_document(job) for job in jobs],
+            total=total,
+            total_relation=total_relation,
+            page=query.page,
+            per_page=query.per_page,
+            total_pages=(total + query.per_page - 1) // query.per_page,
+            next_cursor=next_cursor,
+            facets=_facets(db, query) if with_facets and query.facets else None,
+            degraded=True
+        )
+    finally:
+        db.close()
+
+def _search_facets(query: JobSearchQuery) -> Dict[str, List[FacetBucket]]:
+    db = SessionLocal()
+    try:
+        return _facets(db, query)
+    finally:
+        db.close()
+
+def count_jobs_mysql(query: JobSearchQuery) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.count(Job.id)).where(*_conditions(query))).scalar()
+    finally:
+        db.close()
+
+async def search_jobs_fallback(query: JobSearchQuery, with_facets: bool = False) -> JobSearchResponse:
+    return await asyncio.to_thread(search_jobs_mysql, query, with_facets)
+
+async def search_facets_fallback(query: JobSearchQuery) -> Dict[str, List[FacetBucket]]:
+    return await asyncio.to_thread(_search_facets, query)
+
+async def count_jobs_fallback(query: JobSearchQuery) -> int:
+    return await asyncio.to_thread(count_jobs_mysql, query)
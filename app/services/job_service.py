@@ -1,45 +1,363 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from app.models.job import Job, Tag, Location, WorkType
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
+from app.models.job import Job, Location, WorkType, job_tags, job_response_options
 from app.models.recruiter import Recruiter
 from app.schemas.job import JobCreate, JobUpdate, JobResponse
-from app.schemas.job_search import JobSearchQuery, JobSearchResponse
+from app.schemas.job_search import (
+    JobSearchQuery,
+    JobSearchResponse,
+    JobSearchFacets,
+    FacetBucket,
+    FacetField,
+    SortField,
+    SortOrder,
+    PaginationMode,
+    TotalRelation,
+    JobSearchCount
+)
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor, async_keyset_page
 from app.db.redis_db import get_redis
 from app.core.elasticsearch_manager import es_manager
+from app.core.single_flight import single_flight
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.elasticsearch import is_unavailable
+from app.core.metrics import metrics
+from app.services.suggest_service import record_job
+from app.services.reference_data_service import async_ensure_references, async_job_responses, known_tag_ids, job_tag_ids
+from app.services.recommendation_service import publish_job_tags
+from app.services.similar_jobs_service import publish_job_changed
+from app.services.job_indexer import job_indexer, enqueue_job, OUTBOX_UPSERT, OUTBOX_DELETE
+from app.services.job_search_fallback import search_jobs_fallback, search_facets_fallback, count_jobs_fallback
+from app.services.search_canonical import canonicalize_query, record_canonical_lookup
+from app.services.search_cache import (
+    CACHE_HIT,
+    CACHE_STALE,
+    CACHE_MISS,
+    read_search_cache,
+    read_search_cache_many,
+    write_search_cache,
+    acquire_refresh_lock,
+    release_refresh_lock
+)
+import asyncio
 import json
 import hashlib
+import logging
 
+logger = logging.getLogger(__name__)
 redis_client = get_redis()
 REDIS_DB = 1  # Use database 1 for jobs
+JOB_CACHE_TTL = 3600  # Cache for 1 hour
+
+# Số lần chờ worker đang giữ lock tính xong một query chưa có trong cache
+SEARCH_LOCK_WAIT_ATTEMPTS = 10
+SEARCH_LOCK_WAIT_INTERVAL = 0.05
+
+# Giữ tham chiếu tới các task làm mới cache chạy nền
+_background_refreshes = set()
+
+search_flight = single_flight("job_search")
+job_flight = single_flight("job")
+
+search_breaker = CircuitBreaker(
+    "elasticsearch_search",
+    window=settings.SEARCH_BREAKER_WINDOW,
+    min_calls=settings.SEARCH_BREAKER_MIN_CALLS,
+    failure_rate=settings.SEARCH_BREAKER_FAILURE_RATE,
+    slow_call_seconds=settings.SEARCH_BREAKER_SLOW_CALL_SECONDS,
+    slow_call_rate=settings.SEARCH_BREAKER_SLOW_CALL_RATE,
+    open_seconds=settings.SEARCH_BREAKER_OPEN_SECONDS,
+    is_failure=is_unavailable
+)
 
 def get_cache_key(query: Dict[str, Any]) -> str:
     """Tạo cache key từ query parameters"""
     query_str = json.dumps(query, sort_keys=True)
-    return f"job_search:{hashlib.md5(query_str.encode()).hexdigest()}"
+    return f"job_search:result:{hashlib.md5(query_str.encode()).hexdigest()}"
+
+# Các tham số không ảnh hưởng tới số đếm facet
+FACET_KEY_EXCLUDE = {"page", "per_page", "sort", "order", "pagination", "cursor", "use_pit", "facets"}
+
+def get_facet_cache_key(query: JobSearchQuery) -> str:
+    """Facet được cache riêng để dùng chung giữa các trang và kiểu sắp xếp"""
+    data = query.model_dump(mode="json", exclude=FACET_KEY_EXCLUDE, exclude_defaults=True)
+    data["facets"] = sorted({facet.value for facet in query.facets})
+    query_str = json.dumps(data, sort_keys=True)
+    return f"job_search:facets:{hashlib.md5(query_str.encode()).hexdigest()}"
+
+def get_count_cache_key(query: JobSearchQuery) -> str:
+    data = query.model_dump(mode="json", exclude=FACET_KEY_EXCLUDE, exclude_defaults=True)
+    query_str = json.dumps(data, sort_keys=True)
+    return f"job_search:count:{hashlib.md5(query_str.encode()).hexdigest()}"
+
+def job_cache_key(job_id: int) -> str:
+    return f"job:{job_id}"
 
 def get_job_from_cache(job_id: int) -> Optional[JobResponse]:
-    cached_job = redis_client.get(f"job:{job_id}")
+    cached_job = redis_client.get(job_cache_key(job_id))
     if cached_job:
         return JobResponse.model_validate_json(cached_job)
     return None
 
+def get_jobs_from_cache(job_ids: List[int]) -> Dict[int, JobResponse]:
+    """Đọc nhiều job trong một lệnh MGET; job chưa có trong cache không có trong kết quả"""
+    cached_jobs = redis_client.mget([job_cache_key(job_id) for job_id in job_ids])
+    return {
+        job_id: JobResponse.model_validate_json(cached_job)
+        for job_id, cached_job in zip(job_ids, cached_jobs)
+        if cached_job
+    }
+
 def set_job_in_cache(job: JobResponse):
-    redis_client.set(f"job:{job.id}", job.model_dump_json())
-    redis_client.expire(f"job:{job.id}", 3600)  # Cache for 1 hour
+    redis_client.set(job_cache_key(job.id), job.model_dump_json(), ex=JOB_CACHE_TTL)
+
+def set_jobs_in_cache(jobs: List[JobResponse]):
+    pipe = redis_client.pipeline(transaction=False)
+    for job in jobs:
+        pipe.set(job_cache_key(job.id), job.model_dump_json(), ex=JOB_CACHE_TTL)
+    pipe.execute()
 
 def invalidate_job_cache(job_id: int):
-    redis_client.delete(f"job:{job_id}")
+    redis_client.delete(job_cache_key(job_id))
 
 async def search_jobs(query: JobSearchQuery) -> JobSearchResponse:
-    # Tạo cache key
-    cache_key = get_cache_key(query.model_dump())
-    
+    # Các query tương đương dùng chung cache key và cùng một query gửi tới ES
+    query, normalizations = canonicalize_query(query)
+    # Tạo cache key; danh sách kết quả được cache riêng, không phụ thuộc facets
+    cache_key = get_cache_key(query.model_dump(mode="json", exclude={"facets"}, exclude_defaults=True))
+    
+    # Snapshot point-in-time là riêng cho từng lượt duyệt nên không cache
+    if _uses_point_in_time(query):
+        return await _execute_search(query, with_facets=bool(query.facets))
+    
+    # Các request giống hệt nhau đang chạy dùng chung một lần đọc cache/gọi ES
+    if not query.facets:
+        return await search_flight.do(cache_key, lambda: _search_jobs(query, cache_key, normalizations=normalizations))
+    
+    facet_key = get_facet_cache_key(query)
+    return await search_flight.do(
+        f"{cache_key}:{facet_key}",
+        lambda: _search_jobs_with_facets(query, cache_key, facet_key, normalizations)
+    )
+
+async def count_jobs(query: JobSearchQuery) -> JobSearchCount:
+    """Số kết quả chính xác, cho số ít caller cần hơn total có giới hạn của search"""
+    query, _ = canonicalize_query(query)
+    count_key = get_count_cache_key(query)
+    state, cached_count, generation = read_search_cache(count_key, JobSearchCount, "count_cache")
+    if state == CACHE_HIT:
+        return cached_count
+    
+    try:
+        count = JobSearchCount(
+            total=await search_breaker.call(lambda: es_manager.count("jobs", _build_es_query(query)))
+        )
+    except Exception as e:
+        if not _should_fall_back(e):
+            raise
+        metrics.incr("job_search.fallback")
+        return JobSearchCount(total=await count_jobs_fallback(query), degraded=True)
+    write_search_cache(count_key, count, generation)
+    return count
+
+async def search_jobs_batch(queries: List[JobSearchQuery]) -> List[JobSearchResponse]:
+    """Nhiều query trong một lần đọc cache và một msearch cho các query chưa có trong cache.
+
+    Query có facets hoặc phân trang cursor đi theo search_jobs như bình thường.
+    """
+    results: List[Optional[JobSearchResponse]] = [None] * len(queries)
+    positions: Dict[str, List[int]] = {}
+    canonical: Dict[str, Tuple[JobSearchQuery, List[str]]] = {}
+    individual: List[int] = []
+    for i, raw_query in enumerate(queries):
+        query, normalizations = canonicalize_query(raw_query)
+        if query.facets or query.pagination == PaginationMode.CURSOR or query.cursor or query.use_pit:
+            individual.append(i)
+            continue
+        cache_key = get_cache_key(query.model_dump(mode="json", exclude={"facets"}, exclude_defaults=True))
+        positions.setdefault(cache_key, []).append(i)
+        canonical.setdefault(cache_key, (query, normalizations))
+    # Các query riêng chạy song song với phần đọc cache và msearch bên dưới
+    individual_results = asyncio.gather(*(search_jobs(queries[i]) for i in individual))
+    try:
+        cache_keys = list(positions)
+        misses = []
+        for cache_key, (state, cached_result, generation) in zip(cache_keys, read_search_cache_many(cache_keys)):
+            query, normalizations = canonical[cache_key]
+            record_canonical_lookup(normalizations, state)
+            if state == CACHE_MISS:
+                misses.append((cache_key, query, generation))
+                continue
+            if state == CACHE_STALE:
+                lock = acquire_refresh_lock(cache_key)
+                if lock:
+                    _run_in_background(_refresh_search_cache(query, cache_key, generation, lock))
+            for i in positions[cache_key]:
+                results[i] = cached_result
+        
+        if misses:
+            responses = await _search_misses(misses)
+            for (cache_key, _, _), response in zip(misses, responses):
+                for i in positions[cache_key]:
+                    results[i] = response
+    except BaseException:
+        # Hủy các query riêng và đọc kết quả của chúng để không còn task chạy mồ côi
+        individual_results.cancel()
+        await asyncio.gather(individual_results, return_exceptions=True)
+        raise
+    
+    for i, response in zip(individual, await individual_results):
+        results[i] = response
+    return results
+
+async def _search_misses(misses: List[Tuple[str, JobSearchQuery, int]]) -> List[JobSearchResponse]:
+    """Nhánh miss của search_jobs cho nhiều query (cache_key, query, generation).
+
+    Key lấy được refresh lock đi chung một msearch; key đang được tính ở nơi khác
+    đi qua search_flight và chờ kết quả như search_jobs, không gọi ES thêm lần nữa.
+    """
+    locks = [acquire_refresh_lock(cache_key) for cache_key, _, _ in misses]
+    led = [(miss, lock) for miss, lock in zip(misses, locks) if lock]
+
+    async def search_led() -> List[JobSearchResponse]:
+        if not led:
+            return []
+        try:
+            responses = await _execute_search_many([query for (_, query, _), _ in led])
+            for ((cache_key, _, generation), _), response in zip(led, responses):
+                if not response.degraded:
+                    write_search_cache(cache_key, response, generation)
+            return responses
+        finally:
+            for (cache_key, _, _), lock in led:
+                release_refresh_lock(cache_key, lock)
+
+    def search_waiting(cache_key: str, query: JobSearchQuery):
+        return search_flight.do(cache_key, lambda: _search_jobs(query, cache_key))
+
+    led_responses, *waiting_responses = await asyncio.gather(
+        search_led(),
+        *(search_waiting(cache_key, query) for (cache_key, query, _), lock in zip(misses, locks) if not lock)
+    )
+    led_iter, waiting_iter = iter(led_responses), iter(waiting_responses)
+    return [next(led_iter) if lock else next(waiting_iter) for lock in locks]
+
+async def _search_jobs(
+    query: JobSearchQuery,
+    cache_key: str,
+    with_facets: bool = False,
+    normalizations: Sequence[str] = ()
+) -> JobSearchResponse:
+    """Trả về danh sách kết quả; chỉ có facets khi phải gọi ES và with_facets=True"""
     # Kiểm tra cache
-    cached_result = redis_client.get(cache_key)
-    if cached_result:
-        return JobSearchResponse.model_validate_json(cached_result)
-    
+    state, cached_result, generation = read_search_cache(cache_key)
+    record_canonical_lookup(normalizations, state)
+    if state == CACHE_HIT:
+        return cached_result
+    
+    # Stale-while-revalidate: trả kết quả cũ, chỉ worker giữ lock tính lại trong nền
+    if state == CACHE_STALE:
+        lock = acquire_refresh_lock(cache_key)
+        if lock:
+            _run_in_background(_refresh_search_cache(query, cache_key, generation, lock))
+        return cached_result
+    
+    # Chưa có trong cache: nếu worker khác đang tính thì chờ một chút
+    lock = acquire_refresh_lock(cache_key)
+    if not lock:
+        for _ in range(SEARCH_LOCK_WAIT_ATTEMPTS):
+            await asyncio.sleep(SEARCH_LOCK_WAIT_INTERVAL)
+            state, cached_result, generation = read_search_cache(cache_key)
+            if state == CACHE_HIT:
+                return cached_result
+        return await _execute_search(query, with_facets)
+    
+    try:
+        response = await _execute_search(query, with_facets)
+        # Kết quả từ fallback không được cache để ES phục vụ lại ngay khi hồi phục
+        if not response.degraded:
+            write_search_cache(cache_key, response.model_copy(update={"facets": None}), generation)
+    finally:
+        release_refresh_lock(cache_key, lock)
+    return response
+
+async def _search_jobs_with_facets(
+    query: JobSearchQuery,
+    cache_key: str,
+    facet_key: str,
+    normalizations: Sequence[str] = ()
+) -> JobSearchResponse:
+    state, cached_facets, generation = read_search_cache(facet_key, JobSearchFacets, "facet_cache")
+    if state != CACHE_MISS:
+        if state == CACHE_STALE:
+            lock = acquire_refresh_lock(facet_key)
+            if lock:
+                _run_in_background(_refresh_facet_cache(query, facet_key, generation, lock))
+        response = await _search_jobs(query, cache_key, normalizations=normalizations)
+        return response.model_copy(update={"facets": cached_facets.facets})
+    
+    # Nếu danh sách kết quả cũng phải gọi ES thì tính facets trong cùng request đó
+    response = await _search_jobs(query, cache_key, with_facets=True, normalizations=normalizations)
+    if response.facets is None:
+        facets, degraded = await _execute_facets(query)
+        response = response.model_copy(update={"facets": facets, "degraded": response.degraded or degraded})
+    if not response.degraded:
+        write_search_cache(facet_key, JobSearchFacets(facets=response.facets), generation)
+    return response
+
+def _run_in_background(coro):
+    task = asyncio.create_task(coro)
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+async def _refresh_search_cache(query: JobSearchQuery, cache_key: str, generation: int, lock: str):
+    try:
+        response = await _execute_search(query)
+        if not response.degraded:
+            write_search_cache(cache_key, response, generation)
+    except Exception:
+        logger.exception("Failed to refresh search cache %s", cache_key)
+    finally:
+        release_refresh_lock(cache_key, lock)
+
+async def _refresh_facet_cache(query: JobSearchQuery, facet_key: str, generation: int, lock: str):
+    try:
+        facets, degraded = await _execute_facets(query)
+        if not degraded:
+            write_search_cache(facet_key, JobSearchFacets(facets=facets), generation)
+    except Exception:
+        logger.exception("Failed to refresh facet cache %s", facet_key)
+    finally:
+        release_refresh_lock(facet_key, lock)
+
+def _uses_point_in_time(query: JobSearchQuery) -> bool:
+    if query.use_pit:
+        return True
+    return bool(query.cursor and decode_cursor(query.cursor).get("pit"))
+
+def _build_filters(query: JobSearchQuery) -> Dict[str, Dict[str, Any]]:
+    """Filter của query theo tên trường, để facet có thể bỏ filter của chính nó"""
+    filters = {}
+    if query.location_id:
+        filters[FacetField.LOCATION.value] = {"term": {"location_id": query.location_id}}
+    if query.work_type_id:
+        filters[FacetField.WORK_TYPE.value] = {"term": {"work_type_id": query.work_type_id}}
+    if query.experience_level:
+        filters[FacetField.EXPERIENCE_LEVEL.value] = {"term": {"experience_level": query.experience_level}}
+    if query.industry:
+        filters[FacetField.INDUSTRY.value] = {"term": {"industry": query.industry}}
+    if query.tag_ids:
+        filters[FacetField.TAGS.value] = {"terms": {"tags": query.tag_ids}}
+    if query.salary_min is not None:
+        filters["salary_min"] = {"range": {"salary_min": {"gte": query.salary_min}}}
+    if query.salary_max is not None:
+        filters["salary_max"] = {"range": {"salary_max": {"lte": query.salary_max}}}
+    return filters
+
+def _build_es_query(query: JobSearchQuery, exclude: Sequence[str] = ()) -> Dict[str, Any]:
     # Tạo Elasticsearch query
     es_query = {
         "bool": {
@@ -59,20 +377,127 @@ async def search_jobs(query: JobSearchQuery) -> JobSearchResponse:
         })
     
     # Thêm filters
-    if query.location_id:
-        es_query["bool"]["filter"].append({"term": {"location_id": query.location_id}})
-    if query.work_type_id:
-        es_query["bool"]["filter"].append({"term": {"work_type_id": query.work_type_id}})
-    if query.experience_level:
-        es_query["bool"]["filter"].append({"term": {"experience_level": query.experience_level}})
-    if query.industry:
-        es_query["bool"]["filter"].append({"term": {"industry": query.industry}})
-    if query.tag_ids:
-        es_query["bool"]["filter"].append({"terms": {"tags": query.tag_ids}})
-    if query.salary_min is not None:
-        es_query["bool"]["filter"].append({"range": {"salary_min": {"gte": query.salary_min}}})
-    if query.salary_max is not None:
-        es_query["bool"]["filter"].append({"range": {"salary_max": {"lte": query.salary_max}}})
+    for field, clause in _build_filters(query).items():
+        if field not in exclude:
+            es_query["bool"]["filter"].append(clause)
+    
+    return es_query
+
+def _build_facet_request(query: JobSearchQuery) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any]]:
+    """Trả về (query, post_filter, aggs) theo mô hình post_filter.
+
+    Filter của các trường có facet được chuyển sang post_filter để không ảnh
+    hưởng tới aggregation; mỗi facet chỉ áp dụng filter của các facet khác.
+    """
+    facet_fields = [facet.value for facet in dict.fromkeys(query.facets)]
+    filters = _build_filters(query)
+    es_query = _build_es_query(query, exclude=facet_fields)
+    
+    post_filters = [filters[field] for field in facet_fields if field in filters]
+    post_filter = {"bool": {"filter": post_filters}} if post_filters else None
+    
+    aggs = {}
+    for field in facet_fields:
+        others = [filters[other] for other in facet_fields if other != field and other in filters]
+        aggs[field] = {
+            "filter": {"bool": {"filter": others}},
+            "aggs": {"values": {"terms": {"field": field, "size": settings.SEARCH_FACET_SIZE}}}
+        }
+    return es_query, post_filter, aggs
+
+def _parse_facets(result: Dict[str, Any]) -> Dict[str, List[FacetBucket]]:
+    return {
+        field: [
+            FacetBucket(value=bucket["key"], count=bucket["doc_count"])
+            for bucket in agg["values"]["buckets"]
+        ]
+        for field, agg in result.get("aggregations", {}).items()
+    }
+
+def _should_fall_back(error: Exception) -> bool:
+    return isinstance(error, CircuitOpenError) or is_unavailable(error)
+
+async def _execute_search(query: JobSearchQuery, with_facets: bool = False) -> JobSearchResponse:
+    """Gọi Elasticsearch qua circuit breaker, chuyển sang MySQL khi ES không sẵn sàng"""
+    try:
+        return await search_breaker.call(lambda: _execute_es_search(query, with_facets))
+    except Exception as e:
+        if not _should_fall_back(e):
+            raise
+    metrics.incr("job_search.fallback")
+    return await search_jobs_fallback(query, with_facets)
+
+async def _execute_search_many(queries: List[JobSearchQuery]) -> List[JobSearchResponse]:
+    """Một msearch qua circuit breaker; query lỗi riêng lẻ được chạy lại từng cái"""
+    try:
+        responses = await search_breaker.call(lambda: _execute_es_msearch(queries))
+    except Exception as e:
+        if not _should_fall_back(e):
+            raise
+        metrics.incr("job_search.fallback", len(queries))
+        return list(await asyncio.gather(*(search_jobs_fallback(query) for query in queries)))
+    
+    failed = [i for i, response in enumerate(responses) if response is None]
+    for i, response in zip(failed, await asyncio.gather(*(_execute_search(queries[i]) for i in failed))):
+        responses[i] = response
+    return responses
+
+async def _execute_facets(query: JobSearchQuery) -> Tuple[Dict[str, List[FacetBucket]], bool]:
+    """Trả về (facets, degraded)"""
+    try:
+        return await search_breaker.call(lambda: _execute_es_facets(query)), False
+    except Exception as e:
+        if not _should_fall_back(e):
+            raise
+    metrics.incr("job_search.fallback")
+    return await search_facets_fallback(query), True
+
+async def _execute_es_facets(query: JobSearchQuery) -> Dict[str, List[FacetBucket]]:
+    """Chỉ tính facets (size=0), dùng khi danh sách kết quả đã có trong cache"""
+    es_query, _, aggs = _build_facet_request(query)
+    result = await es_manager.search(index_name="jobs", query=es_query, size=0, aggs=aggs, track_total_hits=False)
+    return _parse_facets(result)
+
+def _build_sort(query: JobSearchQuery) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Trả về (sort của ES, khóa sort lưu trong cursor)"""
+    sort_field = (query.sort or SortField.CREATED_AT).value
+    sort_order = (query.order or SortOrder.DESC).value
+    # id làm tie-breaker để thứ tự ổn định giữa các trang
+    return [{sort_field: {"order": sort_order}}, {"id": {"order": sort_order}}], [sort_field, sort_order]
+
+async def _execute_es_msearch(queries: List[JobSearchQuery]) -> List[Optional[JobSearchResponse]]:
+    """Các query phân trang theo số trang, không facets; None cho query bị lỗi"""
+    bodies = [
+        es_manager.build_search_body(
+            _build_es_query(query),
+            from_=(query.page - 1) * query.per_page,
+            size=query.per_page,
+            sort=_build_sort(query)[0],
+            track_total_hits=_track_total_hits()
+        )
+        for query in queries
+    ]
+    results = await es_manager.msearch("jobs", bodies)
+    responses = []
+    for query, result in zip(queries, results):
+        if "error" in result:
+            logger.warning("msearch item failed: %s", result["error"])
+            responses.append(None)
+        else:
+            responses.append(_build_page_response(query, result))
+    return responses
+
+async def _execute_es_search(query: JobSearchQuery, with_facets: bool = False) -> JobSearchResponse:
+    if with_facets and query.facets:
+        es_query, post_filter, aggs = _build_facet_request(query)
+    else:
+        es_query, post_filter, aggs = _build_es_query(query), None, None
+    sort, sort_key = _build_sort(query)
+    
+    if query.pagination == PaginationMode.CURSOR or query.cursor:
+        return await _execute_cursor_search(
+            query, es_query, sort, sort_key, post_filter=post_filter, aggs=aggs
+        )
     
     # Thực hiện tìm kiếm
     result = await es_manager.search(
@@ -80,55 +505,103 @@ async def search_jobs(query: JobSearchQuery) -> JobSearchResponse:
         query=es_query,
         from_=(query.page - 1) * query.per_page,
         size=query.per_page,
-        sort={query.sort: {"order": query.order}}
+        sort=sort,
+        post_filter=post_filter,
+        aggs=aggs,
+        track_total_hits=_track_total_hits()
     )
-    
+    return _build_page_response(query, result, with_facets=bool(aggs))
+
+def _track_total_hits() -> Union[bool, int]:
+    # Đếm chính xác buộc ES duyệt mọi document khớp; có ngưỡng thì dừng sớm được
+    ceiling = settings.SEARCH_TOTAL_HITS_CEILING
+    return ceiling if ceiling > 0 else True
+
+def _parse_total(result: Dict[str, Any]) -> Tuple[int, TotalRelation]:
+    total = result["hits"]["total"]
+    return total["value"], TotalRelation(total["relation"])
+
+def _build_page_response(query: JobSearchQuery, result: Dict[str, Any], with_facets: bool = False) -> JobSearchResponse:
     # Tạo response
-    total = result["hits"]["total"]["value"]
+    total, total_relation = _parse_total(result)
     items = [hit["_source"] for hit in result["hits"]["hits"]]
     
-    response = JobSearchResponse(
+    return JobSearchResponse(
         items=items,
         total=total,
+        total_relation=total_relation,
         page=query.page,
         per_page=query.per_page,
-        total_pages=(total + query.per_page - 1) // query.per_page
+        total_pages=(total + query.per_page - 1) // query.per_page,
+        facets=_parse_facets(result) if with_facets else None
     )
-    
-    # Cache kết quả
-    redis_client.set(cache_key, response.model_dump_json())
-    redis_client.expire(cache_key, 3600)  # Cache for 1 hour
-    
-    return response
 
-async def index_job(job: Job):
-    """Index job vào Elasticsearch"""
-    await es_manager.index_document(
+async def _execute_cursor_search(
+    query: JobSearchQuery,
+    es_query: Dict[str, Any],
+    sort: List[Dict[str, Any]],
+    sort_key: List[str],
+    post_filter: Optional[Dict[str, Any]] = None,
+    aggs: Optional[Dict[str, Any]] = None
+) -> JobSearchResponse:
+    """Phân trang bằng search_after: chi phí mỗi trang không tăng theo độ sâu"""
+    search_after = None
+    pit_id = None
+    
+    if query.cursor:
+        state = decode_cursor(query.cursor)
+        if state.get("sort") != sort_key:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match the requested sort"
+            )
+        search_after = state.get("after")
+        pit_id = state.get("pit")
+    elif query.use_pit:
+        pit_id = await es_manager.open_point_in_time("jobs", settings.SEARCH_PIT_KEEP_ALIVE)
+    
+    result = await es_manager.search(
         index_name="jobs",
-        document_id=job.id,
-        document={
-            "id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "salary_min": job.salary_min,
-            "salary_max": job.salary_max,
-            "location_id": job.location_id,
-            "work_type_id": job.work_type_id,
-            "recruiter_id": job.recruiter_id,
-            "experience_level": job.experience_level,
-            "industry": job.industry,
-            "created_at": job.created_at.isoformat(),
-            "tags": [tag.id for tag in job.tags]
-        }
+        query=es_query,
+        size=query.per_page,
+        sort=sort,
+        search_after=search_after,
+        pit={"id": pit_id, "keep_alive": settings.SEARCH_PIT_KEEP_ALIVE} if pit_id else None,
+        post_filter=post_filter,
+        aggs=aggs,
+        track_total_hits=_track_total_hits()
+    )
+    
+    hits = result["hits"]["hits"]
+    total, total_relation = _parse_total(result)
+    # ES có thể trả về pit_id mới sau mỗi lần search
+    pit_id = result.get("pit_id", pit_id)
+    
+    next_cursor = None
+    if len(hits) == query.per_page:
+        next_cursor = encode_cursor({
+            "sort": sort_key,
+            "after": hits[-1]["sort"],
+            "pit": pit_id
+        })
+    elif pit_id:
+        # Đã tới trang cuối, giải phóng point-in-time
+        await es_manager.close_point_in_time(pit_id)
+    
+    return JobSearchResponse(
+        items=[hit["_source"] for hit in hits],
+        total=total,
+        total_relation=total_relation,
+        page=query.page,
+        per_page=query.per_page,
+        total_pages=(total + query.per_page - 1) // query.per_page,
+        next_cursor=next_cursor,
+        facets=_parse_facets(result) if aggs else None
     )
 
-async def delete_job_from_index(job_id: int):
-    """Xóa job khỏi Elasticsearch index"""
-    await es_manager.delete_document(index_name="jobs", document_id=job_id)
-
-async def create_job(db: Session, job: JobCreate, recruiter_id: int) -> JobResponse:
+async def create_job(db: AsyncSession, job: JobCreate, recruiter_id: int) -> JobResponse:
     # Verify recruiter exists
-    recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    recruiter = await db.get(Recruiter, recruiter_id)
     if not recruiter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -148,34 +621,39 @@ async def create_job(db: Session, job: JobCreate, recruiter_id: int) -> JobRespo
         industry=job.industry
     )
     
+    db.add(db_job)
+    await db.flush()
     # Add tags if provided
     if job.tag_ids:
-        tags = db.query(Tag).filter(Tag.id.in_(job.tag_ids)).all()
-        db_job.tags = tags
-    
-    db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
-    
-    # Index vào Elasticsearch
-    await index_job(db_job)
+        await _set_job_tags(db, db_job.id, job.tag_ids)
+    # Elasticsearch được cập nhật bởi job indexer từ outbox
+    enqueue_job(db, db_job.id, OUTBOX_UPSERT)
+    await db.commit()
+    db_job = await _load_job(db, db_job.id)
+    job_indexer.notify()
     
     # Convert to response model
-    job_response = JobResponse.model_validate(db_job)
+    job_response = (await async_job_responses(db, [db_job]))[0]
+    record_job(job_response)
+    publish_job_tags(job_response.id, [tag.id for tag in job_response.tags])
+    publish_job_changed(job_response.id)
     
     # Cache the job
     set_job_in_cache(job_response)
     
     return job_response
 
-def get_job(db: Session, job_id: int) -> JobResponse:
+async def get_job(db: AsyncSession, job_id: int) -> JobResponse:
+    return await job_flight.do(str(job_id), lambda: _get_job(db, job_id))
+
+async def _get_job(db: AsyncSession, job_id: int) -> JobResponse:
     # Try to get from cache first
     cached_job = get_job_from_cache(job_id)
     if cached_job:
         return cached_job
     
     # If not in cache, get from database
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+    db_job = await _load_job(db, job_id)
     if not db_job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,13 +661,45 @@ def get_job(db: Session, job_id: int) -> JobResponse:
         )
     
     # Convert to response model and cache
-    job_response = JobResponse.model_validate(db_job)
+    job_response = (await async_job_responses(db, [db_job]))[0]
     set_job_in_cache(job_response)
     
     return job_response
 
-def get_jobs(
-    db: Session,
+async def get_jobs_by_ids(db: AsyncSession, job_ids: List[int]) -> Tuple[List[JobResponse], List[int]]:
+    """Nhiều job theo id, đúng thứ tự yêu cầu; trả về (jobs, id không tồn tại).
+
+    Một MGET cho cache, một truy vấn IN (...) cho các job chưa có trong cache
+    và một pipeline ghi lại cache, không phụ thuộc số lượng id.
+    """
+    unique_ids = list(dict.fromkeys(job_ids))
+    jobs = get_jobs_from_cache(unique_ids)
+    misses = [job_id for job_id in unique_ids if job_id not in jobs]
+    if misses:
+        stmt = select(Job).options(*job_response_options()).where(Job.id.in_(misses))
+        loaded = await async_job_responses(db, (await db.scalars(stmt)).all())
+        if loaded:
+            set_jobs_in_cache(loaded)
+        jobs.update((job.id, job) for job in loaded)
+    
+    return [jobs[job_id] for job_id in job_ids if job_id in jobs], [job_id for job_id in unique_ids if job_id not in jobs]
+
+async def _load_job(db: AsyncSession, job_id: int) -> Optional[Job]:
+    """Job kèm id các tag, đủ để tạo JobResponse không cần lazy load.
+
+    populate_existing nạp lại cả object đã có trong session (ví dụ sau commit),
+    vì AsyncSession không thể lazy load các cột server cập nhật.
+    """
+    stmt = (
+        select(Job)
+        .options(*job_response_options())
+        .where(Job.id == job_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.scalars(stmt)).first()
+
+async def get_jobs(
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
     location_id: Optional[int] = None,
@@ -199,30 +709,58 @@ def get_jobs(
     tag_ids: Optional[List[int]] = None,
     recruiter_id: Optional[int] = None
 ) -> List[JobResponse]:
-    query = db.query(Job)
+    stmt = _job_list_query(location_id, work_type_id, experience_level, industry, tag_ids, recruiter_id)
+    
+    # Execute query
+    jobs = (await db.scalars(stmt.offset(skip).limit(limit))).all()
+    
+    # Convert to response models
+    return await async_job_responses(db, jobs)
+
+async def get_jobs_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    location_id: Optional[int] = None,
+    work_type_id: Optional[int] = None,
+    experience_level: Optional[str] = None,
+    industry: Optional[str] = None,
+    tag_ids: Optional[List[int]] = None,
+    recruiter_id: Optional[int] = None
+) -> Tuple[List[JobResponse], Optional[str]]:
+    """Job mới nhất trước, phân trang keyset; trả về (jobs, cursor trang tiếp theo)"""
+    stmt = _job_list_query(location_id, work_type_id, experience_level, industry, tag_ids, recruiter_id)
+    jobs, next_cursor = await async_keyset_page(db, stmt, Job.created_at, Job.id, cursor, limit)
+    return await async_job_responses(db, jobs), next_cursor
+
+def _job_list_query(
+    location_id: Optional[int] = None,
+    work_type_id: Optional[int] = None,
+    experience_level: Optional[str] = None,
+    industry: Optional[str] = None,
+    tag_ids: Optional[List[int]] = None,
+    recruiter_id: Optional[int] = None
+):
+    stmt = select(Job).options(*job_response_options())
     
     # Apply filters
     if location_id:
-        query = query.filter(Job.location_id == location_id)
+        stmt = stmt.where(Job.location_id == location_id)
     if work_type_id:
-        query = query.filter(Job.work_type_id == work_type_id)
+        stmt = stmt.where(Job.work_type_id == work_type_id)
     if experience_level:
-        query = query.filter(Job.experience_level == experience_level)
+        stmt = stmt.where(Job.experience_level == experience_level)
     if industry:
-        query = query.filter(Job.industry == industry)
+        stmt = stmt.where(Job.industry == industry)
     if tag_ids:
-        query = query.join(Job.tags).filter(Tag.id.in_(tag_ids))
+        # IN (subquery) thay vì JOIN: job khớp nhiều tag không bị lặp, LIMIT đếm đúng số job
+        stmt = stmt.where(Job.id.in_(select(job_tags.c.job_id).where(job_tags.c.tag_id.in_(tag_ids))))
     if recruiter_id:
-        query = query.filter(Job.recruiter_id == recruiter_id)
-    
-    # Execute query
-    jobs = query.offset(skip).limit(limit).all()
-    
-    # Convert to response models
-    return [JobResponse.model_validate(job) for job in jobs]
+        stmt = stmt.where(Job.recruiter_id == recruiter_id)
+    return stmt
 
-async def update_job(db: Session, job_id: int, job: JobUpdate, recruiter_id: int) -> JobResponse:
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+async def update_job(db: AsyncSession, job_id: int, job: JobUpdate, recruiter_id: int) -> JobResponse:
+    db_job = await _load_job(db, job_id)
     if not db_job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -244,23 +782,33 @@ async def update_job(db: Session, job_id: int, job: JobUpdate, recruiter_id: int
     
     # Update tags if provided
     if "tag_ids" in update_data:
-        tags = db.query(Tag).filter(Tag.id.in_(update_data["tag_ids"])).all()
-        db_job.tags = tags
-    
-    db.commit()
-    db.refresh(db_job)
+        await db.execute(delete(job_tags).where(job_tags.c.job_id == job_id))
+        await _set_job_tags(db, job_id, update_data["tag_ids"] or [])
     
-    # Update Elasticsearch index
-    await index_job(db_job)
+    enqueue_job(db, db_job.id, OUTBOX_UPSERT)
+    await db.commit()
+    db_job = await _load_job(db, job_id)
+    job_indexer.notify()
+    if "tag_ids" in update_data:
+        publish_job_tags(db_job.id, job_tag_ids(db_job))
+    if update_data.keys() & {"title", "description", "tag_ids"}:
+        publish_job_changed(db_job.id)
     
     # Update cache
-    job_response = JobResponse.model_validate(db_job)
+    job_response = (await async_job_responses(db, [db_job]))[0]
     set_job_in_cache(job_response)
     
     return job_response
 
-async def delete_job(db: Session, job_id: int, recruiter_id: int):
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+async def _set_job_tags(db: AsyncSession, job_id: int, tag_ids: List[int]):
+    """Ghi thẳng vào job_tags; tag được kiểm tra qua reference cache thay vì truy vấn bảng tags"""
+    await async_ensure_references(db, tag_ids=tag_ids)
+    rows = [{"job_id": job_id, "tag_id": tag_id} for tag_id in known_tag_ids(tag_ids)]
+    if rows:
+        await db.execute(insert(job_tags), rows)
+
+async def delete_job(db: AsyncSession, job_id: int, recruiter_id: int):
+    db_job = await db.get(Job, job_id)
     if not db_job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -274,11 +822,12 @@ async def delete_job(db: Session, job_id: int, recruiter_id: int):
             detail="You can only delete your own jobs"
         )
     
-    # Delete from Elasticsearch
-    await delete_job_from_index(job_id)
+    await db.delete(db_job)
+    enqueue_job(db, job_id, OUTBOX_DELETE)
+    await db.commit()
+    job_indexer.notify()
+    publish_job_tags(job_id, None)
+    publish_job_changed(job_id)
     
     # Delete from cache
-    invalidate_job_cache(job_id)
-    
-    db.delete(db_job)
-    db.commit() 
\ No newline at end of file
+    invalidate_job_cache(job_id) 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from app.core.pagination import keyset_page
 from app.models.profile import Profile
 from app.schemas.profile import ProfileCreate, ProfileUpdate, ProfileResponse
 
@@ -29,14 +30,26 @@ def get_profiles(
     email: Optional[str] = None,
     full_name: Optional[str] = None
 ) -> List[Profile]:
+    return _profile_list_query(db, email, full_name).offset(skip).limit(limit).all()
+
+def get_profiles_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    email: Optional[str] = None,
+    full_name: Optional[str] = None
+) -> Tuple[List[Profile], Optional[str]]:
+    """Profile mới nhất trước, phân trang keyset; trả về (profiles, cursor trang tiếp theo)"""
+    return keyset_page(_profile_list_query(db, email, full_name), Profile.created_at, Profile.id, cursor, limit)
+
+def _profile_list_query(db: Session, email: Optional[str], full_name: Optional[str]):
     query = db.query(Profile)
     
     if email:
         query = query.filter(Profile.email.ilike(f"%{email}%"))
     if full_name:
         query = query.filter(Profile.full_name.ilike(f"%{full_name}%"))
-    
-    return query.offset(skip).limit(limit).all()
+    return query
 
 def create_profile(db: Session, profile: ProfileCreate, user_id: int) -> Profile:
     # Check if user already has a profile
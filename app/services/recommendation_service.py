@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.events import event_bus
+from app.core.tag_index import TagJobIndex
+from app.db.database import SessionLocal
+from app.models.job import Job, job_tags, job_response_options
+from app.schemas.job import JobRecommendation
+from app.services.profile_service import get_profile_by_user_id
+from app.services.reference_data_service import job_responses, reference_cache
+
+logger = logging.getLogger(__name__)
+
+RECOMMEND_JOB_CHANNEL = "recommend:job_changed"
+
+# Index tag -> jobs trong từng worker, cập nhật qua event bus khi job thay đổi
+tag_index = TagJobIndex(compact_threshold=settings.RECOMMEND_COMPACT_THRESHOLD)
+_ready = threading.Event()
+_state_lock = threading.Lock()
+# Sự kiện nhận được trong lúc đang nạp index, được áp dụng lại sau khi nạp xong
+_events_during_load: Optional[List[dict]] = None
+
+def load_recommendation_index(db: Session):
+    global _events_during_load
+    with _state_lock:
+        _events_during_load = []
+
+    try:
+        chunks = [
+            np.asarray(rows, dtype=np.int64)
+            for rows in db.execute(
+                select(job_tags.c.job_id, job_tags.c.tag_id).execution_options(yield_per=50000)
+            ).partitions()
+        ]
+        pairs = np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int64)
+        tag_index.load(pairs[:, 0], pairs[:, 1])
+    except BaseException:
+        # Không giữ buffer khi nạp lỗi, nếu không mọi sự kiện sau đó bị giữ lại mãi
+        with _state_lock:
+            _events_during_load = None
+        raise
+
+    with _state_lock:
+        events, _events_during_load = _events_during_load, None
+    for message in events:
+        _apply(message)
+    _ready.set()
+    logger.info("Recommendation index loaded: %d jobs", len(tag_index))
+
+def _load_in_background():
+    """Nạp index, thử lại với backoff tăng dần tới khi thành công"""
+    attempt = 0
+    while True:
+        try:
+            with SessionLocal() as db:
+                load_recommendation_index(db)
+            return
+        except Exception:
+            attempt += 1
+            delay = min(2 ** attempt, settings.RECOMMEND_LOAD_MAX_BACKOFF_SECONDS)
+            logger.exception("Failed to load recommendation index, retrying in %ds", delay)
+            time.sleep(delay)
+
+def start_recommendation_index():
+    """Nạp index trong thread nền để không chặn lúc khởi động"""
+    threading.Thread(target=_load_in_background, name="recommendation-index", daemon=True).start()
+
+def publish_job_tags(job_id: int, tag_ids: Optional[List[int]]):
+    """Báo cho mọi worker tags mới của job; tag_ids=None nghĩa là job đã bị xóa"""
+    event_bus.publish(RECOMMEND_JOB_CHANNEL, {"job_id": job_id, "tag_ids": tag_ids})
+
+def publish_jobs_tags(tag_ids_by_job: Dict[int, List[int]]):
+    """Như publish_job_tags cho nhiều job (ví dụ khi import), trong một round trip"""
+    event_bus.publish_many(
+        RECOMMEND_JOB_CHANNEL,
+        [{"job_id": job_id, "tag_ids": tag_ids} for job_id, tag_ids in tag_ids_by_job.items()]
+    )
+
+def _apply(message: dict):
+    if message.get("tag_ids") is None:
+        tag_index.remove(message["job_id"])
+    else:
+        tag_index.upsert(message["job_id"], message["tag_ids"])
+
+def _on_job_changed(message: dict):
+    with _state_lock:
+        if _events_during_load is not None:
+            _events_during_load.append(message)
+            return
+    _apply(message)
+
+event_bus.subscribe(RECOMMEND_JOB_CHANNEL, _on_job_changed)
+
+def recommend_jobs(db: Session, user_id: int, limit: int = 20) -> List[JobRecommendation]:
+    if not _ready.is_set():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are not ready yet"
+        )
+
+    profile = get_profile_by_user_id(db, user_id)
+    # Tra theo reference cache để tag tạo sau khi khởi động vẫn khớp
+    tag_ids = {tag_id for tag_id in map(reference_cache.tag_id_by_name, profile.skills or []) if tag_id is not None}
+    if not tag_ids:
+        return []
+
+    ranked = tag_index.top_k(tag_ids, limit)
+    jobs = db.query(Job).options(*job_response_options()).filter(Job.id.in_([job_id for job_id, _ in ranked])).all()
+    responses = {job.id: job for job in job_responses(db, jobs)}
+    return [
+        JobRecommendation(job=responses[job_id], score=score)
+        for job_id, score in ranked
+        if job_id in responses
+    ]
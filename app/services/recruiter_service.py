@@ -1,14 +1,20 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.models.recruiter import Recruiter
+from app.models.user import User
 from app.schemas.recruiter import RecruiterCreate, RecruiterUpdate, RecruiterResponse
 from app.db.redis_db import get_redis
+from app.core.single_flight import single_flight
+from app.services.auth_service import invalidate_user
 import json
 
 redis_client = get_redis()
 REDIS_DB = 2  # Use database 2 for recruiters
 
+recruiter_flight = single_flight("recruiter")
+
 def get_recruiter_from_cache(recruiter_id: int) -> Optional[RecruiterResponse]:
     cached_recruiter = redis_client.get(f"recruiter:{recruiter_id}")
     if cached_recruiter:
@@ -22,9 +28,9 @@ def set_recruiter_in_cache(recruiter: RecruiterResponse):
 def invalidate_recruiter_cache(recruiter_id: int):
     redis_client.delete(f"recruiter:{recruiter_id}")
 
-def create_recruiter(db: Session, user_id: int, recruiter: RecruiterCreate) -> RecruiterResponse:
+async def create_recruiter(db: AsyncSession, user_id: int, recruiter: RecruiterCreate) -> RecruiterResponse:
     # Check if user already has a recruiter profile
-    existing_recruiter = db.query(Recruiter).filter(Recruiter.user_id == user_id).first()
+    existing_recruiter = await db.scalar(select(Recruiter).where(Recruiter.user_id == user_id))
     if existing_recruiter:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,8 +53,8 @@ def create_recruiter(db: Session, user_id: int, recruiter: RecruiterCreate) -> R
     )
     
     db.add(db_recruiter)
-    db.commit()
-    db.refresh(db_recruiter)
+    await db.commit()
+    await db.refresh(db_recruiter)
     
     # Convert to response model
     recruiter_response = RecruiterResponse.model_validate(db_recruiter)
@@ -56,16 +62,22 @@ def create_recruiter(db: Session, user_id: int, recruiter: RecruiterCreate) -> R
     # Cache the recruiter
     set_recruiter_in_cache(recruiter_response)
     
+    # Snapshot của user cần recruiter_id mới
+    invalidate_user(await _get_username(db, user_id))
+    
     return recruiter_response
 
-def get_recruiter(db: Session, recruiter_id: int) -> RecruiterResponse:
+async def get_recruiter(db: AsyncSession, recruiter_id: int) -> RecruiterResponse:
+    return await recruiter_flight.do(str(recruiter_id), lambda: _get_recruiter(db, recruiter_id))
+
+async def _get_recruiter(db: AsyncSession, recruiter_id: int) -> RecruiterResponse:
     # Try to get from cache first
     cached_recruiter = get_recruiter_from_cache(recruiter_id)
     if cached_recruiter:
         return cached_recruiter
     
     # If not in cache, get from database
-    db_recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    db_recruiter = await db.get(Recruiter, recruiter_id)
     if not db_recruiter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,8 +90,8 @@ def get_recruiter(db: Session, recruiter_id: int) -> RecruiterResponse:
     
     return recruiter_response
 
-def get_recruiter_by_user_id(db: Session, user_id: int) -> RecruiterResponse:
-    db_recruiter = db.query(Recruiter).filter(Recruiter.user_id == user_id).first()
+async def get_recruiter_by_user_id(db: AsyncSession, user_id: int) -> RecruiterResponse:
+    db_recruiter = await db.scalar(select(Recruiter).where(Recruiter.user_id == user_id))
     if not db_recruiter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -87,8 +99,8 @@ def get_recruiter_by_user_id(db: Session, user_id: int) -> RecruiterResponse:
         )
     return RecruiterResponse.model_validate(db_recruiter)
 
-def update_recruiter(db: Session, recruiter_id: int, recruiter: RecruiterUpdate, current_user_id: int) -> RecruiterResponse:
-    db_recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+async def update_recruiter(db: AsyncSession, recruiter_id: int, recruiter: RecruiterUpdate, current_user_id: int) -> RecruiterResponse:
+    db_recruiter = await db.get(Recruiter, recruiter_id)
     if not db_recruiter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -107,8 +119,9 @@ def update_recruiter(db: Session, recruiter_id: int, recruiter: RecruiterUpdate,
     for field, value in update_data.items():
         setattr(db_recruiter, field, value)
     
-    db.commit()
-    db.refresh(db_recruiter)
+    await db.commit()
+    # updated_at do MySQL cập nhật, phải đọc lại vì AsyncSession không lazy load
+    await db.refresh(db_recruiter)
     
     # Convert to response model and update cache
     recruiter_response = RecruiterResponse.model_validate(db_recruiter)
@@ -116,8 +129,8 @@ def update_recruiter(db: Session, recruiter_id: int, recruiter: RecruiterUpdate,
     
     return recruiter_response
 
-def delete_recruiter(db: Session, recruiter_id: int, current_user_id: int):
-    db_recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+async def delete_recruiter(db: AsyncSession, recruiter_id: int, current_user_id: int):
+    db_recruiter = await db.get(Recruiter, recruiter_id)
     if not db_recruiter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -131,8 +144,14 @@ def delete_recruiter(db: Session, recruiter_id: int, current_user_id: int):
             detail="You can only delete your own recruiter profile"
         )
     
-    db.delete(db_recruiter)
-    db.commit()
+    username = await _get_username(db, db_recruiter.user_id)
+    await db.delete(db_recruiter)
+    await db.commit()
     
     # Invalidate cache
-    invalidate_recruiter_cache(recruiter_id) 
\ No newline at end of file
+    invalidate_recruiter_cache(recruiter_id)
+    invalidate_user(username)
+
+async def _get_username(db: AsyncSession, user_id: int) -> str:
+    # Truy vấn trực tiếp thay cho db_recruiter.user (lazy load không dùng được với AsyncSession)
+    return await db.scalar(select(User.username).where(User.id == user_id))
@@ -0,0 +1,137 @@
+import logging
+import threading
+from typing import Iterable, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.reference_cache import ReferenceCache
+from app.db.database import SessionLocal
+from app.db.redis_db import get_redis
+from app.models.job import Job, Tag, Location, WorkType
+from app.schemas.job import JobResponse, TagResponse, LocationResponse, WorkTypeResponse
+
+logger = logging.getLogger(__name__)
+redis_client = get_redis()
+
+# Tăng counter này (bump_reference_version) sau khi sửa tags/locations/work_types
+REFERENCE_VERSION_KEY = "reference_data:version"
+
+# Các trường của JobResponse đọc thẳng từ cột của Job
+JOB_COLUMN_FIELDS = [
+    name for name in JobResponse.model_fields
+    if name not in {"location", "work_type", "tags", "tag_ids"}
+]
+
+reference_cache = ReferenceCache()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+def bump_reference_version() -> int:
+    """Báo cho mọi worker nạp lại reference data ở lần kiểm tra tới"""
+    return redis_client.incr(REFERENCE_VERSION_KEY)
+
+def _current_version() -> int:
+    return int(redis_client.get(REFERENCE_VERSION_KEY) or 0)
+
+def load_reference_data(db: Session):
+    # Đọc version trước dữ liệu: thay đổi xen giữa sẽ được nạp lại ở lần kiểm tra sau
+    version = _current_version()
+    reference_cache.load(
+        [TagResponse.model_validate(tag) for tag in db.scalars(select(Tag))],
+        [LocationResponse.model_validate(location) for location in db.scalars(select(Location))],
+        [WorkTypeResponse.model_validate(work_type) for work_type in db.scalars(select(WorkType))],
+        version
+    )
+    logger.info("Reference data loaded: version %d, %d entries", version, len(reference_cache))
+
+def refresh_reference_data():
+    """Nạp lại khi version trong Redis khác version đang dùng"""
+    if _current_version() == reference_cache.version:
+        return
+    with SessionLocal() as db:
+        load_reference_data(db)
+
+def _refresh_loop():
+    while not _stop.wait(settings.REFERENCE_DATA_POLL_SECONDS):
+        try:
+            refresh_reference_data()
+        except Exception:
+            logger.exception("Failed to refresh reference data")
+
+def start_reference_data():
+    """Nạp lần đầu khi khởi động, sau đó kiểm tra version định kỳ trong thread nền"""
+    global _thread
+    try:
+        refresh_reference_data()
+    except Exception:
+        # Entry thiếu vẫn được đọc từ MySQL khi cần (ensure_references)
+        logger.exception("Failed to load reference data")
+    if _thread is None:
+        _stop.clear()
+        _thread = threading.Thread(target=_refresh_loop, name="reference-data", daemon=True)
+        _thread.start()
+
+def stop_reference_data():
+    global _thread
+    _stop.set()
+    _thread = None
+
+def _missing_statements(tag_ids: Iterable[int], location_ids: Iterable[int], work_type_ids: Iterable[int]):
+    statements = []
+    for model, missing in (
+        (Tag, reference_cache.missing_tags(tag_ids)),
+        (Location, reference_cache.missing_locations(location_ids)),
+        (WorkType, reference_cache.missing_work_types(work_type_ids))
+    ):
+        if missing:
+            statements.append((model, select(model).where(model.id.in_(missing))))
+    return statements
+
+def _add_rows(model, rows):
+    if model is Tag:
+        reference_cache.add(tags=[TagResponse.model_validate(row) for row in rows])
+    elif model is Location:
+        reference_cache.add(locations=[LocationResponse.model_validate(row) for row in rows])
+    else:
+        reference_cache.add(work_types=[WorkTypeResponse.model_validate(row) for row in rows])
+
+def ensure_references(db: Session, tag_ids: Iterable[int] = (), location_ids: Iterable[int] = (), work_type_ids: Iterable[int] = ()):
+    """Đọc từ MySQL các id chưa có trong cache (thường không có, trừ entry vừa tạo)"""
+    for model, stmt in _missing_statements(tag_ids, location_ids, work_type_ids):
+        _add_rows(model, db.scalars(stmt).all())
+
+async def async_ensure_references(db: AsyncSession, tag_ids: Iterable[int] = (), location_ids: Iterable[int] = (), work_type_ids: Iterable[int] = ()):
+    for model, stmt in _missing_statements(tag_ids, location_ids, work_type_ids):
+        _add_rows(model, (await db.scalars(stmt)).all())
+
+def known_tag_ids(tag_ids: Iterable[int]) -> List[int]:
+    """Các tag có trong cache theo thứ tự, bỏ trùng; gọi sau ensure_references"""
+    return [tag_id for tag_id in dict.fromkeys(tag_ids) if reference_cache.tag(tag_id)]
+
+def job_tag_ids(job: Job) -> List[int]:
+    """Id tag của job nạp bằng job_response_options()"""
+    return sorted(int(tag_id) for tag_id in job.tag_ids_csv.split(",")) if job.tag_ids_csv else []
+
+def job_response(job: Job) -> JobResponse:
+    """JobResponse từ các cột của job và reference cache, không chạm relationship"""
+    data = {name: getattr(job, name) for name in JOB_COLUMN_FIELDS}
+    data["location"] = reference_cache.location(job.location_id)
+    data["work_type"] = reference_cache.work_type(job.work_type_id)
+    data["tags"] = [reference_cache.tag(tag_id) for tag_id in job_tag_ids(job) if reference_cache.tag(tag_id)]
+    return JobResponse.model_validate(data)
+
+def _reference_ids(jobs: Sequence[Job]):
+    return (
+        [tag_id for job in jobs for tag_id in job_tag_ids(job)],
+        [job.location_id for job in jobs if job.location_id],
+        [job.work_type_id for job in jobs if job.work_type_id]
+    )
+
+def job_responses(db: Session, jobs: Sequence[Job]) -> List[JobResponse]:
+    ensure_references(db, *_reference_ids(jobs))
+    return [job_response(job) for job in jobs]
+
+async def async_job_responses(db: AsyncSession, jobs: Sequence[Job]) -> List[JobResponse]:
+    await async_ensure_references(db, *_reference_ids(jobs))
+    return [job_response(job) for job in jobs]
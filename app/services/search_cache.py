@@ -0,0 +1,96 @@
+import secrets
+import time
+from typing import List, Optional, Sequence, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.job_search import JobSearchResponse
+from app.db.redis_db import get_redis
+
+redis_client = get_redis()
+
+GENERATION_KEY = "job_search:generation"
+
+CACHE_HIT = "hit"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+T = TypeVar("T", bound=BaseModel)
+
+def bump_search_generation():
+    """Vô hiệu hóa toàn bộ kết quả search đã cache bằng một lệnh INCR, không cần SCAN/DEL"""
+    redis_client.incr(GENERATION_KEY)
+
+def read_search_cache(
+    cache_key: str,
+    model: Type[T] = JobSearchResponse,
+    metric: str = "search_cache"
+) -> Tuple[str, Optional[T], int]:
+    """Đọc entry và generation hiện tại trong một round trip.
+
+    Trả về (trạng thái, kết quả, generation). Entry chỉ quá hạn fresh được trả
+    về với trạng thái stale để phục vụ trong lúc một worker khác tính lại. Entry
+    của generation cũ (đã có job thay đổi sau khi cache) là miss: người dùng vừa
+    sửa job phải thấy ngay thay đổi, không phải kết quả trước khi ghi.
+    """
+    return read_search_cache_many([cache_key], model, metric)[0]
+
+def read_search_cache_many(
+    cache_keys: Sequence[str],
+    model: Type[T] = JobSearchResponse,
+    metric: str = "search_cache"
+) -> List[Tuple[str, Optional[T], int]]:
+    """Như read_search_cache cho nhiều key, vẫn chỉ một round trip"""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(GENERATION_KEY)
+    for cache_key in cache_keys:
+        pipe.hmget(cache_key, "generation", "fresh_until", "data")
+    generation, *entries = pipe.execute()
+    generation = int(generation or 0)
+    return [_entry_state(entry, generation, model, metric) for entry in entries]
+
+def _entry_state(entry: List[Optional[str]], generation: int, model: Type[T], metric: str) -> Tuple[str, Optional[T], int]:
+    entry_generation, fresh_until, data = entry
+    if data is None:
+        metrics.incr(f"{metric}.miss")
+        return CACHE_MISS, None, generation
+
+    if int(entry_generation) != generation:
+        metrics.incr(f"{metric}.invalidated")
+        return CACHE_MISS, None, generation
+
+    response = model.model_validate_json(data)
+    if float(fresh_until) > time.time():
+        metrics.incr(f"{metric}.hit")
+        return CACHE_HIT, response, generation
+
+    metrics.incr(f"{metric}.stale")
+    return CACHE_STALE, response, generation
+
+def write_search_cache(cache_key: str, response: BaseModel, generation: int):
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(cache_key, mapping={
+        "generation": generation,
+        "fresh_until": time.time() + settings.SEARCH_CACHE_TTL_SECONDS,
+        "data": response.model_dump_json()
+    })
+    pipe.expire(cache_key, settings.SEARCH_CACHE_TTL_SECONDS + settings.SEARCH_CACHE_STALE_SECONDS)
+    pipe.execute()
+
+# Chỉ xóa lock khi vẫn là token của mình: lock đã hết hạn có thể đang thuộc worker khác
+_RELEASE_LOCK_SCRIPT = redis_client.register_script("""
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+""")
+
+def acquire_refresh_lock(cache_key: str) -> Optional[str]:
+    """Chỉ một worker được tính lại một query đã hết hạn; trả về token của lock"""
+    token = secrets.token_hex(8)
+    if redis_client.set(f"lock:{cache_key}", token, nx=True, ex=settings.SEARCH_CACHE_LOCK_SECONDS):
+        return token
+    return None
+
+def release_refresh_lock(cache_key: str, token: str):
+    _RELEASE_LOCK_SCRIPT(keys=[f"lock:{cache_key}"], args=[token])
@@ -0,0 +1,88 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.job_search import JobSearchQuery, PaginationMode, SortField, SortOrder
+from app.services.search_cache import CACHE_MISS
+
+WHITESPACE = re.compile(r"\s+")
+
+def _normalize_text(value: Optional[str], applied: List[str], fold_case: bool) -> Optional[str]:
+    if value is None:
+        return None
+    result = unicodedata.normalize("NFC", value)
+    if result != value:
+        applied.append("unicode_nfc")
+    collapsed = WHITESPACE.sub(" ", result).strip()
+    if collapsed != result:
+        applied.append("whitespace")
+    result = collapsed
+    # Chỉ full-text (analyzer có lowercase) mới bỏ hoa thường; keyword so khớp chính xác
+    if fold_case and result.lower() != result:
+        applied.append("case")
+        result = result.lower()
+    if not result:
+        applied.append("empty_value")
+        return None
+    return result
+
+def _snap_salary(value: Optional[int], round_up: bool) -> Optional[int]:
+    bucket = settings.SEARCH_SALARY_BUCKET
+    if value is None or bucket <= 0:
+        return value
+    return -(-value // bucket) * bucket if round_up else value // bucket * bucket
+
+def canonicalize_query(query: JobSearchQuery) -> Tuple[JobSearchQuery, List[str]]:
+    """Đưa các query tương đương về cùng một dạng để dùng chung cache entry.
+
+    Trả về (query chuẩn hóa, tên các bước chuẩn hóa đã làm thay đổi query).
+    Query chuẩn hóa cũng là query được gửi tới Elasticsearch nên kết quả
+    luôn khớp với cache key.
+    """
+    applied: List[str] = []
+    update: Dict[str, Any] = {
+        "q": _normalize_text(query.q, applied, fold_case=True),
+        "experience_level": _normalize_text(query.experience_level, applied, fold_case=False),
+        "industry": _normalize_text(query.industry, applied, fold_case=False),
+    }
+
+    if query.tag_ids is not None:
+        tag_ids = sorted(set(query.tag_ids))
+        if len(tag_ids) != len(query.tag_ids):
+            applied.append("list_dedup")
+        elif tag_ids != query.tag_ids:
+            applied.append("list_order")
+        update["tag_ids"] = tag_ids or None
+        if not tag_ids:
+            applied.append("empty_value")
+    if query.facets is not None:
+        facets = sorted(set(query.facets), key=lambda facet: facet.value)
+        update["facets"] = facets or None
+
+    # None và giá trị mặc định cho kết quả giống nhau
+    if query.sort is None:
+        update["sort"] = SortField.CREATED_AT
+        applied.append("default_value")
+    if query.order is None:
+        update["order"] = SortOrder.DESC
+        applied.append("default_value")
+    # Ở chế độ cursor, số trang không được dùng
+    if (query.pagination == PaginationMode.CURSOR or query.cursor) and query.page != 1:
+        update["page"] = 1
+        applied.append("default_value")
+
+    salary_min = _snap_salary(query.salary_min, round_up=False)
+    salary_max = _snap_salary(query.salary_max, round_up=True)
+    if (salary_min, salary_max) != (query.salary_min, query.salary_max):
+        applied.append("salary_bucket")
+    update["salary_min"], update["salary_max"] = salary_min, salary_max
+
+    return query.model_copy(update=update), sorted(set(applied))
+
+def record_canonical_lookup(applied: Sequence[str], state: str):
+    """Đếm số lần tra cache và số lần trúng cho từng bước chuẩn hóa đã áp dụng"""
+    for name in applied:
+        metrics.incr(f"search_canonical.{name}.lookups")
+        if state != CACHE_MISS:
+            metrics.incr(f"search_canonical.{name}.hits")
@@ -0,0 +1,132 @@
+import hashlib
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+from redis.exceptions import WatchError
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token
+from app.core.principal_cache import evict_principal
+from app.schemas.user import Token, SessionInfo
+from app.db.redis_db import get_redis
+
+redis_client = get_redis()
+
+ACCESS_TTL_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+REFRESH_TTL_SECONDS = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+
+def access_token_key(session_id: str) -> str:
+    return f"access_token:{session_id}"
+
+def refresh_token_key(session_id: str) -> str:
+    return f"refresh_token:{session_id}"
+
+def sessions_key(username: str) -> str:
+    return f"sessions:{username}"
+
+def token_digest(token: str) -> str:
+    """Chỉ lưu digest 128-bit của token thay vì cả JWT"""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+def _issue_tokens(pipe, username: str, session_id: str) -> Token:
+    access_token = create_access_token(data={"sub": username, "sid": session_id})
+    refresh_token = create_refresh_token(data={"sub": username, "sid": session_id})
+    now = time.time()
+
+    pipe.set(access_token_key(session_id), token_digest(access_token), ex=ACCESS_TTL_SECONDS)
+    pipe.set(refresh_token_key(session_id), token_digest(refresh_token), ex=REFRESH_TTL_SECONDS)
+    # Score là thời điểm hết hạn của refresh token, dọn session hết hạn luôn trong cùng pipeline
+    pipe.zadd(sessions_key(username), {session_id: now + REFRESH_TTL_SECONDS})
+    pipe.zremrangebyscore(sessions_key(username), "-inf", now)
+    pipe.expire(sessions_key(username), REFRESH_TTL_SECONDS)
+
+    return Token(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_type="bearer"
+    )
+
+def create_session(username: str) -> Token:
+    """Tạo session mới cho một thiết bị, không ảnh hưởng các session khác"""
+    session_id = secrets.token_urlsafe(12)
+    pipe = redis_client.pipeline(transaction=False)
+    token = _issue_tokens(pipe, username, session_id)
+    pipe.execute()
+    return token
+
+def rotate_session(username: str, session_id: str, refresh_token: str) -> Optional[Token]:
+    """Đổi refresh token lấy cặp token mới, refresh token cũ chỉ dùng được một lần"""
+    key = refresh_token_key(session_id)
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(key)
+            stored_digest = pipe.get(key)
+            if stored_digest is None or pipe.zscore(sessions_key(username), session_id) is None:
+                return None
+            if stored_digest != token_digest(refresh_token):
+                # Refresh token đã dùng bị gửi lại: coi như bị lộ, thu hồi cả session
+                pipe.unwatch()
+                revoke_session(username, session_id)
+                return None
+            pipe.multi()
+            token = _issue_tokens(pipe, username, session_id)
+            pipe.execute()
+        except WatchError:
+            # Một request khác vừa rotate cùng refresh token
+            return None
+    evict_principal(username)
+    return token
+
+def slide_access_token(username: str, session_id: str, access_token: str) -> Optional[str]:
+    """Cấp access token mới cho session khi token hiện tại sắp hết hạn.
+
+    Digest cũ vẫn được chấp nhận tới khi token cũ hết hạn để các request
+    đang chạy song song không bị 401.
+    """
+    key = access_token_key(session_id)
+    current_digest = token_digest(access_token)
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(key)
+            stored = pipe.get(key)
+            if stored is None or stored.split(",")[0] != current_digest:
+                return None
+            new_token = create_access_token(data={"sub": username, "sid": session_id})
+            pipe.multi()
+            pipe.set(key, f"{token_digest(new_token)},{current_digest}", ex=ACCESS_TTL_SECONDS)
+            pipe.execute()
+        except WatchError:
+            # Request song song của cùng session vừa cấp token mới; token hiện tại vẫn hợp lệ
+            return None
+    return new_token
+
+def is_valid_access_digest(stored: Optional[str], access_token: str) -> bool:
+    return stored is not None and token_digest(access_token) in stored.split(",")
+
+def list_sessions(username: str, current_session_id: Optional[str] = None) -> List[SessionInfo]:
+    sessions = redis_client.zrangebyscore(sessions_key(username), time.time(), "+inf", withscores=True)
+    return [
+        SessionInfo(
+            session_id=session_id,
+            expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            current=session_id == current_session_id
+        )
+        for session_id, expires_at in sessions
+    ]
+
+def revoke_session(username: str, session_id: str) -> bool:
+    # Chỉ xóa session thuộc về user này
+    if not redis_client.zrem(sessions_key(username), session_id):
+        return False
+    redis_client.delete(access_token_key(session_id), refresh_token_key(session_id))
+    evict_principal(username)
+    return True
+
+def revoke_all_sessions(username: str):
+    session_ids = redis_client.zrange(sessions_key(username), 0, -1)
+    pipe = redis_client.pipeline(transaction=False)
+    for session_id in session_ids:
+        pipe.delete(access_token_key(session_id), refresh_token_key(session_id))
+    pipe.delete(sessions_key(username))
+    pipe.execute()
+    evict_principal(username)
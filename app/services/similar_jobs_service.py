@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.events import event_bus
+from app.core.prefix_index import normalize
+from app.db.redis_db import get_redis
+from app.models.job import Job, job_response_options
+from app.schemas.job import JobResponse
+from app.services.reference_data_service import job_responses
+
+redis_client = get_redis()
+
+SIMILAR_JOB_CHANNEL = "similar:job_changed"
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+# Tiêu đề và tags mô tả job rõ hơn phần mô tả nên được nhân trọng số
+TITLE_WEIGHT = 2
+TAG_WEIGHT = 3
+
+def publish_job_changed(job_id: int):
+    """Báo cho tiến trình similar_jobs follow tính lại láng giềng của job"""
+    event_bus.publish(SIMILAR_JOB_CHANNEL, {"job_id": job_id})
+
+def publish_jobs_changed(job_ids: List[int]):
+    event_bus.publish_many(SIMILAR_JOB_CHANNEL, [{"job_id": job_id} for job_id in job_ids])
+
+def similar_key(job_id: int) -> str:
+    return f"job_similar:{job_id}"
+
+def job_tokens(job: Job) -> List[str]:
+    title = [t for t in TOKEN_PATTERN.findall(normalize(job.title or "")) if len(t) > 1]
+    description = [t for t in TOKEN_PATTERN.findall(normalize(job.description or "")) if len(t) > 1]
+    tags = [f"tag:{tag.id}" for tag in job.tags]
+    return title * TITLE_WEIGHT + description + tags * TAG_WEIGHT
+
+class TfidfModel:
+    """TF-IDF (tf dạng log, vector chuẩn hóa L2) với từ điển cố định"""
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray):
+        self.vocabulary = vocabulary
+        self.idf = idf.astype(np.float32)
+
+    @classmethod
+    def from_document_frequencies(cls, df: Counter, documents: int, min_df: int, max_features: int) -> "TfidfModel":
+        terms = [term for term, count in df.most_common(max_features) if count >= min_df]
+        vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+        idf = np.array([math.log((1 + documents) / (1 + df[term])) + 1 for term in sorted(terms)])
+        return cls(vocabulary, idf)
+
+    def transform(self, documents: Iterable[List[str]]) -> sp.csr_matrix:
+        indptr, indices, data = [0], [], []
+        for tokens in documents:
+            counts = Counter(self.vocabulary[t] for t in tokens if t in self.vocabulary)
+            columns = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            weights = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[columns]
+            norm = np.linalg.norm(weights)
+            indices.extend(columns.tolist())
+            data.extend((weights / norm if norm else weights).tolist())
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(self.vocabulary))
+        )
+
+class SimilarityIndex:
+    """Ma trận TF-IDF của toàn bộ job để tìm láng giềng gần nhất (cosine).
+
+    Job thay đổi được giữ trong một khối hàng nhỏ (pending), hàng cũ trong ma
+    trận chính bị đánh dấu xóa; compact() gộp lại khi đủ compact_threshold hàng.
+    """
+
+    def __init__(self, model: TfidfModel, matrix: sp.csr_matrix, job_ids: np.ndarray, compact_threshold: int = 1000):
+        self.model = model
+        self.compact_threshold = compact_threshold
+        self.matrix = matrix
+        self.job_ids = job_ids.astype(np.int64)
+        self.alive = np.ones(len(job_ids), dtype=bool)
+        self._rows = {int(job_id): i for i, job_id in enumerate(self.job_ids)}
+        self._pending: Dict[int, sp.csr_matrix] = {}
+        self._matrix_t = None
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def neighbors(self, rows: sp.csr_matrix, exclude: np.ndarray, count: int, min_score: float) -> List[List[Tuple[int, float]]]:
+        """Top láng giềng cho từng hàng của rows (một batch), bỏ qua job exclude[i]"""
+        if self._matrix_t is None:
+            # Chuyển vị một lần để phép nhân theo batch không phải đổi định dạng mỗi lần
+            self._matrix_t = self.matrix.T.tocsr()
+        scores = rows @ self._matrix_t
+        job_ids, alive = self.job_ids, self.alive
+        if self._pending:
+            scores = sp.hstack([scores, rows @ sp.vstack(list(self._pending.values())).T])
+            job_ids = np.concatenate([job_ids, np.fromiter(self._pending, dtype=np.int64)])
+            alive = np.concatenate([alive, np.ones(len(self._pending), dtype=bool)])
+        scores = scores.tocsr()
+
+        results = []
+        for i in range(rows.shape[0]):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            columns = scores.indices[start:end]
+            values = scores.data[start:end]
+            keep = alive[columns] & (job_ids[columns] != exclude[i]) & (values >= min_score)
+            columns, values = columns[keep], values[keep]
+            if len(values) > count:
+                top = np.argpartition(-values, count - 1)[:count]
+                columns, values = columns[top], values[top]
+            order = np.argsort(-values)
+            results.append(list(zip(job_ids[columns[order]].tolist(), values[order].tolist())))
+        return results
+
+    def upsert(self, job_id: int, row: sp.csr_matrix):
+        self.remove(job_id)
+        self._pending[job_id] = row
+        if len(self._pending) >= self.compact_threshold:
+            self.compact()
+
+    def remove(self, job_id: int):
+        row = self._rows.pop(job_id, None)
+        if row is not None:
+            self.alive[row] = False
+        self._pending.pop(job_id, None)
+
+    def compact(self):
+        keep = np.flatnonzero(self.alive)
+        self.matrix = sp.vstack([self.matrix[keep], *self._pending.values()], format="csr")
+        self.job_ids = np.concatenate([self.job_ids[keep], np.fromiter(self._pending, dtype=np.int64)])
+        self.alive = np.ones(len(self.job_ids), dtype=bool)
+        self._rows = {int(job_id): i for i, job_id in enumerate(self.job_ids)}
+        self._pending = {}
+        self._matrix_t = None
+
+    def save(self, directory: str):
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        sp.save_npz(os.path.join(directory, "matrix.npz"), self.matrix)
+        np.save(os.path.join(directory, "job_ids.npy"), self.job_ids)
+        np.save(os.path.join(directory, "idf.npy"), self.model.idf)
+        with open(os.path.join(directory, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.model.vocabulary, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "SimilarityIndex":
+        with open(os.path.join(directory, "vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        model = TfidfModel(vocabulary, np.load(os.path.join(directory, "idf.npy")))
+        matrix = sp.load_npz(os.path.join(directory, "matrix.npz")).tocsr()
+        return cls(model, matrix, np.load(os.path.join(directory, "job_ids.npy")))
+
+def store_neighbors(pipe, job_id: int, neighbors: List[Tuple[int, float]]):
+    """Lưu danh sách láng giềng dạng ZSET nhỏ (listpack) để đọc bằng một lệnh"""
+    key = similar_key(job_id)
+    pipe.delete(key)
+    if neighbors:
+        pipe.zadd(key, {str(neighbor_id): score for neighbor_id, score in neighbors})
+
+def add_reverse_neighbor(pipe, job_id: int, neighbor_id: int, score: float, count: int):
+    """Chèn job mới vào danh sách của láng giềng, chỉ giữ count phần tử điểm cao nhất"""
+    key = similar_key(neighbor_id)
+    pipe.zadd(key, {str(job_id): score})
+    pipe.zremrangebyrank(key, 0, -(count + 1))
+
+def refresh_job(db: Session, index: SimilarityIndex, job_id: int):
+    """Tính lại láng giềng của một job vừa thay đổi và chèn nó vào danh sách của các láng giềng"""
+    count = settings.SIMILAR_JOBS_COUNT
+    job = db.query(Job).filter(Job.id == job_id).first()
+    pipe = redis_client.pipeline(transaction=False)
+    if job is None:
+        # Job đã xóa vẫn có thể nằm trong danh sách của job khác, được lọc lúc đọc
+        index.remove(job_id)
+        pipe.delete(similar_key(job_id))
+        pipe.execute()
+        return
+
+    row = index.model.transform([job_tokens(job)])
+    index.upsert(job_id, row)
+    neighbors = index.neighbors(row, np.array([job_id]), count, settings.SIMILAR_JOBS_MIN_SCORE)[0]
+    store_neighbors(pipe, job_id, neighbors)
+    for neighbor_id, score in neighbors:
+        add_reverse_neighbor(pipe, job_id, neighbor_id, score, count)
+    pipe.execute()
+
+def get_similar_jobs(db: Session, job_id: int, limit: int = 10) -> List[JobResponse]:
+    neighbor_ids = [int(i) for i in redis_client.zrevrange(similar_key(job_id), 0, limit - 1)]
+    if not neighbor_ids:
+        return []
+    # Job đã bị xóa sẽ không còn trong kết quả truy vấn
+    jobs = db.query(Job).options(*job_response_options()).filter(Job.id.in_(neighbor_ids)).all()
+    responses = {job.id: job for job in job_responses(db, jobs)}
+    return [responses[i] for i in neighbor_ids if i in responses]
@@ -0,0 +1,121 @@
+import logging
+from typing import Dict, Iterable, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.job import Job, Tag, Location, WorkType, job_tags
+from app.schemas.job import JobResponse
+from app.schemas.job_search import Suggestion, SuggestionType, SuggestResponse
+from app.core.elasticsearch_manager import es_manager
+from app.core.events import event_bus
+from app.core.prefix_index import PrefixIndex
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_JOB_CHANNEL = "suggest:job_created"
+TITLE_SUGGEST_FIELD = "title_suggest"
+
+# Index prefix của tags, locations, work_types trong từng worker
+suggest_index = PrefixIndex()
+
+def build_title_suggest(title: str, weight: int = 1) -> dict:
+    """Input cho completion field: cả tiêu đề và từng hậu tố theo từ,
+    để "dev" gợi ý được "Python Developer". Completion suggester xếp hạng theo weight.
+    """
+    words = title.split()
+    return {"input": [" ".join(words[i:]) for i in range(len(words))] or [title], "weight": weight}
+
+def title_popularity(db: Session, titles: Iterable[str]) -> Dict[str, int]:
+    """Độ phổ biến của tiêu đề = số job cùng tiêu đề (collation của MySQL không phân biệt hoa thường).
+
+    Với skip_duplicates, suggester trả về document có weight lớn nhất của mỗi
+    tiêu đề, tức job được index gần nhất, nên weight của các job cũ không cần cập nhật.
+    """
+    titles = set(titles)
+    if not titles:
+        return {}
+    counts: Dict[str, int] = {}
+    rows = db.query(Job.title, func.count(Job.id)).filter(Job.title.in_(titles)).group_by(Job.title)
+    for title, count in rows:
+        counts[title.lower()] = counts.get(title.lower(), 0) + count
+    return counts
+
+def load_suggest_index(db: Session):
+    entries = [(SuggestionType.TAG.value, tag.id, tag.name) for tag in db.query(Tag)]
+    entries += [(SuggestionType.LOCATION.value, loc.id, loc.name) for loc in db.query(Location)]
+    entries += [(SuggestionType.WORK_TYPE.value, wt.id, wt.name) for wt in db.query(WorkType)]
+
+    # Độ phổ biến = số job đang dùng entry
+    popularity = {}
+    tag_counts = db.query(job_tags.c.tag_id, func.count()).group_by(job_tags.c.tag_id)
+    for tag_id, count in tag_counts:
+        popularity[(SuggestionType.TAG.value, tag_id)] = count
+    for kind, column in (
+        (SuggestionType.LOCATION.value, Job.location_id),
+        (SuggestionType.WORK_TYPE.value, Job.work_type_id)
+    ):
+        counts = db.query(column, func.count(Job.id)).filter(column.isnot(None)).group_by(column)
+        for id_, count in counts:
+            popularity[(kind, id_)] = count
+
+    suggest_index.load(entries, popularity)
+
+def init_suggest_index():
+    """Nạp index khi ứng dụng khởi động"""
+    db = SessionLocal()
+    try:
+        load_suggest_index(db)
+    finally:
+        db.close()
+
+def record_job(job: JobResponse):
+    """Tăng độ phổ biến của tags/location/work type của job mới ở mọi worker"""
+    entries = [[SuggestionType.TAG.value, tag.id, tag.name] for tag in job.tags]
+    if job.location is not None:
+        entries.append([SuggestionType.LOCATION.value, job.location.id, job.location.name])
+    if job.work_type is not None:
+        entries.append([SuggestionType.WORK_TYPE.value, job.work_type.id, job.work_type.name])
+    record_entries(entries)
+
+def record_entries(entries: List[list]):
+    """entries là các [kind, id, name], mỗi phần tử tăng độ phổ biến thêm 1"""
+    if entries:
+        event_bus.publish(SUGGEST_JOB_CHANNEL, {"entries": entries})
+
+def _on_job_created(message: dict):
+    for kind, id_, name in message.get("entries", []):
+        suggest_index.add(kind, id_, name)
+        suggest_index.incr(kind, id_)
+
+event_bus.subscribe(SUGGEST_JOB_CHANNEL, _on_job_created)
+
+async def suggest(q: str, limit: int = 10) -> SuggestResponse:
+    """Tối đa limit gợi ý: tags/địa điểm/loại hình (theo độ phổ biến) rồi tới tiêu đề job"""
+    items: List[Suggestion] = [
+        Suggestion(text=name, type=kind, id=id_, popularity=popularity)
+        for kind, id_, name, popularity in suggest_index.search(q, limit)
+    ]
+    remaining = limit - len(items)
+    if remaining <= 0:
+        return SuggestResponse(items=items)
+
+    # Typeahead vẫn trả kết quả từ bộ nhớ khi Elasticsearch lỗi
+    try:
+        options = await es_manager.suggest("jobs", TITLE_SUGGEST_FIELD, q, remaining, source_fields=["title"])
+    except Exception:
+        logger.warning("Title suggest failed for %r", q, exc_info=True)
+        options = []
+    # Một job có nhiều input (các hậu tố) nên có thể xuất hiện nhiều lần
+    seen = set()
+    for option in options:
+        if option["_id"] in seen:
+            continue
+        seen.add(option["_id"])
+        items.append(Suggestion(
+            text=option["_source"]["title"],
+            type=SuggestionType.TITLE,
+            id=int(option["_id"]),
+            popularity=int(option.get("_score", 0))
+        ))
+
+    return SuggestResponse(items=items[:limit])
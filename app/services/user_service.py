@@ -1,9 +1,14 @@
 from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User, UserType
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, ChangePassword
-from app.core.security import get_password_hash, verify_password
-from typing import List, Optional
+from app.core.security import get_password_hash
+from app.core.password_pool import password_pool
+from app.services.auth_service import invalidate_user
+from app.services.session_service import revoke_all_sessions
+from app.core.pagination import keyset_page
+from typing import List, Optional, Tuple
 
 def get_user_by_email(db: Session, email: str) -> User:
     return db.query(User).filter(User.email == email).first()
@@ -25,6 +30,20 @@ def get_users(
     type_user: Optional[UserType] = None,
     is_active: Optional[bool] = None
 ) -> List[User]:
+    return _user_list_query(db, email, type_user, is_active).offset(skip).limit(limit).all()
+
+def get_users_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    email: Optional[str] = None,
+    type_user: Optional[UserType] = None,
+    is_active: Optional[bool] = None
+) -> Tuple[List[User], Optional[str]]:
+    """User mới nhất trước, phân trang keyset; trả về (users, cursor trang tiếp theo)"""
+    return keyset_page(_user_list_query(db, email, type_user, is_active), User.createdAt, User.id, cursor, limit)
+
+def _user_list_query(db: Session, email: Optional[str], type_user: Optional[UserType], is_active: Optional[bool]):
     query = db.query(User)
     
     if email:
@@ -33,8 +52,7 @@ def get_users(
         query = query.filter(User.typeUser == type_user)
     if is_active is not None:
         query = query.filter(User.is_active == is_active)
-    
-    return query.offset(skip).limit(limit).all()
+    return query
 
 def create_user(db: Session, user: UserCreate) -> User:
     # Check if user already exists
@@ -69,24 +87,39 @@ def update_user(db: Session, user_id: int, user: UserUpdate) -> User:
             )
     
     # Update user fields
+    old_username = db_user.username
     update_data = user.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_user, field, value)
     
     db.commit()
     db.refresh(db_user)
+    
+    # Tài khoản bị vô hiệu hóa không được dùng các session đang có
+    if update_data.get("status") is False:
+        revoke_all_sessions(old_username)
+    # Snapshot và principal đã cache mang dữ liệu cũ (status, typeUser...)
+    invalidate_user(old_username)
     return db_user
 
 def delete_user(db: Session, user_id: int):
     db_user = get_user_by_id(db, user_id)
+    username = db_user.username
     db.delete(db_user)
     db.commit()
+    revoke_all_sessions(username)
+    invalidate_user(username)
 
-def change_password(db: Session, user_id: int, password_data: ChangePassword) -> User:
-    user = get_user_by_id(db, user_id)
+async def change_password(db: AsyncSession, user_id: int, password_data: ChangePassword) -> User:
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
     # Verify current password
-    if not verify_password(password_data.current_password, user.password):
+    if not await password_pool.verify(password_data.current_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -100,8 +133,9 @@ def change_password(db: Session, user_id: int, password_data: ChangePassword) ->
         )
     
     # Update password
-    user.password = get_password_hash(password_data.new_password)
-    db.commit()
-    db.refresh(user)
+    user.password = await password_pool.hash(password_data.new_password)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user.username)
     
     return user 
\ No newline at end of file
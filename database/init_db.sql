@@ -6,6 +6,7 @@ SET CHARACTER SET utf8mb4;
 SET character_set_connection=utf8mb4;
 
 -- Drop tables in correct dependency order
+DROP TABLE IF EXISTS job_outbox;
 DROP TABLE IF EXISTS job_tags;
 DROP TABLE IF EXISTS jobs;
 DROP TABLE IF EXISTS recruiters;
@@ -24,7 +25,8 @@ CREATE TABLE users (
     typeUser ENUM('ADMIN', 'CANDIDATE', 'RECRUITER') DEFAULT 'CANDIDATE',
     status BOOLEAN DEFAULT TRUE,
     createdAt DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updateAt DATETIME DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP
+    updateAt DATETIME DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_users_created_at_id (createdAt, id)
 ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
 -- Work types table
@@ -82,7 +84,13 @@ CREATE TABLE jobs (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (location_id) REFERENCES locations(id) ON DELETE SET NULL,
     FOREIGN KEY (work_type_id) REFERENCES work_types(id) ON DELETE SET NULL,
-    FOREIGN KEY (recruiter_id) REFERENCES recruiters(id) ON DELETE CASCADE
+    FOREIGN KEY (recruiter_id) REFERENCES recruiters(id) ON DELETE CASCADE,
+    FULLTEXT INDEX ft_jobs_title_description (title, description),
+    INDEX ix_jobs_experience_level (experience_level),
+    INDEX ix_jobs_industry (industry),
+    INDEX ix_jobs_created_at_id (created_at, id),
+    INDEX ix_jobs_salary_min (salary_min),
+    INDEX ix_jobs_salary_max (salary_max)
 ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
 -- Job tags table
@@ -94,6 +102,17 @@ CREATE TABLE job_tags (
     FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
 ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
+-- Job outbox table (thay đổi chờ đồng bộ sang Elasticsearch)
+CREATE TABLE job_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job_id INT NOT NULL,
+    operation ENUM('upsert', 'delete') NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_job_outbox_available_at (available_at, id)
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
 -- Insert Work Types
 INSERT INTO work_types (name) VALUES
 ('Remote'),
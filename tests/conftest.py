@@ -0,0 +1,33 @@
+from typing import Iterator
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.db.database import Base
+from app.models import job, profile, recruiter, user  # noqa: F401  (đăng ký các bảng vào metadata)
+from app.services.reference_data_service import reference_cache
+
+@pytest.fixture
+def sqlite_url(tmp_path) -> Iterator[str]:
+    """File SQLite tạm với đủ các bảng của app"""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    yield url
+
+@pytest.fixture
+def sqlite_engine(sqlite_url: str) -> AsyncEngine:
+    # NullPool: mỗi test chạy trong event loop riêng (asyncio.run), không giữ kết nối giữa các loop
+    return create_async_engine(sqlite_url.replace("sqlite://", "sqlite+aiosqlite://", 1), poolclass=NullPool)
+
+@pytest.fixture
+def sqlite_sessionmaker(sqlite_engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(sqlite_engine, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture(autouse=True)
+def empty_reference_cache():
+    # reference_cache là global của worker, mỗi test bắt đầu với cache rỗng
+    reference_cache.load([], [], [], None)
+    yield
+    reference_cache.load([], [], [], None)
@@ -0,0 +1,97 @@
+"""Số câu SQL của các đường đọc job, để bắt lỗi N+1 khi sửa model hoặc serializer"""
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.db.query_counter import assert_max_queries
+from app.models.job import Job, Location, Tag, WorkType, job_tags
+from app.services import job_service
+from app.services.reference_data_service import async_ensure_references
+
+JOB_COUNT = 20
+
+async def _seed(sessionmaker):
+    async with sessionmaker() as db:
+        tags = [Tag(name="python"), Tag(name="go"), Tag(name="sql")]
+        location, work_type = Location(name="Hà Nội"), WorkType(name="Full-time")
+        db.add_all([*tags, location, work_type])
+        await db.flush()
+        jobs = [
+            Job(
+                title=f"Job {i}", recruiter_id=1, location_id=location.id, work_type_id=work_type.id,
+                created_at=datetime(2024, 1, 1) + timedelta(minutes=i)
+            )
+            for i in range(JOB_COUNT)
+        ]
+        db.add_all(jobs)
+        await db.flush()
+        await db.execute(insert(job_tags), [
+            {"job_id": job.id, "tag_id": tag.id} for job in jobs for tag in tags[:2]
+        ])
+        await db.commit()
+        return [job.id for job in jobs], [tag.id for tag in tags], location.id, work_type.id
+
+async def _warm_reference_cache(sessionmaker, tag_ids, location_id, work_type_id):
+    # Trạng thái thường gặp của worker: reference data đã được nạp khi khởi động
+    async with sessionmaker() as db:
+        await async_ensure_references(db, tag_ids, [location_id], [work_type_id])
+
+def test_get_jobs_lists_a_page_in_one_query(sqlite_engine, sqlite_sessionmaker):
+    async def scenario():
+        _, tag_ids, location_id, work_type_id = await _seed(sqlite_sessionmaker)
+        await _warm_reference_cache(sqlite_sessionmaker, tag_ids, location_id, work_type_id)
+        async with sqlite_sessionmaker() as db:
+            with assert_max_queries(sqlite_engine.sync_engine, 1):
+                jobs = await job_service.get_jobs(db, limit=JOB_COUNT)
+
+        assert len(jobs) == JOB_COUNT
+        assert all([tag.name for tag in job.tags] == ["python", "go"] for job in jobs)
+        assert all(job.location.name == "Hà Nội" and job.work_type.name == "Full-time" for job in jobs)
+
+    asyncio.run(scenario())
+
+def test_get_jobs_with_cold_reference_cache_does_not_grow_with_page_size(sqlite_engine, sqlite_sessionmaker):
+    async def scenario():
+        await _seed(sqlite_sessionmaker)
+        async with sqlite_sessionmaker() as db:
+            # Một câu cho trang, mỗi bảng tags/locations/work_types tối đa một câu
+            with assert_max_queries(sqlite_engine.sync_engine, 4):
+                jobs = await job_service.get_jobs(db, limit=JOB_COUNT)
+
+        assert len(jobs) == JOB_COUNT
+        assert all(len(job.tags) == 2 for job in jobs)
+
+    asyncio.run(scenario())
+
+def test_get_job_reads_one_query(monkeypatch, sqlite_engine, sqlite_sessionmaker):
+    # Bỏ qua cache Redis để đo đúng đường đọc MySQL
+    monkeypatch.setattr(job_service, "get_job_from_cache", lambda job_id: None)
+    monkeypatch.setattr(job_service, "set_job_in_cache", lambda job_response: None)
+
+    async def scenario():
+        job_ids, tag_ids, location_id, work_type_id = await _seed(sqlite_sessionmaker)
+        await _warm_reference_cache(sqlite_sessionmaker, tag_ids, location_id, work_type_id)
+        async with sqlite_sessionmaker() as db:
+            with assert_max_queries(sqlite_engine.sync_engine, 1):
+                job = await job_service.get_job(db, job_ids[0])
+
+        assert job.id == job_ids[0]
+        assert [tag.name for tag in job.tags] == ["python", "go"]
+
+    asyncio.run(scenario())
+
+def test_tag_filter_returns_full_pages_for_jobs_matching_several_tags(sqlite_sessionmaker):
+    async def scenario():
+        _, tag_ids, location_id, work_type_id = await _seed(sqlite_sessionmaker)
+        await _warm_reference_cache(sqlite_sessionmaker, tag_ids, location_id, work_type_id)
+        async with sqlite_sessionmaker() as db:
+            # Mỗi job khớp cả hai tag được lọc
+            jobs = await job_service.get_jobs(db, limit=3, tag_ids=tag_ids[:2])
+            first_page, cursor = await job_service.get_jobs_page(db, limit=3, tag_ids=tag_ids[:2])
+            second_page, _ = await job_service.get_jobs_page(db, cursor=cursor, limit=3, tag_ids=tag_ids[:2])
+
+        assert len(jobs) == 3
+        assert len(first_page) == 3 and cursor is not None
+        assert len(second_page) == 3
+        assert not {job.id for job in first_page} & {job.id for job in second_page}
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+"""Reference data cache được nạp lại khi version trong Redis thay đổi"""
+from typing import Dict, Optional
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models.job import Tag
+from app.services import reference_data_service
+from app.services.reference_data_service import bump_reference_version, refresh_reference_data, reference_cache
+
+class FakeRedis:
+    """Chỉ các lệnh reference_data_service dùng cho version"""
+
+    def __init__(self):
+        self.values: Dict[str, int] = {}
+
+    def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def get(self, key: str) -> Optional[str]:
+        return str(self.values[key]) if key in self.values else None
+
+def test_bump_reloads_reference_data(monkeypatch, sqlite_url):
+    engine = create_engine(sqlite_url)
+    SessionLocal = sessionmaker(engine)
+    monkeypatch.setattr(reference_data_service, "redis_client", FakeRedis())
+    monkeypatch.setattr(reference_data_service, "SessionLocal", SessionLocal)
+
+    def add_tag(name: str) -> int:
+        with SessionLocal() as db:
+            tag = Tag(name=name)
+            db.add(tag)
+            db.commit()
+            return tag.id
+
+    try:
+        python_id = add_tag("python")
+        refresh_reference_data()
+        assert reference_cache.tag(python_id).name == "python"
+
+        # Chưa bump: cache giữ nguyên snapshot
+        go_id = add_tag("go")
+        refresh_reference_data()
+        assert reference_cache.tag(go_id) is None
+
+        bump_reference_version()
+        refresh_reference_data()
+        assert reference_cache.tag(go_id).name == "go"
+        assert reference_cache.tag_id_by_name("Go") == go_id
+    finally:
+        engine.dispose()